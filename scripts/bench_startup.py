@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""STDIOサーバーの起動時間ベンチマーク
+
+`python -X importtime` でインポート時間の内訳を取得し、
+さらに実際にサーバープロセスを起動して initialize 応答までの時間を計測します。
+STDIOモードではクライアントセッションごとにプロセスが起動するため、この時間が毎回かかります。
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --runs 10 --top 20
+    python scripts/bench_startup.py --target-ms 800   # 超過時は終了コード1
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "bench-startup", "version": "0.1.0"},
+    },
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """-X importtime の出力を (モジュール名, self[us], cumulative[us]) に変換"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            entries.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return entries
+
+
+def measure_import(module: str, env: dict[str, str]) -> tuple[float, list[tuple[str, int, int]]]:
+    """モジュールのインポート時間を計測（プロセス起動込み）"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, parse_importtime(result.stderr)
+
+
+def measure_initialize(env: dict[str, str]) -> float:
+    """サーバープロセスを起動し、initialize 応答までの時間を計測"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mcp_server.main"],
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE_REQUEST) + "\n")
+        process.stdin.flush()
+        response = process.stdout.readline()
+        elapsed = time.perf_counter() - start
+        if '"result"' not in response:
+            raise RuntimeError(f"Unexpected initialize response: {response!r}")
+        return elapsed
+    finally:
+        process.kill()
+        process.wait()
+
+
+def format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.1f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="計測回数")
+    parser.add_argument("--top", type=int, default=15, help="表示するモジュール数")
+    parser.add_argument(
+        "--module", default="mcp_server.server", help="インポート時間を計測するモジュール"
+    )
+    parser.add_argument(
+        "--no-initialize", action="store_true", help="initialize 応答時間の計測を省略"
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=None,
+        help="initialize 応答時間（なければインポート時間）の中央値の目標値"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as docs_dir:
+        env = dict(os.environ, MCP_DOCS_DIR=docs_dir, MCP_TRANSPORT="stdio")
+
+        import_times = []
+        entries: list[tuple[str, int, int]] = []
+        for _ in range(args.runs):
+            elapsed, entries = measure_import(args.module, env)
+            import_times.append(elapsed)
+
+        init_times = []
+        if not args.no_initialize:
+            for _ in range(args.runs):
+                init_times.append(measure_initialize(env))
+
+    print(f"Python: {sys.version.split()[0]} ({sys.executable})")
+    print(f"Runs: {args.runs}")
+    print()
+    print(f"import {args.module} (process wall time)")
+    print(f"  median: {format_ms(statistics.median(import_times))}")
+    print(f"  min:    {format_ms(min(import_times))}")
+    print(f"  max:    {format_ms(max(import_times))}")
+
+    if init_times:
+        print()
+        print("spawn -> initialize response (STDIO)")
+        print(f"  median: {format_ms(statistics.median(init_times))}")
+        print(f"  min:    {format_ms(min(init_times))}")
+        print(f"  max:    {format_ms(max(init_times))}")
+
+    own_us = sum(self_us for name, self_us, _ in entries if name.startswith("mcp_server"))
+    print()
+    print(f"mcp_server.* self import time: {own_us / 1000:.1f} ms")
+    print()
+    print(f"Top {args.top} imports by cumulative time (last run):")
+    print(f"  {'cumulative':>12}  {'self':>10}  module")
+    for name, self_us, cumulative_us in sorted(entries, key=lambda e: -e[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {self_us / 1000:7.1f} ms  {name}")
+
+    if args.target_ms is not None:
+        measured = statistics.median(init_times or import_times) * 1000
+        if measured > args.target_ms:
+            print()
+            print(f"FAIL: median {measured:.1f} ms exceeds target {args.target_ms:.1f} ms")
+            return 1
+        print()
+        print(f"OK: median {measured:.1f} ms within target {args.target_ms:.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,519 @@
+#!/usr/bin/env python
+"""同時に動作する複数のエージェントセッションを模した負荷試験
+
+ドキュメント一覧・取得・検索を混ぜたリクエストを、多数のセッションから並行して送ります。
+ドキュメントの人気は Zipf 分布（一部のドキュメントにアクセスが集中）に従います。
+HTTP API（1つのサーバープロセスを全セッションで共有）と STDIO サーバー
+（セッションごとにプロセスを起動）の両方を試験でき、操作ごとの p50/p99 レイテンシ、
+スループット、サーバープロセスのピークRSSを報告します。
+
+`--docs-dir` を指定しない場合は乱数で生成した試験用のドキュメントを使うため、
+ネットワークに接続できない環境でも実行できます。
+
+Usage:
+    python scripts/load_test.py
+    python scripts/load_test.py --target http --sessions 50 --requests 200
+    python scripts/load_test.py --target stdio --sessions 8 --mix get=6,search=3,list=1
+    python scripts/load_test.py --generate-corpus ./loadtest-docs --files 1000
+    python scripts/load_test.py --docs-dir ./docs --json results.json
+    python scripts/load_test.py --max-p99-ms 200   # 超過時は終了コード1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+OPERATIONS = ("list", "get", "search")
+
+WORDS = (
+    "server document search index cache request response timeout retry config "
+    "deploy install client session token stream buffer encoding memory latency "
+    "error warning process thread async queue worker schedule backup restore "
+    "network proxy gateway storage volume cluster node replica shard metric "
+    "ドキュメント 設定 検索 索引 接続 障害 復旧 手順 確認 更新"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# 試験用ドキュメントの生成
+# ---------------------------------------------------------------------------
+
+def generate_corpus(
+    directory: Path,
+    files: int = 200,
+    median_kb: float = 16.0,
+    sections: int = 10,
+    seed: int = 0
+) -> list[str]:
+    """試験用のMarkdownドキュメントを生成
+
+    サイズは対数正規分布（中央値 median_kb、最大4MB）で、見出しと段落を含みます。
+    同じ seed からは同じ内容が生成されます。
+
+    Returns:
+        生成したファイルの相対パス
+    """
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        relative = f"section-{i % sections:02d}/topic-{i:05d}.md"
+        target_size = min(int(rng.lognormvariate(0, 1) * median_kb * 1024), 4 * 1024 * 1024)
+
+        parts = [f"# Topic {i}: {' '.join(rng.choices(WORDS, k=3))}\n"]
+        size = len(parts[0])
+        heading = 1
+        while size < target_size:
+            if rng.random() < 0.1:
+                block = f"\n## Section {heading}\n\n"
+                heading += 1
+            else:
+                block = " ".join(rng.choices(WORDS, k=rng.randint(8, 40))) + ".\n"
+            parts.append(block)
+            size += len(block.encode("utf-8"))
+
+        path = directory / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(parts), encoding="utf-8")
+        paths.append(relative)
+    return paths
+
+
+def collect_corpus(directory: Path) -> list[str]:
+    """既存のドキュメントディレクトリのファイル一覧（人気の順位は名前順）"""
+    return sorted(
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob("*")
+        if path.is_file() and not path.name.startswith(".")
+    )
+
+
+# ---------------------------------------------------------------------------
+# リクエストの生成
+# ---------------------------------------------------------------------------
+
+def zipf_weights(n: int, exponent: float) -> list[float]:
+    """順位 k のドキュメントが選ばれる重み（1 / k^exponent）"""
+    return [1.0 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """"get=5,search=4,list=1" 形式の操作の比率を解析"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation: {name}. Supported: {', '.join(OPERATIONS)}"
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def plan_session(
+    paths: list[str],
+    weights: list[float],
+    mix: dict[str, float],
+    requests: int,
+    seed: int
+) -> list[tuple[str, dict]]:
+    """1セッション分のリクエスト（操作名, 引数）を生成"""
+    rng = random.Random(seed)
+    operations = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    targets = rng.choices(paths, weights=weights, k=requests)
+    plan = []
+    for operation, path in zip(operations, targets):
+        if operation == "list":
+            directory = path.rsplit("/", 1)[0] if "/" in path else "."
+            plan.append((operation, {"directory": directory, "pattern": "*"}))
+        elif operation == "get":
+            plan.append((operation, {"path": path}))
+        else:
+            plan.append((operation, {"path": path, "keyword": rng.choice(WORDS)}))
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# 計測結果
+# ---------------------------------------------------------------------------
+
+class Results:
+    """操作ごとのレイテンシとエラー数"""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.elapsed = 0.0
+        self.peak_rss: Optional[int] = None  # サーバープロセスのピークRSS（最大のプロセス）
+        self.total_peak_rss: Optional[int] = None  # 全サーバープロセスの合計
+
+    def record(self, operation: str, seconds: float, ok: bool) -> None:
+        self.latencies[operation].append(seconds)
+        if not ok:
+            self.errors[operation] += 1
+
+    @property
+    def requests(self) -> int:
+        return sum(len(values) for name, values in self.latencies.items() if name in OPERATIONS)
+
+    def summary(self) -> dict:
+        operations = {}
+        for name, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            operations[name] = {
+                "count": len(ordered),
+                "errors": self.errors[name],
+                "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+                "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+            }
+        all_requests = sorted(
+            itertools.chain.from_iterable(
+                values for name, values in self.latencies.items() if name in OPERATIONS
+            )
+        )
+        return {
+            "target": self.target,
+            "requests": self.requests,
+            "errors": sum(count for name, count in self.errors.items() if name in OPERATIONS),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "throughput_rps": round(self.requests / self.elapsed, 1) if self.elapsed else None,
+            "p50_ms": round(percentile(all_requests, 50) * 1000, 3),
+            "p99_ms": round(percentile(all_requests, 99) * 1000, 3),
+            "peak_rss_bytes": self.peak_rss,
+            "total_peak_rss_bytes": self.total_peak_rss,
+            "operations": operations,
+        }
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    """ソート済みの値の p パーセンタイル（nearest-rank）"""
+    if not ordered:
+        return 0.0
+    rank = max(int(len(ordered) * p / 100 + 0.999999) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def read_peak_rss(pid: int) -> Optional[int]:
+    """プロセスのピークRSS（バイト）。/proc がない環境では None"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+# ---------------------------------------------------------------------------
+# HTTP API
+# ---------------------------------------------------------------------------
+
+HTTP_ENDPOINTS = {"list": "/api/list", "get": "/api/document", "search": "/api/search"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_http(args, env: dict[str, str], plans: list[list[tuple[str, dict]]]) -> Results:
+    """HTTP API のサーバーを起動し、全セッションから並行してリクエストを送る"""
+    import httpx
+
+    results = Results("http")
+    port = free_port()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "mcp_server.http_server:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        env=env,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.sessions)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await wait_until_ready(client, process, args.startup_timeout)
+
+            async def session(index: int, plan: list[tuple[str, dict]]) -> None:
+                headers = {"X-Client-ID": f"session-{index}"}
+                for operation, params in plan:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post(
+                            HTTP_ENDPOINTS[operation], json=params, headers=headers
+                        )
+                        # 存在しないキーワードの検索も成功（200）として扱う
+                        ok = response.status_code == 200
+                    except httpx.HTTPError:
+                        ok = False
+                    results.record(operation, time.perf_counter() - start, ok)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(session(i, plan) for i, plan in enumerate(plans)))
+            results.elapsed = time.perf_counter() - start
+
+        results.peak_rss = results.total_peak_rss = read_peak_rss(process.pid)
+    finally:
+        if process.returncode is None:
+            process.terminate()
+        await process.wait()
+    return results
+
+
+async def wait_until_ready(client, process, timeout: float) -> None:
+    """サーバーが /readyz に200を返すまで待つ"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.returncode is not None:
+            raise RuntimeError(f"HTTP server exited with code {process.returncode}")
+        try:
+            if (await client.get("/readyz")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"HTTP server did not become ready within {timeout} seconds")
+
+
+# ---------------------------------------------------------------------------
+# STDIO サーバー
+# ---------------------------------------------------------------------------
+
+STDIO_TOOLS = {"list": "list_documents", "get": "get_document", "search": "search_in_document"}
+
+PROTOCOL_VERSION = "2025-03-26"
+
+
+class StdioSession:
+    """STDIOサーバーのプロセスと JSON-RPC でやり取りするセッション"""
+
+    def __init__(self, env: dict[str, str], timeout: float):
+        self.env = env
+        self.timeout = timeout
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "mcp_server.main",
+            env=self.env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=64 * 1024 * 1024,  # 大きなドキュメントの応答も1行で受け取る
+        )
+        await self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "load-test", "version": "0.1.0"},
+        })
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def _send(self, message: dict) -> None:
+        self.process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+
+    async def request(self, method: str, params: dict) -> dict:
+        request_id = next(self._ids)
+        await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        while True:
+            line = await asyncio.wait_for(self.process.stdout.readline(), self.timeout)
+            if not line:
+                raise RuntimeError("STDIO server closed the connection")
+            message = json.loads(line)
+            # 通知（ログ等）は読み飛ばす
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise RuntimeError(message["error"].get("message", "JSON-RPC error"))
+                return message["result"]
+
+    async def call_tool(self, name: str, arguments: dict) -> bool:
+        """ツールを呼び出し、成功したかを返す（ツールはエラーを "Error ..." の文字列で返す）"""
+        result = await self.request("tools/call", {"name": name, "arguments": arguments})
+        text = "".join(item.get("text", "") for item in result.get("content", []))
+        return not result.get("isError") and not text.startswith("Error")
+
+    async def close(self) -> Optional[int]:
+        """セッションを終了し、プロセスのピークRSSを返す"""
+        if self.process is None:
+            return None
+        peak_rss = read_peak_rss(self.process.pid)
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), 5.0)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        return peak_rss
+
+
+async def run_stdio(args, env: dict[str, str], plans: list[list[tuple[str, dict]]]) -> Results:
+    """セッションごとに STDIO サーバーを起動して並行してリクエストを送る
+
+    プロセスの起動から initialize 応答までの時間は "initialize" として別に集計します。
+    """
+    results = Results("stdio")
+    peaks: list[int] = []
+
+    async def session(plan: list[tuple[str, dict]]) -> None:
+        client = StdioSession(env, args.timeout)
+        try:
+            start = time.perf_counter()
+            try:
+                await client.start()
+            except (OSError, RuntimeError, ValueError, asyncio.TimeoutError):
+                results.record("initialize", time.perf_counter() - start, False)
+                return
+            results.record("initialize", time.perf_counter() - start, True)
+
+            for operation, params in plan:
+                start = time.perf_counter()
+                try:
+                    ok = await client.call_tool(STDIO_TOOLS[operation], params)
+                except (OSError, RuntimeError, ValueError, asyncio.TimeoutError):
+                    ok = False
+                results.record(operation, time.perf_counter() - start, ok)
+        finally:
+            peak_rss = await client.close()
+            if peak_rss is not None:
+                peaks.append(peak_rss)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(plan) for plan in plans))
+    results.elapsed = time.perf_counter() - start
+    if peaks:
+        results.peak_rss = max(peaks)
+        results.total_peak_rss = sum(peaks)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 実行
+# ---------------------------------------------------------------------------
+
+def format_bytes(value: Optional[int]) -> str:
+    return f"{value / (1024 * 1024):.1f} MB" if value is not None else "n/a"
+
+
+def print_summary(summary: dict) -> None:
+    print()
+    print(f"[{summary['target']}] {summary['requests']} requests in "
+          f"{summary['elapsed_seconds']:.2f} s "
+          f"({summary['throughput_rps']} req/s, {summary['errors']} errors)")
+    print(f"  latency p50: {summary['p50_ms']:8.1f} ms   p99: {summary['p99_ms']:8.1f} ms")
+    if summary["target"] == "stdio":
+        print(f"  peak RSS: {format_bytes(summary['peak_rss_bytes'])} per process, "
+              f"{format_bytes(summary['total_peak_rss_bytes'])} total")
+    else:
+        print(f"  peak RSS: {format_bytes(summary['peak_rss_bytes'])}")
+    print(f"  {'operation':<12}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, stats in summary["operations"].items():
+        print(f"  {name:<12}{stats['count']:>8}{stats['errors']:>8}"
+              f"{stats['p50_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['mean_ms']:>10.1f}")
+
+
+async def run(args, docs_dir: Path, paths: list[str]) -> list[dict]:
+    weights = zipf_weights(len(paths), args.zipf)
+    plans = [
+        plan_session(paths, weights, args.mix, args.requests, args.seed + index)
+        for index in range(args.sessions)
+    ]
+    env = dict(os.environ, MCP_DOCS_DIR=str(docs_dir), MCP_TRANSPORT="stdio")
+    # 試験ごとにアクセス頻度の記録が残らないようにする
+    env.pop("MCP_STATE_DIR", None)
+
+    summaries = []
+    targets = ("http", "stdio") if args.target == "both" else (args.target,)
+    for target in targets:
+        runner = run_http if target == "http" else run_stdio
+        summary = (await runner(args, env, plans)).summary()
+        print_summary(summary)
+        summaries.append(summary)
+    return summaries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--target", choices=("http", "stdio", "both"), default="both", help="試験するサーバー"
+    )
+    parser.add_argument("--sessions", type=int, default=20, help="同時に動作するセッション数")
+    parser.add_argument("--requests", type=int, default=50, help="セッションごとのリクエスト数")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=parse_mix("get=5,search=4,list=1"),
+        help="操作の比率（例: get=5,search=4,list=1）"
+    )
+    parser.add_argument("--zipf", type=float, default=1.1, help="人気の偏り（Zipf 分布の指数）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    parser.add_argument("--timeout", type=float, default=30.0, help="リクエストごとのタイムアウト（秒）")
+    parser.add_argument(
+        "--startup-timeout", type=float, default=60.0, help="HTTPサーバーの準備完了を待つ秒数"
+    )
+    parser.add_argument("--docs-dir", type=Path, default=None, help="既存のドキュメントディレクトリ")
+    parser.add_argument("--files", type=int, default=200, help="生成するドキュメント数")
+    parser.add_argument("--median-kb", type=float, default=16.0, help="生成するドキュメントのサイズの中央値（KB）")
+    parser.add_argument(
+        "--generate-corpus", type=Path, default=None, metavar="DIR",
+        help="試験用のドキュメントを生成して終了"
+    )
+    parser.add_argument("--json", type=Path, default=None, help="結果をJSONで保存するファイル")
+    parser.add_argument(
+        "--max-p99-ms", type=float, default=None, help="全体の p99 レイテンシの目標値"
+    )
+    args = parser.parse_args()
+
+    if args.generate_corpus is not None:
+        paths = generate_corpus(args.generate_corpus, args.files, args.median_kb, seed=args.seed)
+        print(f"Generated {len(paths)} documents in {args.generate_corpus}")
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.docs_dir is not None:
+            docs_dir = args.docs_dir.resolve()
+            paths = collect_corpus(docs_dir)
+        else:
+            docs_dir = Path(tmp)
+            paths = generate_corpus(docs_dir, args.files, args.median_kb, seed=args.seed)
+        if not paths:
+            print(f"No documents found in {docs_dir}", file=sys.stderr)
+            return 1
+
+        print(f"Python: {sys.version.split()[0]} ({sys.executable})")
+        print(f"Documents: {len(paths)} in {docs_dir}")
+        print(f"Sessions: {args.sessions} x {args.requests} requests, "
+              f"mix: {args.mix}, zipf: {args.zipf}")
+        summaries = asyncio.run(run(args, docs_dir, paths))
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(summaries, indent=2), encoding="utf-8")
+
+    failed = False
+    for summary in summaries:
+        if summary["errors"]:
+            print(f"\nWARN: {summary['target']}: {summary['errors']} failed requests")
+        if args.max_p99_ms is not None and summary["p99_ms"] > args.max_p99_ms:
+            print(f"\nFAIL: {summary['target']}: p99 {summary['p99_ms']:.1f} ms "
+                  f"exceeds target {args.max_p99_ms:.1f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""ドキュメントルートの設定"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional
+
+# 索引ポリシー
+# none: セマンティック索引を作成しない
+# lazy: 最初の検索時に作成（デフォルト）
+# eager: サーバー起動時にバックグラウンドで作成
+INDEX_POLICIES = ("none", "lazy", "eager")
+
+DEFAULT_ROOT_NAME = "default"
+
+
+@dataclass(frozen=True)
+class RootConfig:
+    """ドキュメントルート（名前付きのドキュメントディレクトリ）の設定
+
+    Attributes:
+        name: ルート名（ツール呼び出しの root 引数で指定）
+        path: ドキュメントディレクトリのパス
+        max_file_size: 最大ファイルサイズ（バイト）
+        cache_budget: ドキュメントキャッシュの上限（バイト）。0で無効
+        index_policy: セマンティック索引の作成方針（none / lazy / eager）
+        refresh_interval: 索引をバックグラウンドで更新する間隔（秒）。0の場合は検索時に更新
+        priority: 優先度（大きいほど優先。既定のルートの選択と検索結果の並び順に使用）
+        prefetch_top_n: 起動時に先読みするアクセス頻度上位のドキュメント数。0で無効
+        stats_file: アクセス頻度の保存先（Noneの場合は保存しない）
+    """
+
+    name: str
+    path: str
+    max_file_size: int = 10 * 1024 * 1024  # 10MB
+    cache_budget: int = 32 * 1024 * 1024  # 32MB
+    index_policy: str = "lazy"
+    refresh_interval: float = 0.0
+    priority: int = 0
+    prefetch_top_n: int = 20
+    stats_file: Optional[str] = None
+
+    def __post_init__(self):
+        if not self.name or ":" in self.name:
+            raise ValueError(f"Invalid root name: {self.name!r}")
+        if self.index_policy not in INDEX_POLICIES:
+            raise ValueError(
+                f"Unsupported index policy: {self.index_policy}. "
+                f"Supported: {', '.join(INDEX_POLICIES)}"
+            )
+        if self.refresh_interval < 0:
+            raise ValueError("refresh_interval must not be negative")
+        if self.prefetch_top_n < 0:
+            raise ValueError("prefetch_top_n must not be negative")
+
+    @property
+    def needs_background(self) -> bool:
+        """バックグラウンド処理（起動時の索引作成・定期更新・先読み）が必要か"""
+        return self.needs_index_background or self.needs_prefetch
+
+    @property
+    def needs_index_background(self) -> bool:
+        """索引のバックグラウンド処理（起動時の作成・定期更新）が必要か"""
+        return self.index_policy == "eager" or (
+            self.index_policy != "none" and self.refresh_interval > 0
+        )
+
+    @property
+    def needs_prefetch(self) -> bool:
+        """保存されたアクセス頻度による先読みが有効か"""
+        return self.prefetch_top_n > 0 and self.stats_file is not None
+
+
+def _parse_root(name: str, value: Any) -> RootConfig:
+    if isinstance(value, str):
+        return RootConfig(name=name, path=value)
+    if isinstance(value, dict):
+        try:
+            return RootConfig(name=name, **value)
+        except TypeError as e:
+            raise ValueError(f"Invalid configuration for root '{name}': {e}") from e
+    raise ValueError(f"Invalid configuration for root '{name}': {value!r}")
+
+
+def load_root_configs(environ: Optional[dict[str, str]] = None) -> list[RootConfig]:
+    """環境変数からドキュメントルートの設定を読み込む
+
+    `MCP_DOCS_ROOTS` にJSONで複数のルートを指定できます。
+    未指定の場合は `MCP_DOCS_DIR`（なければカレントディレクトリ/docs）を
+    "default" ルートとして使用します。
+    `MCP_STATE_DIR` を指定すると、各ルートのアクセス頻度を
+    "<MCP_STATE_DIR>/<ルート名>.access.json" に保存します。
+
+    Args:
+        environ: 環境変数（Noneの場合は os.environ）
+
+    Returns:
+        優先度の高い順に並んだルート設定のリスト
+
+    Raises:
+        ValueError: 設定が不正な場合
+
+    Example:
+        MCP_DOCS_ROOTS='{"product": "/docs/product",
+                         "runbooks": {"path": "/docs/runbooks", "priority": 10}}'
+    """
+    environ = os.environ if environ is None else environ
+
+    state_dir = environ.get("MCP_STATE_DIR", "").strip()
+
+    raw = environ.get("MCP_DOCS_ROOTS", "").strip()
+    if not raw:
+        docs_dir = environ.get("MCP_DOCS_DIR", str(Path.cwd() / "docs"))
+        return _with_stats_files(
+            [RootConfig(name=DEFAULT_ROOT_NAME, path=docs_dir)], state_dir
+        )
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid MCP_DOCS_ROOTS JSON: {e}") from e
+
+    if isinstance(data, dict):
+        configs = [_parse_root(name, value) for name, value in data.items()]
+    elif isinstance(data, list):
+        configs = []
+        for item in data:
+            if not isinstance(item, dict):
+                raise ValueError(f"Invalid root configuration: {item!r}")
+            options = dict(item)
+            configs.append(_parse_root(options.pop("name", ""), options))
+    else:
+        raise ValueError("MCP_DOCS_ROOTS must be a JSON object or array")
+
+    if not configs:
+        raise ValueError("MCP_DOCS_ROOTS must define at least one root")
+
+    names = [config.name for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate root names in MCP_DOCS_ROOTS: {names}")
+
+    # 優先度の高い順（同じ優先度は定義順）
+    configs = sorted(configs, key=lambda config: -config.priority)
+    return _with_stats_files(configs, state_dir)
+
+
+def _safe_filename(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name).lstrip(".") or "_"
+
+
+def _with_stats_files(configs: list[RootConfig], state_dir: str) -> list[RootConfig]:
+    """アクセス頻度の保存先が未指定のルートに MCP_STATE_DIR 内のファイルを設定"""
+    if not state_dir:
+        return configs
+    return [
+        config if config.stats_file else replace(
+            config, stats_file=str(Path(state_dir) / f"{_safe_filename(config.name)}.access.json")
+        )
+        for config in configs
+    ]
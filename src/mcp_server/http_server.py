@@ -1,48 +1,259 @@
 """MCP Document Server - HTTP API wrapper"""
 
+import json
 import os
-from pathlib import Path
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Optional
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from mcp_server.tools.document import DocumentTools
+from mcp_server.config import load_root_configs
+from mcp_server.tools.document import LISTING_PAGE_SIZE
+from mcp_server.tools.roots import DocumentRoots
+from mcp_server.tools.search import DirectorySearch, FileMatches
+from mcp_server.utils.admission import AdmissionController, AdmissionRejected
 from mcp_server.utils.logging import setup_logging
+from mcp_server.utils.profiling import CPUProfiler, ProfileInProgress
+from mcp_server.utils.tracing import span, tracing_enabled
 
 # ロギング設定
 logger = setup_logging(__name__)
 
+# ドキュメントルート
+# MCP_DOCS_ROOTS（JSON）で複数ルートを指定、なければ MCP_DOCS_DIR を "default" ルートとして使用
+ROOT_CONFIGS = load_root_configs()
+DOCS_DIR = ROOT_CONFIGS[0].path
+
+roots = DocumentRoots(
+    ROOT_CONFIGS,
+    embedder=os.getenv("MCP_EMBEDDER"),
+    create_dirs=True
+)
+logger.info(f"HTTP Server initialized with document roots: {roots.names}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """バックグラウンド処理（索引の作成・定期更新）の開始と停止"""
+    await roots.start()
+    try:
+        yield
+    finally:
+        await roots.stop()
+
+
 # FastAPI アプリ
 app = FastAPI(
     title="MCP Document Server API",
     description="HTTP API for MCP Document Server",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
-# ドキュメントディレクトリ
-DOCS_DIR = os.getenv("MCP_DOCS_DIR", str(Path.cwd() / "docs"))
-Path(DOCS_DIR).mkdir(parents=True, exist_ok=True)
+# アドミッション制御（過負荷時のメモリ使用量を抑える）
+admission = AdmissionController(
+    max_inflight=int(os.getenv("MCP_HTTP_MAX_INFLIGHT", "16")),
+    max_inflight_bytes=int(
+        os.getenv("MCP_HTTP_MAX_INFLIGHT_BYTES", str(128 * 1024 * 1024))
+    ),
+    max_queue=int(os.getenv("MCP_HTTP_MAX_QUEUE", "64")),
+    max_queue_per_client=int(os.getenv("MCP_HTTP_MAX_QUEUE_PER_CLIENT", "8")),
+    queue_timeout=float(os.getenv("MCP_HTTP_QUEUE_TIMEOUT", "2.0")),
+    retry_after=int(os.getenv("MCP_HTTP_RETRY_AFTER", "1"))
+)
+
+# 読み込むファイルサイズに対するメモリ使用量の見積もり倍率
+# （読み込んだ内容 + デコード後の文字列 + JSONレスポンス）
+MEMORY_COST_FACTOR = 3
+
+# 分割取得で同時に保持するメモリ量の見積もり
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def estimate_cost(path: str, root: Optional[str] = None) -> int:
+    """ドキュメントを処理する際のメモリ使用量を見積もる"""
+    try:
+        return roots.get(root).file_handler.file_size(path) * MEMORY_COST_FACTOR
+    except Exception:
+        # 存在しないファイル等は処理側で適切なエラーを返す
+        return 0
+
+
+async def read_cost(root: Optional[str], directory: str = ".", concurrency: int = 1) -> int:
+    """ディレクトリ配下のファイルを読み込む処理のメモリ使用量を見積もる"""
+    try:
+        tools = roots.get(root)
+        return await tools.largest_read_bytes(directory, concurrency) * MEMORY_COST_FACTOR
+    except Exception:
+        # 存在しないディレクトリ等は処理側で適切なエラーを返す
+        return 0
+
+
+async def semantic_search_cost(request: "SemanticSearchRequest") -> int:
+    """セマンティック検索のメモリ使用量を見積もる
+
+    索引の作成・更新ではルートごとにファイルを1つずつ読み込み、
+    ルートを指定しない場合は全ルートを並行して更新します。
+    """
+    names = [request.root] if request.root else roots.names
+    costs = []
+    for name in names:
+        try:
+            if roots.get(name).index_policy == "none":
+                continue
+        except ValueError:
+            continue
+        costs.append(await read_cost(name))
+    return sum(costs)
+
+
+@asynccontextmanager
+async def admitted(http_request: Request, cost: int = 0):
+    """アドミッション制御の枠を確保してリクエストを処理"""
+    client = http_request.headers.get("x-client-id") or (
+        http_request.client.host if http_request.client else "unknown"
+    )
+    async with admission.admit(client, cost):
+        yield
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """送信が終わるまでアドミッション制御の枠を保持するストリーミングレスポンス
+
+    本文の生成を始める前にクライアントが切断した場合や送信に失敗した場合も、
+    レスポンスの処理が終わった時点で必ず枠を解放します。
+    """
+
+    def __init__(self, slot: AsyncExitStack, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                # 途中で終わった本文の生成を閉じる（検索中のタスク等を片付ける）
+                await self.body_iterator.aclose()
+            finally:
+                await self.slot.aclose()
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """上限超過時は処理せずに429/503を返す"""
+    logger.warning(f"Request rejected ({exc.status_code}): {exc}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"success": False, "detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
-# DocumentTools インスタンス
-doc_tools = DocumentTools(DOCS_DIR)
-logger.info(f"HTTP Server initialized with docs directory: {DOCS_DIR}")
+
+async def trace_requests(request: Request, call_next):
+    """リクエスト全体をトレースのルートスパンとして計測"""
+    with span("http.request", method=request.method, route=request.url.path) as current:
+        response = await call_next(request)
+        if current is not None:
+            current.set_attribute("status_code", response.status_code)
+        return response
+
+
+# トレースが無効な場合はミドルウェアを追加しない（リクエストごとのオーバーヘッドなし）
+if tracing_enabled():
+    app.middleware("http")(trace_requests)
+
+# CPUプロファイルの取得（MCP_ENABLE_PROFILING=true の場合のみエンドポイントを公開）
+PROFILING_ENABLED = os.getenv("MCP_ENABLE_PROFILING", "false").lower() == "true"
+profiler = CPUProfiler(max_seconds=float(os.getenv("MCP_PROFILE_MAX_SECONDS", "60")))
+
+
+async def capture_profile(
+    seconds: float = 10.0,
+    sort: str = "cumulative",
+    limit: int = 50,
+    format: str = "text"
+):
+    """指定秒数の間CPUプロファイルを取得
+
+    format=text は上位の関数の表、format=pstats は pstats 形式のファイルを返します。
+    """
+    try:
+        if format == "pstats":
+            data = await profiler.capture_raw(seconds)
+            return Response(
+                content=data,
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": 'attachment; filename="profile.pstats"'}
+            )
+        if format != "text":
+            raise ValueError(f"Unsupported format: {format}. Supported: text, pstats")
+        return PlainTextResponse(await profiler.capture_text(seconds, sort, limit))
+    except ProfileInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+if PROFILING_ENABLED:
+    app.get("/debug/profile")(capture_profile)
 
 
 # リクエストモデル
 class DocumentRequest(BaseModel):
     path: str
     encoding: str = "utf-8"
+    root: Optional[str] = None
+
+
+class LinesRequest(BaseModel):
+    path: str
+    start_line: int = 1
+    end_line: Optional[int] = None
+    encoding: str = "utf-8"
+    root: Optional[str] = None
 
 
 class ListRequest(BaseModel):
     directory: str = "."
     pattern: str = "*"
+    details: bool = False  # サイズ・行数・トークン数・タイトル・要約を含める
+    encoding: str = "utf-8"
+    limit: Optional[int] = None  # 1以上の場合は1ページ分のみ返す（0以下はすべて、details とは併用不可）
+    cursor: Optional[str] = None  # 前のページの next_cursor
+    root: Optional[str] = None
+
+
+class TreeRequest(BaseModel):
+    directory: str = "."
+    depth: int = 1  # サブディレクトリを展開する階層数
+    root: Optional[str] = None
 
 
 class SearchRequest(BaseModel):
     path: str
     keyword: str
     encoding: str = "utf-8"
+    root: Optional[str] = None
+
+
+class DirectorySearchRequest(BaseModel):
+    keyword: str
+    directory: str = "."
+    pattern: str = "**/*"
+    encoding: str = "utf-8"
+    max_matches_per_file: int = 20
+    max_total_matches: int = 500
+    timeout: float = 10.0
+    root: Optional[str] = None
+
+
+class SemanticSearchRequest(BaseModel):
+    query: str
+    top_k: int = 5
+    directory: str = "."
+    encoding: str = "utf-8"
+    root: Optional[str] = None
 
 
 # エンドポイント
@@ -54,8 +265,18 @@ async def root():
         "version": "0.1.0",
         "endpoints": {
             "list": "/api/list",
+            "tree": "/api/tree",
             "get": "/api/document",
-            "search": "/api/search"
+            "stream": "/api/document/stream",
+            "lines": "/api/document/lines",
+            "search": "/api/search",
+            "search_directory": "/api/search_directory",
+            "search_directory_stream": "/api/search_directory/stream",
+            "semantic_search": "/api/semantic_search",
+            "roots": "/api/roots",
+            "status": "/api/status",
+            "liveness": "/livez",
+            "readiness": "/readyz"
         }
     }
 
@@ -63,62 +284,322 @@ async def root():
 @app.get("/health")
 async def health():
     """ヘルスチェック"""
-    return {"status": "ok", "docs_dir": DOCS_DIR}
+    return {"status": "ok", "docs_dir": DOCS_DIR, "ready": roots.status()["ready"]}
+
+
+@app.get("/livez")
+async def livez():
+    """生存確認（プロセスとイベントループが応答しているか）"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """準備状態の確認
+
+    起動時の索引作成・先読みが終わるまでは503を返します。
+    ロードバランサーはウォームアップが終わったインスタンスにのみ振り分けられます。
+    """
+    status = roots.status()
+    return JSONResponse(
+        status_code=200 if status["ready"] else 503,
+        content={"status": "ready" if status["ready"] else "warming_up", **status}
+    )
+
+
+@app.get("/api/status")
+async def server_status():
+    """準備状態・起動時の処理の進捗・メモリ使用量・アドミッション制御の状態"""
+    return {"success": True, **roots.status(), "admission": admission.stats()}
 
 
 @app.post("/api/list")
-async def list_documents(request: ListRequest):
+async def list_documents(request: ListRequest, http_request: Request):
     """ドキュメント一覧を取得"""
-    try:
-        files = doc_tools.list_documents(request.directory, request.pattern)
-        return {"success": True, "files": files, "count": len(files)}
-    except Exception as e:
-        logger.error(f"Error listing documents: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # メタデータを含める場合はカタログの更新で配下のファイルを1つずつ読み込む
+    cost = await read_cost(request.root, request.directory) if request.details else 0
+    async with admitted(http_request, cost):
+        try:
+            tools = roots.get(request.root)
+            limit = request.limit or 0
+            if limit > 0 or request.cursor:
+                if request.details:
+                    raise ValueError("details cannot be combined with limit/cursor")
+                page = await tools.list_documents_page(
+                    request.directory, request.pattern, request.cursor,
+                    limit if limit > 0 else LISTING_PAGE_SIZE
+                )
+                return {
+                    "success": True,
+                    "files": page.paths,
+                    "count": len(page.paths),
+                    "next_cursor": page.next_cursor,
+                }
+            if request.details:
+                infos = await tools.describe_documents(
+                    request.directory, request.pattern, request.encoding
+                )
+                files = [info.to_dict() for info in infos]
+            else:
+                files = tools.list_documents(request.directory, request.pattern)
+            return {"success": True, "files": files, "count": len(files)}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error listing documents: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/tree")
+async def list_tree(request: TreeRequest, http_request: Request):
+    """ディレクトリごとのファイル数・合計サイズ・最終更新時刻を取得"""
+    async with admitted(http_request):
+        try:
+            if request.depth < 0:
+                raise ValueError("depth must not be negative")
+            node = await roots.get(request.root).list_tree(request.directory)
+            return {"success": True, "tree": node.to_dict(request.depth)}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error listing tree: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/document")
-async def get_document(request: DocumentRequest):
+async def get_document(request: DocumentRequest, http_request: Request):
     """ドキュメントを取得"""
+    async with admitted(http_request, estimate_cost(request.path, request.root)):
+        try:
+            content = await roots.get(request.root).get_document(
+                request.path, request.encoding
+            )
+            # JSONへのシリアライズも確保した枠の中で行う
+            return JSONResponse({
+                "success": True,
+                "path": request.path,
+                "content": content,
+                "length": len(content)
+            })
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=f"Document not found: {request.path}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error getting document: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/document/stream")
+async def stream_document(request: DocumentRequest, http_request: Request):
+    """ドキュメントを分割して取得（ストリーミング）
+
+    ドキュメント全体をJSONに詰めずに、読み込んだ順にそのまま返します。
+    アドミッション制御の枠はレスポンスの送信が終わるまで保持します。
+    """
+    slot = AsyncExitStack()
+    await slot.enter_async_context(
+        admitted(http_request, STREAM_CHUNK_SIZE * MEMORY_COST_FACTOR)
+    )
+
     try:
-        content = await doc_tools.get_document(request.path, request.encoding)
-        return {
-            "success": True,
-            "path": request.path,
-            "content": content,
-            "length": len(content)
-        }
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=f"Document not found: {request.path}")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error getting document: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        try:
+            chunks = roots.get(request.root).stream_document(
+                request.path, request.encoding, chunk_size=STREAM_CHUNK_SIZE
+            )
+            # レスポンス開始前にエラーを検出するため最初の断片を先読み
+            first = await anext(chunks, "")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Document not found: {request.path}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error streaming document: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+    except BaseException:
+        await slot.aclose()
+        raise
+
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return AdmittedStreamingResponse(slot, body(), media_type="text/plain; charset=utf-8")
+
+
+@app.post("/api/document/lines")
+async def get_document_lines(request: LinesRequest, http_request: Request):
+    """ドキュメントの指定範囲の行を取得"""
+    async with admitted(http_request, estimate_cost(request.path, request.root)):
+        try:
+            content = await roots.get(request.root).get_document_lines(
+                request.path, request.start_line, request.end_line, request.encoding
+            )
+            return JSONResponse({
+                "success": True,
+                "path": request.path,
+                "start_line": request.start_line,
+                "content": content
+            })
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Document not found: {request.path}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error getting document lines: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/search")
-async def search_in_document(request: SearchRequest):
+async def search_in_document(request: SearchRequest, http_request: Request):
     """ドキュメント内を検索"""
+    async with admitted(http_request, estimate_cost(request.path, request.root)):
+        try:
+            result = await roots.get(request.root).search_in_document(
+                request.path,
+                request.keyword,
+                request.encoding
+            )
+            return {
+                "success": True,
+                "path": request.path,
+                "keyword": request.keyword,
+                "result": result
+            }
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=f"Document not found: {request.path}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error searching document: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+def start_directory_search(request: DirectorySearchRequest):
+    """ディレクトリ検索を開始（入力エラーは HTTPException に変換）"""
     try:
-        result = await doc_tools.search_in_document(
-            request.path,
+        return roots.get(request.root).directory_search(
             request.keyword,
-            request.encoding
+            request.directory,
+            request.pattern,
+            request.encoding,
+            max_matches_per_file=request.max_matches_per_file,
+            max_total_matches=request.max_total_matches,
+            timeout=request.timeout
         )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def file_matches_to_dict(result: FileMatches) -> dict:
+    """1ファイル分の検索結果をJSON用に変換"""
+    return {
+        "path": result.path,
+        "matches": [{"line": line_num, "text": line} for line_num, line in result.matches],
+        "truncated": result.truncated
+    }
+
+
+def directory_search_summary(search: DirectorySearch) -> dict:
+    """ディレクトリ検索の集計（打ち切りの有無・検索したファイル数等）"""
+    return {
+        "truncated": search.truncated,
+        "scanned": search.scanned,
+        "total_files": len(search.paths),
+        "match_count": search.match_count
+    }
+
+
+async def directory_search_cost(request: DirectorySearchRequest) -> int:
+    """ディレクトリ検索のメモリ使用量を見積もる
+
+    バイト列のまま検索できないファイル（ASCII以外のキーワード・shift_jis 等・単独の "\r" を
+    含むファイル）は全体をデコードして casefold するため、同時に検索するファイルが
+    すべて配下で最大のファイルの場合を見積もります。
+    """
+    try:
+        workers = roots.get(request.root).search_workers
+    except ValueError:
+        return 0
+    return await read_cost(request.root, request.directory, workers)
+
+
+@app.post("/api/search_directory")
+async def search_directory(request: DirectorySearchRequest, http_request: Request):
+    """ディレクトリ内の複数ドキュメントを検索"""
+    async with admitted(http_request, await directory_search_cost(request)):
+        search = start_directory_search(request)
+        try:
+            results = await search.collect()
+        except Exception as e:
+            logger.error(f"Error searching directory: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
         return {
             "success": True,
-            "path": request.path,
             "keyword": request.keyword,
-            "result": result
+            "results": [file_matches_to_dict(result) for result in results],
+            **directory_search_summary(search)
         }
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=f"Document not found: {request.path}")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error searching document: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/search_directory/stream")
+async def stream_directory_search(request: DirectorySearchRequest, http_request: Request):
+    """ディレクトリ内の複数ドキュメントを検索（ストリーミング）
+
+    検索が完了したファイルから順に1行1ファイルのJSON（NDJSON）で返し、
+    最後の行に打ち切りの有無等の集計を返します。
+    """
+    slot = AsyncExitStack()
+    await slot.enter_async_context(
+        admitted(http_request, await directory_search_cost(request))
+    )
+    try:
+        search = start_directory_search(request)
+    except BaseException:
+        await slot.aclose()
+        raise
+
+    async def body():
+        async for result in search:
+            yield json.dumps(file_matches_to_dict(result), ensure_ascii=False) + "\n"
+        yield json.dumps({"summary": directory_search_summary(search)}) + "\n"
+
+    return AdmittedStreamingResponse(slot, body(), media_type="application/x-ndjson")
+
+
+@app.post("/api/semantic_search")
+async def semantic_search(request: SemanticSearchRequest, http_request: Request):
+    """意味的に近いセクションを検索"""
+    async with admitted(http_request, await semantic_search_cost(request)):
+        try:
+            result = await roots.semantic_search(
+                request.query,
+                request.top_k,
+                request.directory,
+                request.encoding,
+                root=request.root
+            )
+            return {
+                "success": True,
+                "query": request.query,
+                "result": result
+            }
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error in semantic search: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/roots")
+async def list_roots():
+    """ドキュメントルートの一覧を取得"""
+    return {"success": True, "roots": roots.describe()}
 
 
 if __name__ == "__main__":
@@ -126,7 +607,8 @@ if __name__ == "__main__":
 
     logger.info("=" * 60)
     logger.info("Starting MCP Document Server HTTP API")
-    logger.info(f"Documents directory: {DOCS_DIR}")
+    for config in ROOT_CONFIGS:
+        logger.info(f"Document root '{config.name}': {config.path}")
     logger.info("=" * 60)
 
     uvicorn.run(
@@ -1,8 +1,21 @@
 """安全なファイルハンドラー - パストラバーサル攻撃対策"""
 
+import asyncio
+import os
+import threading
 import aiofiles
+from array import array
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from stat import S_IFMT, S_ISDIR, S_ISREG
+from typing import AsyncIterator, Optional
+from mcp_server.resources.mapped import MappedFile, normalize_newlines
+from mcp_server.utils.tracing import span
+
+
+def _identity(path_stat: os.stat_result) -> tuple[int, ...]:
+    """ファイルの識別子（同じパスが別のファイルに置き換えられたことの検出用）"""
+    return (path_stat.st_dev, path_stat.st_ino, S_IFMT(path_stat.st_mode), path_stat.st_ctime_ns)
 
 
 class SafeFileHandler:
@@ -10,6 +23,7 @@ class SafeFileHandler:
 
     Args:
         base_dir: 基準ディレクトリ（このディレクトリ外へのアクセスを防止）
+        mmap_threshold: このサイズ（バイト）以上のファイルはメモリマップで読み込む
 
     Example:
         >>> handler = SafeFileHandler("/home/user/documents")
@@ -17,8 +31,19 @@ class SafeFileHandler:
         >>> content = await handler.read("../etc/passwd")  # ValueError
     """
 
-    def __init__(self, base_dir: str):
+    def __init__(
+        self,
+        base_dir: str,
+        mmap_threshold: int = 1024 * 1024,
+        resolve_cache_size: int = 4096
+    ):
         self.base_path = Path(base_dir).resolve()
+        self.mmap_threshold = mmap_threshold
+        self.resolve_cache_size = resolve_cache_size
+        # 検証済みのパス解決結果（相対パス → (絶対パス, ファイルの識別子)）のLRUキャッシュ
+        # （ワーカースレッドからも使うためロックで保護）
+        self._resolved: "OrderedDict[str, tuple[Path, tuple[int, ...]]]" = OrderedDict()
+        self._resolved_lock = threading.Lock()
 
         if not self.base_path.exists():
             raise ValueError(f"Base directory does not exist: {base_dir}")
@@ -26,62 +51,199 @@ class SafeFileHandler:
         if not self.base_path.is_dir():
             raise ValueError(f"Base path is not a directory: {base_dir}")
 
-    async def read(
-        self,
-        relative_path: str,
-        encoding: str = "utf-8",
-        max_size: Optional[int] = None
-    ) -> str:
-        """ファイルを安全に読み込む
+    @property
+    def resolved_count(self) -> int:
+        """キャッシュしているパス解決の件数"""
+        return len(self._resolved)
+
+    def invalidate(self, relative_path: Optional[str] = None) -> None:
+        """パス解決のキャッシュを破棄
 
         Args:
-            relative_path: 基準ディレクトリからの相対パス
-            encoding: ファイルエンコーディング（デフォルト: utf-8）
-            max_size: 最大ファイルサイズ（バイト）。Noneの場合は制限なし
+            relative_path: 破棄する相対パス。Noneの場合はすべて破棄
+        """
+        with self._resolved_lock:
+            if relative_path is None:
+                self._resolved.clear()
+            else:
+                self._resolved.pop(relative_path, None)
+
+    def _resolve_path(self, relative_path: str) -> Path:
+        """相対パスを絶対パスに解決し、基準ディレクトリ外へのアクセスを拒否
+
+        Raises:
+            ValueError: パストラバーサル攻撃を検出した場合
+        """
+        return self._resolve(relative_path)[0]
+
+    def _resolve(self, relative_path: str) -> tuple[Path, Optional[os.stat_result]]:
+        """相対パスを検証済みの絶対パスに解決し、その lstat 結果とともに返す
+
+        存在するパスの解決結果（シンボリックリンクをたどった後のパス）は、ファイルの
+        識別子（デバイス番号・inode番号・種類・ctime）とともにキャッシュします。
+        キャッシュを使う場合は呼び出し側でも必要な lstat（1回のシステムコール）で
+        識別子が同じことを確認し、途中のディレクトリや末尾がシンボリックリンクに
+        置き換えられて別のファイルを指している場合は解決し直して再検証します
+        （削除後に再利用された inode 番号は ctime の違いで区別します）。
 
         Returns:
-            ファイル内容
+            (絶対パス, lstat 結果。パスが存在しない場合はNone)
 
         Raises:
             ValueError: パストラバーサル攻撃を検出した場合
-            FileNotFoundError: ファイルが存在しない場合
-            RuntimeError: ファイルサイズが制限を超える場合
         """
+        with self._resolved_lock:
+            cached = self._resolved.get(relative_path)
+        if cached is not None:
+            full_path, identity = cached
+            try:
+                path_stat = os.lstat(full_path)
+            except OSError:
+                path_stat = None
+            if path_stat is not None and _identity(path_stat) == identity:
+                with self._resolved_lock:
+                    if relative_path in self._resolved:
+                        self._resolved.move_to_end(relative_path)
+                return full_path, path_stat
+            self.invalidate(relative_path)
+
         # 絶対パスを解決
         full_path = (self.base_path / relative_path).resolve()
 
-        # パストラバーサルチェック
-        if not str(full_path).startswith(str(self.base_path)):
+        # パストラバーサルチェック（"/docs-evil" を "/docs" の配下と誤判定しないようパス単位で比較）
+        if not full_path.is_relative_to(self.base_path):
             raise ValueError(
                 f"Access denied: Path traversal detected for '{relative_path}'"
             )
 
-        # 存在チェック
-        if not full_path.exists():
+        try:
+            path_stat = os.lstat(full_path)
+        except OSError:
+            # 存在しないパスはキャッシュしない
+            return full_path, None
+
+        if self.resolve_cache_size > 0:
+            with self._resolved_lock:
+                self._resolved[relative_path] = (full_path, _identity(path_stat))
+                if len(self._resolved) > self.resolve_cache_size:
+                    self._resolved.popitem(last=False)
+        return full_path, path_stat
+
+    def contains(self, path: "str | Path") -> bool:
+        """パス（リンクをたどった後の実パス）が基準ディレクトリ内かどうか"""
+        return Path(os.path.realpath(path)).is_relative_to(self.base_path)
+
+    def normalize(self, relative_path: str) -> str:
+        """相対パスを正規化（"a/../b/" → "b"、基準ディレクトリは "."）
+
+        Raises:
+            ValueError: パストラバーサル攻撃を検出した場合
+        """
+        full_path = self._resolve_path(relative_path)
+        return full_path.relative_to(self.base_path).as_posix()
+
+    def _resolve_file(
+        self,
+        relative_path: str,
+        max_size: Optional[int] = None
+    ) -> tuple[Path, os.stat_result]:
+        """相対パスを検証済みのファイルパスに解決
+
+        存在・種類・サイズの確認は1回の stat で行います。
+
+        Args:
+            relative_path: 基準ディレクトリからの相対パス
+            max_size: 最大ファイルサイズ（バイト）。Noneの場合は制限なし
+
+        Returns:
+            (ファイルの絶対パス, stat 結果)
+
+        Raises:
+            ValueError: パストラバーサル攻撃を検出した場合
+            FileNotFoundError: ファイルが存在しない場合
+            RuntimeError: ファイルサイズが制限を超える場合
+        """
+        # 存在チェック（検証後にリンクに置き換えられた場合は通常のファイルとして扱わないよう lstat）
+        full_path, file_stat = self._resolve(relative_path)
+        if file_stat is None:
             raise FileNotFoundError(
                 f"File not found: {relative_path}"
             )
 
         # ファイルチェック（ディレクトリ読み込み防止）
-        if not full_path.is_file():
+        if not S_ISREG(file_stat.st_mode):
             raise ValueError(
                 f"Path is not a file: {relative_path}"
             )
 
         # サイズチェック
-        if max_size is not None:
-            file_size = full_path.stat().st_size
-            if file_size > max_size:
-                raise RuntimeError(
-                    f"File too large: {file_size} bytes "
-                    f"(max: {max_size} bytes)"
-                )
+        if max_size is not None and file_stat.st_size > max_size:
+            raise RuntimeError(
+                f"File too large: {file_stat.st_size} bytes "
+                f"(max: {max_size} bytes)"
+            )
+
+        return full_path, file_stat
+
+    def stat(self, relative_path: str) -> os.stat_result:
+        """ファイルの状態を取得（検証は read() と同じ）
+
+        Args:
+            relative_path: 基準ディレクトリからの相対パス
+
+        Returns:
+            ファイルの stat 結果
+        """
+        with span("file_handler.resolve", path=relative_path):
+            return self._resolve_file(relative_path)[1]
+
+    def file_size(self, relative_path: str) -> int:
+        """ファイルサイズを取得（検証は read() と同じ）
+
+        Args:
+            relative_path: 基準ディレクトリからの相対パス
+
+        Returns:
+            ファイルサイズ（バイト）
+        """
+        return self.stat(relative_path).st_size
+
+    async def read(
+        self,
+        relative_path: str,
+        encoding: str = "utf-8",
+        max_size: Optional[int] = None
+    ) -> str:
+        """ファイルを安全に読み込む
+
+        Args:
+            relative_path: 基準ディレクトリからの相対パス
+            encoding: ファイルエンコーディング（デフォルト: utf-8）
+            max_size: 最大ファイルサイズ（バイト）。Noneの場合は制限なし
+
+        Returns:
+            ファイル内容
+
+        Raises:
+            ValueError: パストラバーサル攻撃を検出した場合
+            FileNotFoundError: ファイルが存在しない場合
+            RuntimeError: ファイルサイズが制限を超える場合
+        """
+        with span("file_handler.resolve", path=relative_path):
+            full_path, file_stat = self._resolve_file(relative_path, max_size)
 
         # ファイル読み込み
         try:
-            async with aiofiles.open(full_path, 'r', encoding=encoding) as f:
-                content = await f.read()
-            return content
+            if file_stat.st_size >= self.mmap_threshold:
+                # 大きなファイルはマップしたバッファから直接デコード（1回のスレッド切り替えで完了）
+                return await asyncio.to_thread(self._read_mapped, full_path, encoding)
+
+            # 読み込みとデコードの時間を分けて計測できるようにバイト列で読み込む
+            with span("file_handler.io", bytes=file_stat.st_size):
+                async with aiofiles.open(full_path, 'rb') as f:
+                    data = await f.read()
+            with span("file_handler.decode", encoding=encoding):
+                return normalize_newlines(data.decode(encoding))
         except UnicodeDecodeError as e:
             raise RuntimeError(
                 f"Failed to decode file with encoding '{encoding}': {e}"
@@ -89,6 +251,70 @@ class SafeFileHandler:
         except Exception as e:
             raise RuntimeError(f"Failed to read file: {e}")
 
+    @staticmethod
+    def _read_mapped(full_path: Path, encoding: str) -> str:
+        with span("file_handler.mmap_decode", encoding=encoding), MappedFile(full_path) as mapped:
+            return normalize_newlines(mapped.decode(0, mapped.size, encoding))
+
+    def open_mapped(
+        self,
+        relative_path: str,
+        max_size: Optional[int] = None,
+        line_starts: Optional[array] = None
+    ) -> MappedFile:
+        """ファイルをメモリマップで開く（検証は read() と同じ）
+
+        呼び出し側で close() するか、with 文で使用してください。
+
+        Args:
+            relative_path: 基準ディレクトリからの相対パス
+            max_size: 最大ファイルサイズ（バイト）。Noneの場合は制限なし
+            line_starts: 計算済みの行開始位置（再利用する場合）
+
+        Returns:
+            メモリマップされたファイル
+        """
+        full_path, _ = self._resolve_file(relative_path, max_size)
+        try:
+            return MappedFile(full_path, line_starts)
+        except OSError as e:
+            raise RuntimeError(f"Failed to map file: {e}")
+
+    async def iter_chunks(
+        self,
+        relative_path: str,
+        encoding: str = "utf-8",
+        max_size: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[str]:
+        """ファイルを分割して安全に読み込む
+
+        ファイル全体を1つの文字列にせず、chunk_size 文字ずつ返します。
+        検証内容とエラーは read() と同じです。
+
+        Args:
+            relative_path: 基準ディレクトリからの相対パス
+            encoding: ファイルエンコーディング（デフォルト: utf-8）
+            max_size: 最大ファイルサイズ（バイト）。Noneの場合は制限なし
+            chunk_size: 1回に返す最大文字数
+
+        Yields:
+            ファイル内容の断片
+        """
+        full_path, _ = self._resolve_file(relative_path, max_size)
+
+        try:
+            async with aiofiles.open(full_path, 'r', encoding=encoding) as f:
+                while True:
+                    chunk = await f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        except UnicodeDecodeError as e:
+            raise RuntimeError(
+                f"Failed to decode file with encoding '{encoding}': {e}"
+            )
+
     def list_files(
         self,
         relative_dir: str = ".",
@@ -107,22 +333,14 @@ class SafeFileHandler:
             ValueError: パストラバーサル攻撃を検出した場合
             FileNotFoundError: ディレクトリが存在しない場合
         """
-        # 絶対パスを解決
-        full_dir = (self.base_path / relative_dir).resolve()
-
-        # パストラバーサルチェック
-        if not str(full_dir).startswith(str(self.base_path)):
-            raise ValueError(
-                f"Access denied: Path traversal detected for '{relative_dir}'"
-            )
-
-        # 存在チェック
-        if not full_dir.exists():
+        # 絶対パスを解決（パストラバーサルチェックと、1回の lstat による存在・種類の確認）
+        full_dir, dir_stat = self._resolve(relative_dir)
+        if dir_stat is None:
             raise FileNotFoundError(
                 f"Directory not found: {relative_dir}"
             )
 
-        if not full_dir.is_dir():
+        if not S_ISDIR(dir_stat.st_mode):
             raise ValueError(
                 f"Path is not a directory: {relative_dir}"
             )
@@ -130,7 +348,10 @@ class SafeFileHandler:
         # ファイルリスト取得
         files = []
         for file_path in full_dir.glob(pattern):
-            if file_path.is_file():
+            # 基準ディレクトリ外を指すシンボリックリンクは読み込めないため含めない
+            if file_path.is_file() and (
+                not file_path.is_symlink() or self.contains(file_path)
+            ):
                 # 基準ディレクトリからの相対パスを計算
                 rel_path = file_path.relative_to(self.base_path)
                 files.append(str(rel_path))
@@ -0,0 +1,149 @@
+"""メモリマップによる大きなファイルの読み込み"""
+
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+def find_line_starts(buffer, newline=b"\n") -> array:
+    """各行の開始位置（str の場合は文字位置、bytes/mmap の場合はバイト位置）
+
+    1回の find ループで計算し、行ごとの文字列は作成しません。
+    """
+    starts = array("q", [0])
+    find = buffer.find
+    pos = find(newline)
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = find(newline, pos + 1)
+    return starts
+
+
+def normalize_newlines(text: str) -> str:
+    """改行を "\n" に統一（テキストモードでの読み込みと同じ結果にする）"""
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class MappedFile:
+    """メモリマップされたファイル
+
+    ファイル内容をコピーせずにバイト列として参照し、
+    行の開始位置の索引作成・検索・範囲の切り出しを行います。
+    デコードは必要な範囲に対してのみ行います。
+
+    行区切りは b"\\n" で判定します。サポートしているエンコーディング
+    （utf-8, shift_jis, euc-jp, cp932）ではマルチバイト文字の一部に
+    0x0A が現れないため、デコードせずに行を分割できます。
+
+    Args:
+        path: ファイルの絶対パス
+        line_starts: 計算済みの行開始位置（再利用する場合）
+
+    Example:
+        >>> with MappedFile(path) as mapped:
+        ...     text = mapped.read_lines(100, 120, "utf-8")
+    """
+
+    def __init__(self, path: Path, line_starts: Optional[array] = None):
+        self._file = open(path, "rb")
+        self.size = self._file.seek(0, 2)
+        # 空ファイルはマップできないため空のバッファで代用
+        self._buffer = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size else b""
+        )
+        self._line_starts = line_starts
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    @property
+    def line_starts(self) -> array:
+        """各行の開始バイト位置（初回参照時に計算）"""
+        if self._line_starts is None:
+            self._line_starts = find_line_starts(self._buffer)
+        return self._line_starts
+
+    @property
+    def line_count(self) -> int:
+        """行数（str.split("\\n") と同じ数え方）"""
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """バイト位置を含む行番号（1始まり）"""
+        return bisect_right(self.line_starts, offset)
+
+    def _line_end(self, line_num: int) -> int:
+        """行末（改行を含まない）のバイト位置"""
+        starts = self.line_starts
+        return starts[line_num] - 1 if line_num < len(starts) else self.size
+
+    def decode(self, start: int, end: int, encoding: str) -> str:
+        """指定範囲のみデコード"""
+        with memoryview(self._buffer) as view:
+            return str(view[start:end], encoding)
+
+    def read_lines(self, start_line: int, end_line: int, encoding: str) -> str:
+        """指定範囲の行をデコードして取得
+
+        Args:
+            start_line: 開始行（1始まり、この行を含む）
+            end_line: 終了行（この行を含む）
+            encoding: ファイルエンコーディング
+
+        Returns:
+            該当行の内容（改行区切り）
+        """
+        starts = self.line_starts
+        start_line = max(start_line, 1)
+        end_line = min(end_line, len(starts))
+        if start_line > end_line:
+            return ""
+        text = self.decode(starts[start_line - 1], self._line_end(end_line), encoding)
+        return normalize_newlines(text)
+
+    def contains(self, pattern: "re.Pattern[bytes]") -> bool:
+        """パターンに一致する箇所があるか"""
+        return pattern.search(self._buffer) is not None
+
+    def iter_matching_lines(
+        self,
+        pattern: "re.Pattern[bytes]",
+        encoding: str
+    ) -> Iterator[tuple[int, str]]:
+        """パターンに一致する行を順に返す（1行につき1回）
+
+        ファイル全体をデコードせず、一致した行のみデコードします。
+
+        Args:
+            pattern: バイト列の正規表現
+            encoding: ファイルエンコーディング
+
+        Yields:
+            (行番号, 行の内容（改行を含まない）)
+        """
+        buffer = self._buffer
+        pos = 0
+        while True:
+            match = pattern.search(buffer, pos)
+            if match is None:
+                return
+            line_num = self.line_of(match.start())
+            line_end = self._line_end(line_num)
+            line = self.decode(self.line_starts[line_num - 1], line_end, encoding)
+            yield line_num, line[:-1] if line.endswith("\r") else line
+            # 同じ行の2回目以降の一致は飛ばす
+            pos = line_end + 1
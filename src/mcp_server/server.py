@@ -1,39 +1,121 @@
 """MCP Document Server - メインサーバー実装"""
 
+import asyncio
+import json
 import os
-from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Optional
 from mcp.server.fastmcp import FastMCP
-from mcp_server.tools.document import DocumentTools
+from mcp_server.config import load_root_configs
 from mcp_server.utils.logging import setup_logging
+from mcp_server.utils.tracing import span
+
+if TYPE_CHECKING:
+    from mcp_server.tools.document import DocumentTools
+    from mcp_server.tools.roots import DocumentRoots
 
 # ロギング設定
 logger = setup_logging(__name__)
 
-# MCPサーバーインスタンス作成
-mcp = FastMCP("document-server")
+# トランスポート設定
+# stdio: クライアントごとにプロセスを起動（デフォルト）
+# streamable-http / sse: 1つの常駐プロセスで複数のエージェントセッションを処理
+TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+SUPPORTED_TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+# ドキュメントルートの設定
+# MCP_DOCS_ROOTS（JSON）で複数ルートを指定、なければ MCP_DOCS_DIR を "default" ルートとして使用
+ROOT_CONFIGS = load_root_configs()
+DOCS_DIR = ROOT_CONFIGS[0].path
+
+# DocumentRootsインスタンス（最初のツール呼び出し時に作成）
+# STDIOモードではセッションごとにプロセスが起動するため、起動時の処理を最小限にする
+_roots: Optional["DocumentRoots"] = None
+
+
+def get_roots() -> "DocumentRoots":
+    """DocumentRootsインスタンスを取得（初回呼び出し時に作成）"""
+    global _roots
+    if _roots is None:
+        from mcp_server.tools.roots import DocumentRoots
+
+        try:
+            # ディレクトリが存在しない場合は作成
+            _roots = DocumentRoots(
+                ROOT_CONFIGS,
+                embedder=os.getenv("MCP_EMBEDDER"),
+                create_dirs=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize document roots: {e}")
+            raise
+    return _roots
+
+
+def get_doc_tools(root: str = "") -> "DocumentTools":
+    """ルートの DocumentTools を取得（空文字の場合は既定のルート）"""
+    return get_roots().get(root)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """索引の作成・定期更新が必要なルートのバックグラウンド処理を開始
+
+    処理の完了は待たないため、セッションの開始は遅れません。
+    FastMCP はセッション（ステートレスモードではリクエスト）ごとに呼び出すため、
+    ここでは開始のみ行い（2回目以降は何もしない）、停止はプロセスの終了時に
+    run_background() で行います。
+    """
+    if any(config.needs_background for config in ROOT_CONFIGS):
+        await get_roots().start()
+    yield
+
+
+@asynccontextmanager
+async def run_background() -> AsyncIterator[None]:
+    """プロセスの実行中はバックグラウンド処理を続け、終了時に停止してアクセス頻度を保存
+
+    アクセス頻度は実行中も先読みの間隔ごとに保存し、終了時に残りを保存します
+    （短いSTDIOセッションでも次回の起動時に先読みできるようにするため）。
+    """
+    if any(config.needs_background for config in ROOT_CONFIGS):
+        await get_roots().start()
+    try:
+        yield
+    finally:
+        if _roots is not None:
+            await _roots.stop()
+
 
-# ドキュメントディレクトリの設定
-# 環境変数から取得、なければカレントディレクトリ/docs
-DOCS_DIR = os.getenv("MCP_DOCS_DIR", str(Path.cwd() / "docs"))
+async def serve(transport: str) -> None:
+    """指定されたトランスポートでサーバーを実行"""
+    async with run_background():
+        if transport == "stdio":
+            await mcp.run_stdio_async()
+        elif transport == "sse":
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_streamable_http_async()
 
-# DocumentToolsインスタンス作成
-try:
-    # ディレクトリが存在しない場合は作成
-    Path(DOCS_DIR).mkdir(parents=True, exist_ok=True)
-    doc_tools = DocumentTools(DOCS_DIR)
-    logger.info(f"DocumentTools initialized with directory: {DOCS_DIR}")
-except Exception as e:
-    logger.error(f"Failed to initialize DocumentTools: {e}")
-    raise
+
+# MCPサーバーインスタンス作成
+mcp = FastMCP(
+    "document-server",
+    host=os.getenv("MCP_HOST", "127.0.0.1"),
+    port=int(os.getenv("MCP_PORT", "8000")),
+    stateless_http=os.getenv("MCP_STATELESS_HTTP", "false").lower() == "true",
+    lifespan=lifespan
+)
 
 
 @mcp.tool()
-async def get_document(path: str, encoding: str = "utf-8") -> str:
+async def get_document(path: str, encoding: str = "utf-8", root: str = "") -> str:
     """指定されたドキュメントを取得
 
     Args:
         path: ドキュメントの相対パス（例: "README.md", "guides/setup.md"）
         encoding: ファイルエンコーディング（デフォルト: utf-8）
+        root: ドキュメントルート名（デフォルト: 既定のルート。list_roots で確認）
 
     Returns:
         ドキュメントの内容
@@ -42,9 +124,12 @@ async def get_document(path: str, encoding: str = "utf-8") -> str:
         >>> content = await get_document("README.md")
         >>> content = await get_document("docs/api.md", encoding="utf-8")
     """
-    logger.debug(f"Tool call: get_document(path={path}, encoding={encoding})")
+    logger.debug(
+        f"Tool call: get_document(path={path}, encoding={encoding}, root={root})"
+    )
     try:
-        return await doc_tools.get_document(path, encoding)
+        with span("mcp.tool", tool="get_document", root=root):
+            return await get_doc_tools(root).get_document(path, encoding)
     except Exception as e:
         error_msg = f"Error getting document: {str(e)}"
         logger.error(error_msg)
@@ -52,38 +137,179 @@ async def get_document(path: str, encoding: str = "utf-8") -> str:
 
 
 @mcp.tool()
-def list_documents(directory: str = ".", pattern: str = "*") -> str:
+async def get_document_lines(
+    path: str,
+    start_line: int,
+    end_line: int = 0,
+    encoding: str = "utf-8",
+    root: str = ""
+) -> str:
+    """ドキュメントの指定範囲の行を取得
+
+    大きなドキュメントの一部だけを読む場合に使います（search_in_document の行番号と対応）。
+
+    Args:
+        path: ドキュメントの相対パス
+        start_line: 開始行（1始まり、この行を含む）
+        end_line: 終了行（この行を含む）（デフォルト: 0 = 最終行まで）
+        encoding: ファイルエンコーディング（デフォルト: utf-8）
+        root: ドキュメントルート名（デフォルト: 既定のルート）
+
+    Returns:
+        該当行の内容
+
+    Example:
+        >>> section = await get_document_lines("logs/app.log", 1200, 1250)
+    """
+    logger.debug(
+        f"Tool call: get_document_lines(path={path}, start_line={start_line}, "
+        f"end_line={end_line}, encoding={encoding}, root={root})"
+    )
+    try:
+        with span("mcp.tool", tool="get_document_lines", root=root):
+            return await get_doc_tools(root).get_document_lines(
+                path, start_line, end_line or None, encoding
+            )
+    except Exception as e:
+        error_msg = f"Error getting document lines: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+@mcp.tool()
+async def list_documents(
+    directory: str = ".",
+    pattern: str = "*",
+    root: str = "",
+    limit: int = 0,
+    cursor: str = ""
+) -> str:
     """利用可能なドキュメントのリストを取得
 
+    limit を指定すると limit 件ずつ返し、続きがある場合は末尾にカーソルを表示します。
+    ディレクトリごとの件数・サイズを先に確認したい場合は browse_documents を使います。
+
     Args:
         directory: 検索するディレクトリ（デフォルト: "."）
-        pattern: ファイル名パターン（例: "*.md", "*.txt"）（デフォルト: "*"）
+        pattern: ファイル名パターン（例: "*.md", "**/*.md"）（デフォルト: "*"）
+        root: ドキュメントルート名（デフォルト: 既定のルート）
+        limit: 1回に返す最大件数（デフォルト: 0 = すべて。cursor のみ指定した場合は200件）
+        cursor: 前回の結果の末尾に表示されたカーソル（続きを取得する場合）
 
     Returns:
         ドキュメントパスのリスト（改行区切り）
 
     Example:
-        >>> files = list_documents()  # すべてのファイル
-        >>> md_files = list_documents(pattern="*.md")  # Markdownファイルのみ
-        >>> guide_files = list_documents(directory="guides")  # guidesディレクトリ内
+        >>> files = await list_documents()  # すべてのファイル
+        >>> md_files = await list_documents(pattern="*.md")  # Markdownファイルのみ
+        >>> guide_files = await list_documents(directory="guides")  # guidesディレクトリ内
+        >>> first = await list_documents(pattern="**/*.md", limit=200)  # 200件ずつ
+        >>> more = await list_documents(pattern="**/*.md", limit=200, cursor="Z3VpZGVzL3NldHVwLm1k")
     """
-    logger.debug(f"Tool call: list_documents(directory={directory}, pattern={pattern})")
+    logger.debug(
+        f"Tool call: list_documents(directory={directory}, pattern={pattern}, root={root}, "
+        f"limit={limit}, cursor={cursor})"
+    )
     try:
-        files = doc_tools.list_documents(directory, pattern)
+        tools = get_doc_tools(root)
+        next_cursor = None
+        with span("mcp.tool", tool="list_documents", root=root):
+            if limit > 0 or cursor:
+                from mcp_server.tools.document import LISTING_PAGE_SIZE
+
+                page = await tools.list_documents_page(
+                    directory, pattern, cursor or None, limit if limit > 0 else LISTING_PAGE_SIZE
+                )
+                files, next_cursor = page.paths, page.next_cursor
+            else:
+                files = tools.list_documents(directory, pattern)
         if not files:
             return f"No documents found in '{directory}' matching pattern '{pattern}'"
-        return "\n".join(files)
+        output = "\n".join(files)
+        if next_cursor:
+            output += f"\n[More results: call again with cursor=\"{next_cursor}\"]"
+        return output
     except Exception as e:
         error_msg = f"Error listing documents: {str(e)}"
         logger.error(error_msg)
         return error_msg
 
 
+@mcp.tool()
+async def browse_documents(directory: str = ".", root: str = "") -> str:
+    """ディレクトリごとのファイル数・合計サイズ・最終更新時刻を取得
+
+    サブディレクトリは集計のみを返します。詳しく見たいディレクトリを
+    directory に指定して呼び出すと、1階層ずつ掘り下げられます。
+
+    Args:
+        directory: 集計するディレクトリ（デフォルト: "."）
+        root: ドキュメントルート名（デフォルト: 既定のルート）
+
+    Returns:
+        サブディレクトリの集計と直下のファイルの一覧
+
+    Example:
+        >>> overview = await browse_documents()
+        >>> guides = await browse_documents(directory="guides")
+    """
+    logger.debug(f"Tool call: browse_documents(directory={directory}, root={root})")
+    try:
+        tools = get_doc_tools(root)
+        with span("mcp.tool", tool="browse_documents", root=root):
+            return tools.format_tree(await tools.list_tree(directory))
+    except Exception as e:
+        error_msg = f"Error browsing documents: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+@mcp.tool()
+async def describe_documents(
+    directory: str = ".",
+    pattern: str = "*",
+    encoding: str = "utf-8",
+    root: str = ""
+) -> str:
+    """ドキュメントのリストをサイズ・行数・概算トークン数・タイトル・要約付きで取得
+
+    get_document で取得する前に、どのドキュメントを読むべきか・どれくらい大きいかを確認できます。
+
+    Args:
+        directory: 検索するディレクトリ（デフォルト: "."）
+        pattern: ファイル名パターン（例: "*.md", "**/*"）（デフォルト: "*"）
+        encoding: ファイルエンコーディング（デフォルト: utf-8）
+        root: ドキュメントルート名（デフォルト: 既定のルート）
+
+    Returns:
+        ドキュメントごとのメタデータ（改行区切り）
+
+    Example:
+        >>> listing = await describe_documents(pattern="**/*.md")
+    """
+    logger.debug(
+        f"Tool call: describe_documents(directory={directory}, pattern={pattern}, "
+        f"encoding={encoding}, root={root})"
+    )
+    try:
+        tools = get_doc_tools(root)
+        with span("mcp.tool", tool="describe_documents", root=root):
+            infos = await tools.describe_documents(directory, pattern, encoding)
+        if not infos:
+            return f"No documents found in '{directory}' matching pattern '{pattern}'"
+        return "\n".join(tools.format_document_info(info) for info in infos)
+    except Exception as e:
+        error_msg = f"Error describing documents: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
 @mcp.tool()
 async def search_in_document(
     path: str,
     keyword: str,
-    encoding: str = "utf-8"
+    encoding: str = "utf-8",
+    root: str = ""
 ) -> str:
     """ドキュメント内でキーワードを検索
 
@@ -91,6 +317,7 @@ async def search_in_document(
         path: ドキュメントの相対パス
         keyword: 検索するキーワード
         encoding: ファイルエンコーディング（デフォルト: utf-8）
+        root: ドキュメントルート名（デフォルト: 既定のルート）
 
     Returns:
         キーワードを含む行のリスト（行番号付き）
@@ -101,26 +328,173 @@ async def search_in_document(
     """
     logger.debug(
         f"Tool call: search_in_document(path={path}, keyword={keyword}, "
-        f"encoding={encoding})"
+        f"encoding={encoding}, root={root})"
     )
     try:
-        return await doc_tools.search_in_document(path, keyword, encoding)
+        with span("mcp.tool", tool="search_in_document", root=root):
+            return await get_doc_tools(root).search_in_document(path, keyword, encoding)
     except Exception as e:
         error_msg = f"Error searching in document: {str(e)}"
         logger.error(error_msg)
         return error_msg
 
 
+@mcp.tool()
+async def search_directory(
+    keyword: str,
+    directory: str = ".",
+    pattern: str = "**/*",
+    encoding: str = "utf-8",
+    max_matches_per_file: int = 20,
+    timeout: float = 10.0,
+    root: str = ""
+) -> str:
+    """ディレクトリ内の複数ドキュメントでキーワードを検索
+
+    どのファイルにキーワードが含まれるか分からない場合に使います。
+    期限までに検索できた分の結果を返します（打ち切った場合は末尾に表示）。
+
+    Args:
+        keyword: 検索するキーワード
+        directory: 検索するディレクトリ（デフォルト: "."）
+        pattern: ファイル名パターン（デフォルト: "**/*" = サブディレクトリを含むすべて）
+        encoding: ファイルエンコーディング（デフォルト: utf-8）
+        max_matches_per_file: ファイルごとの最大件数（デフォルト: 20）
+        timeout: 検索全体の期限（秒）（デフォルト: 10）
+        root: ドキュメントルート名（デフォルト: 既定のルート）
+
+    Returns:
+        ファイルごとのキーワードを含む行のリスト（行番号付き）
+
+    Example:
+        >>> results = await search_directory("timeout", directory="guides", pattern="**/*.md")
+    """
+    logger.debug(
+        f"Tool call: search_directory(keyword={keyword}, directory={directory}, "
+        f"pattern={pattern}, encoding={encoding}, root={root})"
+    )
+    try:
+        with span("mcp.tool", tool="search_directory", root=root):
+            return await get_doc_tools(root).search_directory(
+                keyword,
+                directory,
+                pattern,
+                encoding,
+                max_matches_per_file=max_matches_per_file,
+                timeout=timeout
+            )
+    except Exception as e:
+        error_msg = f"Error searching directory: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+@mcp.tool()
+async def semantic_search(
+    query: str,
+    top_k: int = 5,
+    directory: str = ".",
+    encoding: str = "utf-8",
+    root: str = ""
+) -> str:
+    """意味的に近いドキュメントのセクションを検索
+
+    キーワードが一致しない言い換えの質問でも、関連するセクションを見つけます。
+    ドキュメント全体を読む前に、どのファイルのどのセクションを見るべきか調べるのに使います。
+
+    Args:
+        query: 検索クエリ（自然文可）
+        top_k: 最大件数（デフォルト: 5）
+        directory: 検索対象を限定するディレクトリ（デフォルト: "."）
+        encoding: ファイルエンコーディング（デフォルト: utf-8）
+        root: ドキュメントルート名（デフォルト: すべてのルートを並行して検索）
+
+    Returns:
+        該当セクションのリスト（パス・見出し・行番号・スコア付き）。
+        複数ルートを検索した場合はパスの前に "ルート名:" が付きます
+
+    Example:
+        >>> results = await semantic_search("how do I install the server?")
+        >>> results = await semantic_search("障害時の対応手順", directory="runbooks")
+    """
+    logger.debug(
+        f"Tool call: semantic_search(query={query}, top_k={top_k}, "
+        f"directory={directory}, root={root})"
+    )
+    try:
+        with span("mcp.tool", tool="semantic_search", root=root):
+            return await get_roots().semantic_search(
+                query, top_k, directory, encoding, root=root or None
+            )
+    except Exception as e:
+        error_msg = f"Error in semantic search: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+@mcp.tool()
+def list_roots() -> str:
+    """利用可能なドキュメントルートの一覧を取得
+
+    各ツールの root 引数に指定できるルート名と設定を返します。
+
+    Returns:
+        ルートの一覧（JSON）
+    """
+    logger.debug("Tool call: list_roots()")
+    try:
+        with span("mcp.tool", tool="list_roots"):
+            return json.dumps(get_roots().describe(), ensure_ascii=False, indent=2)
+    except Exception as e:
+        error_msg = f"Error listing roots: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+@mcp.tool()
+def server_status() -> str:
+    """サーバーの準備状態と起動時の処理の進捗を取得
+
+    起動時の索引作成・先読みの進捗（処理したファイル数・バイト数・残り時間の見積もり）と、
+    ルートごとのキャッシュ・索引のメモリ使用量を返します。
+
+    Returns:
+        サーバーの状態（JSON）
+    """
+    logger.debug("Tool call: server_status()")
+    try:
+        with span("mcp.tool", tool="server_status"):
+            return json.dumps(
+                {"transport": TRANSPORT, **get_roots().status()},
+                ensure_ascii=False,
+                indent=2
+            )
+    except Exception as e:
+        error_msg = f"Error getting server status: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
 def main():
     """サーバーのエントリーポイント"""
     logger.info("=" * 60)
     logger.info("Starting MCP Document Server")
-    logger.info(f"Documents directory: {DOCS_DIR}")
+    for config in ROOT_CONFIGS:
+        logger.info(f"Document root '{config.name}': {config.path}")
+    logger.info(f"Transport: {TRANSPORT}")
+    if TRANSPORT != "stdio":
+        logger.info(f"Listening on: {mcp.settings.host}:{mcp.settings.port}")
     logger.info("=" * 60)
 
+    if TRANSPORT not in SUPPORTED_TRANSPORTS:
+        raise ValueError(
+            f"Unsupported transport: {TRANSPORT}. "
+            f"Supported: {', '.join(SUPPORTED_TRANSPORTS)}"
+        )
+
     try:
-        # STDIOトランスポートでサーバーを起動
-        mcp.run(transport='stdio')
+        # 指定されたトランスポートでサーバーを起動
+        asyncio.run(serve(TRANSPORT))
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     except Exception as e:
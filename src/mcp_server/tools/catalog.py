@@ -0,0 +1,257 @@
+"""ドキュメントカタログ - ドキュメントごとの事前計算したメタデータ
+
+サイズ・行数・概算トークン数・タイトル・要約をファイルの変更時のみ計算し、
+エージェントがドキュメントを取得する前に内容と大きさを判断できるようにします。
+"""
+
+import asyncio
+import os
+import re
+from typing import NamedTuple, Optional
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.tools.tree import glob_to_regex
+from mcp_server.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# Markdown見出し（# 〜 ######）
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+# 文末（句点・感嘆符・疑問符、空白が続く英文のピリオド）
+_SENTENCE_END_RE = re.compile(r"[。！？]|[.!?](?=\s|$)")
+
+TITLE_MAX_CHARS = 120
+SUMMARY_MAX_CHARS = 240
+
+
+class DocumentInfo(NamedTuple):
+    """ドキュメントのメタデータ
+
+    テキストとして読めないファイル（バイナリ・サイズ超過）は
+    size と mtime 以外が None になります。
+
+    Attributes:
+        path: ドキュメントの相対パス
+        size: ファイルサイズ（バイト）
+        mtime: 更新時刻（UNIX時間）
+        lines: 行数
+        tokens: 概算トークン数
+        title: タイトル（最初の見出し、なければ最初の行）
+        summary: 冒頭の段落から抜き出した要約
+    """
+
+    path: str
+    size: int
+    mtime: float
+    lines: Optional[int] = None
+    tokens: Optional[int] = None
+    title: Optional[str] = None
+    summary: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def estimate_tokens(text: str) -> int:
+    """概算トークン数
+
+    ASCII は約4文字で1トークン、それ以外（日本語等）は1文字で約1トークンとして数えます。
+    """
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+def extract_title(text: str) -> str:
+    """最初の見出し（なければ最初の空でない行）をタイトルとして取得"""
+    first_line = ""
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        match = _HEADING_RE.match(stripped)
+        if match:
+            return _shorten(match.group(1), TITLE_MAX_CHARS)
+        if not first_line:
+            first_line = stripped
+    return _shorten(first_line, TITLE_MAX_CHARS)
+
+
+def extract_summary(text: str, max_sentences: int = 2) -> str:
+    """見出し・コードブロック・表を除いた最初の段落の先頭の文を要約として取得"""
+    paragraph: list[str] = []
+    in_code = False
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code or _HEADING_RE.match(stripped) or stripped.startswith(("|", "<!--")):
+            if paragraph:
+                break
+            continue
+        if not stripped:
+            if paragraph:
+                break
+            continue
+        paragraph.append(stripped)
+
+    summary = " ".join(paragraph)
+    for count, match in enumerate(_SENTENCE_END_RE.finditer(summary), start=1):
+        if count == max_sentences:
+            summary = summary[:match.end()]
+            break
+    return _shorten(summary, SUMMARY_MAX_CHARS)
+
+
+def describe_text(path: str, size: int, mtime: float, text: str) -> DocumentInfo:
+    """テキストからメタデータを計算"""
+    return DocumentInfo(
+        path=path,
+        size=size,
+        mtime=mtime,
+        lines=text.count("\n") + 1 if text else 0,
+        tokens=estimate_tokens(text),
+        title=extract_title(text),
+        summary=extract_summary(text)
+    )
+
+
+class DocumentCatalog:
+    """ドキュメントのメタデータのカタログ
+
+    更新時刻とサイズが変わったファイルのみ読み込んで再計算します。
+
+    Args:
+        file_handler: ファイルハンドラ
+        max_file_size: 最大ファイルサイズ（超えるファイルは読み込まずにサイズのみ記録）
+        pattern: カタログ対象のファイルパターン
+
+    Example:
+        >>> catalog = DocumentCatalog(file_handler, max_file_size=10 * 1024 * 1024)
+        >>> for info in await catalog.describe(file_handler.list_files("guides", "*.md")):
+        ...     print(info.path, info.tokens, info.title)
+    """
+
+    def __init__(
+        self,
+        file_handler: SafeFileHandler,
+        max_file_size: int,
+        pattern: str = "**/*"
+    ):
+        self.file_handler = file_handler
+        self.max_file_size = max_file_size
+        self.pattern = pattern
+        self._entries: dict[str, DocumentInfo] = {}
+        self._states: dict[str, tuple[int, int]] = {}
+        self._encoding: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> Optional[DocumentInfo]:
+        """ドキュメントのメタデータを取得（カタログにない場合はNone）"""
+        return self._entries.get(path)
+
+    async def refresh(self, encoding: str = "utf-8") -> int:
+        """変更されたファイルをカタログに反映（削除されたファイルは取り除く）
+
+        Args:
+            encoding: ファイルエンコーディング（前回と異なる場合はすべて再計算）
+
+        Returns:
+            再計算したドキュメント数
+        """
+        paths = self.file_handler.list_files(".", self.pattern)
+        async with self._lock:
+            for path in set(self._entries) - set(paths):
+                self._remove(path)
+            updated = await self._update(paths, encoding)
+
+        if updated:
+            logger.info(f"Catalog updated: {updated} documents ({len(self._entries)} total)")
+        return updated
+
+    async def describe(
+        self,
+        paths: list[str],
+        encoding: str = "utf-8",
+        directory: Optional[str] = None,
+        pattern: str = "*"
+    ) -> list[DocumentInfo]:
+        """指定したドキュメントのメタデータを取得（変更されたファイルのみ再計算）
+
+        Args:
+            paths: ドキュメントの相対パス（list_files の結果等）
+            encoding: ファイルエンコーディング
+            directory: paths が list_files(directory, pattern) の結果の場合のディレクトリ。
+                指定した場合は、その範囲にあって paths にないエントリ
+                （削除・名前変更されたファイル）をカタログから取り除く
+            pattern: paths を取得したファイル名パターン
+
+        Returns:
+            メタデータのリスト（取得後に削除されたファイルは含まない）
+        """
+        async with self._lock:
+            if directory is not None:
+                self._prune(paths, directory, pattern)
+            await self._update(paths, encoding)
+            return [self._entries[path] for path in paths if path in self._entries]
+
+    async def _update(self, paths: list[str], encoding: str) -> int:
+        if encoding != self._encoding:
+            self._states.clear()
+            self._encoding = encoding
+
+        updated = 0
+        for path in paths:
+            try:
+                stat = self.file_handler.stat(path)
+            except (OSError, ValueError):
+                # 一覧の取得後に削除されたファイル等
+                self._remove(path)
+                continue
+
+            state = (stat.st_mtime_ns, stat.st_size)
+            if self._states.get(path) == state:
+                continue
+            if path in self._states:
+                # 変更されたファイルはパス解決もやり直す（置き換え・リンクの変更に対応）
+                self.file_handler.invalidate(path)
+            self._entries[path] = await self._describe(path, stat, encoding)
+            self._states[path] = state
+            updated += 1
+        return updated
+
+    def _prune(self, paths: list[str], directory: str, pattern: str) -> None:
+        relative = self.file_handler.normalize(directory)
+        prefix = "" if relative == "." else relative + "/"
+        regex = glob_to_regex(pattern)
+        listed = set(paths)
+        for path in [
+            path for path in self._entries
+            if path not in listed and path.startswith(prefix) and regex.match(path, len(prefix))
+        ]:
+            self._remove(path)
+
+    def _remove(self, path: str) -> None:
+        self._entries.pop(path, None)
+        self._states.pop(path, None)
+        self.file_handler.invalidate(path)
+
+    async def _describe(self, path: str, stat: os.stat_result, encoding: str) -> DocumentInfo:
+        if stat.st_size > self.max_file_size:
+            return DocumentInfo(path, stat.st_size, stat.st_mtime)
+        try:
+            text = await self.file_handler.read(path, encoding=encoding)
+        except (OSError, RuntimeError) as e:
+            # バイナリや別エンコーディングのファイルはサイズのみ記録
+            logger.debug(f"Skipping metadata for {path}: {e}")
+            return DocumentInfo(path, stat.st_size, stat.st_mtime)
+        # メタデータの計算はCPU処理のためイベントループを止めない
+        return await asyncio.to_thread(describe_text, path, stat.st_size, stat.st_mtime, text)
@@ -1,11 +1,66 @@
 """ドキュメント操作ツール"""
 
-from typing import Optional
+import asyncio
+import os
+import time
+from array import array
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional, TypeVar
 from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.resources.mapped import MappedFile
+from mcp_server.tools.catalog import DocumentCatalog, DocumentInfo
+from mcp_server.tools.search import (
+    BYTE_SEARCHABLE_ENCODINGS,
+    DirectorySearch,
+    FileMatches,
+    FoldedText,
+    find_matching_lines,
+)
+from mcp_server.tools.tree import DirectoryNode, DocumentTree, ListingPage
+from mcp_server.utils.access_stats import AccessStats
+from mcp_server.utils.cache import ContentCache
 from mcp_server.utils.logging import setup_logging
+from mcp_server.utils.progress import WarmupProgress
+from mcp_server.utils.tracing import span
+
+if TYPE_CHECKING:
+    from mcp_server.tools.semantic import Embedder, SemanticHit, SemanticIndex
 
 logger = setup_logging(__name__)
 
+T = TypeVar("T")
+
+
+# サポートされているエンコーディング
+SUPPORTED_ENCODINGS = ["utf-8", "shift_jis", "euc-jp", "cp932"]
+
+# ページ分割した一覧の1ページの既定の件数（MCPツール・HTTP API 共通）
+LISTING_PAGE_SIZE = 200
+
+# 検索のたびに索引を更新する場合に、変更の確認を省略する間隔（秒）
+INDEX_CHECK_INTERVAL = 2.0
+
+
+def _format_size(size: int) -> str:
+    return (
+        f"{size / 1024 / 1024:.1f} MB" if size >= 1024 * 1024
+        else f"{size / 1024:.1f} KB" if size >= 1024
+        else f"{size} B"
+    )
+
+
+def _format_mtime(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
+
+
+def _format_totals(node: DirectoryNode) -> str:
+    if node.latest_mtime is None:
+        return "empty"
+    return (
+        f"{node.file_count} files, {_format_size(node.total_bytes)}, "
+        f"updated {_format_mtime(node.latest_mtime)}"
+    )
+
 
 class DocumentTools:
     """ドキュメント関連のMCPツール
@@ -13,17 +68,63 @@ class DocumentTools:
     Args:
         documents_dir: ドキュメントのベースディレクトリ
         max_file_size: 最大ファイルサイズ（バイト）
+        embedder: セマンティック検索用の埋め込みモデル、または "module:attr" 形式の
+            指定文字列（Noneの場合は既定モデル）
+        cache_budget: ドキュメントキャッシュの上限（バイト）。0で無効
+        index_policy: セマンティック索引の作成方針（none / lazy / eager）
+        refresh_interval: 索引をバックグラウンドで更新する間隔（秒）。
+            0の場合は検索時に変更を反映（INDEX_CHECK_INTERVAL 秒以内の連続した検索では省略）
+        mmap_threshold: このサイズ（バイト）以上のファイルはメモリマップで読み込み、
+            検索・行範囲の取得で全体をデコードしない
+        search_workers: ディレクトリ検索で同時に検索するファイル数
+        access_stats: ドキュメントごとのアクセス頻度の記録先（Noneの場合は保存しない記録を作成）
+        listing_ttl: ページ分割・階層表示に使うファイルツリーを再利用する秒数
     """
 
     def __init__(
         self,
         documents_dir: str,
-        max_file_size: int = 10 * 1024 * 1024  # 10MB
+        max_file_size: int = 10 * 1024 * 1024,  # 10MB
+        embedder: "Embedder | str | None" = None,
+        cache_budget: int = 32 * 1024 * 1024,  # 32MB
+        index_policy: str = "lazy",
+        refresh_interval: float = 0.0,
+        mmap_threshold: int = 1024 * 1024,  # 1MB
+        search_workers: int = 4,
+        access_stats: Optional[AccessStats] = None,
+        listing_ttl: float = 5.0
     ):
-        self.file_handler = SafeFileHandler(documents_dir)
+        self.file_handler = SafeFileHandler(documents_dir, mmap_threshold=mmap_threshold)
         self.max_file_size = max_file_size
+        self.embedder = embedder
+        self.cache = ContentCache(cache_budget)
+        self.catalog = DocumentCatalog(self.file_handler, max_file_size)
+        self.tree = DocumentTree(self.file_handler, ttl=listing_ttl)
+        self.index_policy = index_policy
+        self.refresh_interval = refresh_interval
+        self.search_workers = search_workers
+        self.access_stats = access_stats if access_stats is not None else AccessStats()
+        self._semantic_index: Optional["SemanticIndex"] = None
+        self._index_ready = False
+        self._index_checked = 0.0
         logger.info(f"DocumentTools initialized with base_dir: {documents_dir}")
 
+    @staticmethod
+    def _validate_request(path: str, encoding: str) -> None:
+        """パスとエンコーディングの入力バリデーション
+
+        Raises:
+            ValueError: 空のパスまたはサポートされていないエンコーディング
+        """
+        if not path or path.strip() == "":
+            raise ValueError("Path cannot be empty")
+
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError(
+                f"Unsupported encoding: {encoding}. "
+                f"Supported: {', '.join(SUPPORTED_ENCODINGS)}"
+            )
+
     async def get_document(
         self,
         path: str,
@@ -43,27 +144,31 @@ class DocumentTools:
             FileNotFoundError: ファイルが見つからない
             RuntimeError: 読み込みエラーまたはファイルサイズ超過
         """
+        content = await self._fetch(path, encoding)
+        self.access_stats.record(path)
+        return content
+
+    async def _fetch(self, path: str, encoding: str) -> str:
+        """ドキュメントを取得（アクセス頻度は記録しない）"""
         logger.info(f"Fetching document: {path} (encoding: {encoding})")
 
         try:
-            # 入力バリデーション
-            if not path or path.strip() == "":
-                raise ValueError("Path cannot be empty")
-
-            # サポートされているエンコーディングチェック
-            supported_encodings = ["utf-8", "shift_jis", "euc-jp", "cp932"]
-            if encoding not in supported_encodings:
-                raise ValueError(
-                    f"Unsupported encoding: {encoding}. "
-                    f"Supported: {', '.join(supported_encodings)}"
-                )
+            self._validate_request(path, encoding)
 
-            # ファイル読み込み
-            content = await self.file_handler.read(
-                path,
-                encoding=encoding,
-                max_size=self.max_file_size
-            )
+            # キャッシュ確認（更新時刻とサイズが一致する場合のみ使用）
+            stat = self.file_handler.stat(path)
+            state = (stat.st_mtime_ns, stat.st_size)
+            content = self.cache.get((path, encoding), state)
+
+            if content is None:
+                # ファイル読み込み
+                with span("document.read", path=path):
+                    content = await self.file_handler.read(
+                        path,
+                        encoding=encoding,
+                        max_size=self.max_file_size
+                    )
+                self.cache.put((path, encoding), state, content)
 
             logger.info(
                 f"Successfully fetched document: {path} "
@@ -84,6 +189,41 @@ class DocumentTools:
             logger.exception(f"Unexpected error fetching {path}: {e}")
             raise RuntimeError(f"Failed to fetch document: {e}")
 
+    async def stream_document(
+        self,
+        path: str,
+        encoding: str = "utf-8",
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[str]:
+        """ドキュメントを分割して取得
+
+        大きなドキュメントを1つの文字列にまとめずに順次返します。
+
+        Args:
+            path: ドキュメントの相対パス
+            encoding: ファイルエンコーディング（utf-8, shift_jis等）
+            chunk_size: 1回に返す最大文字数
+
+        Yields:
+            ドキュメント内容の断片
+
+        Raises:
+            ValueError: 無効なパスまたはエンコーディング
+            FileNotFoundError: ファイルが見つからない
+            RuntimeError: 読み込みエラーまたはファイルサイズ超過
+        """
+        logger.info(f"Streaming document: {path} (encoding: {encoding})")
+        self._validate_request(path, encoding)
+
+        async for chunk in self.file_handler.iter_chunks(
+            path,
+            encoding=encoding,
+            max_size=self.max_file_size,
+            chunk_size=chunk_size
+        ):
+            yield chunk
+        self.access_stats.record(path)
+
     def list_documents(
         self,
         directory: str = ".",
@@ -113,6 +253,125 @@ class DocumentTools:
             logger.exception(f"Error listing documents: {e}")
             raise
 
+    async def list_documents_page(
+        self,
+        directory: str = ".",
+        pattern: str = "*",
+        cursor: Optional[str] = None,
+        limit: int = LISTING_PAGE_SIZE
+    ) -> ListingPage:
+        """ドキュメントのリストをパス順に1ページ分取得
+
+        Args:
+            directory: 検索するディレクトリ（基準ディレクトリからの相対パス）
+            pattern: ファイル名パターン（例: "*.md", "**/*.md"）
+            cursor: 前のページの next_cursor（Noneの場合は最初から）
+            limit: 1ページの最大件数
+
+        Returns:
+            ドキュメントパスのリストと次のページのカーソル
+
+        Raises:
+            ValueError: 無効なパス・カーソル・件数
+            FileNotFoundError: ディレクトリが見つからない
+        """
+        logger.info(
+            f"Listing documents page in: {directory} (pattern: {pattern}, limit: {limit})"
+        )
+        return await self.tree.page(directory, pattern, cursor, limit)
+
+    async def list_tree(self, directory: str = ".") -> DirectoryNode:
+        """ディレクトリごとの集計（ファイル数・合計サイズ・最終更新時刻）を取得
+
+        Args:
+            directory: 集計するディレクトリ（基準ディレクトリからの相対パス）
+
+        Returns:
+            ディレクトリのノード（サブディレクトリ・直下のファイルを含む）
+
+        Raises:
+            ValueError: 無効なパス
+            FileNotFoundError: ディレクトリが見つからない
+        """
+        logger.info(f"Listing document tree: {directory}")
+        return await self.tree.directory(directory)
+
+    async def largest_read_bytes(self, directory: str = ".", concurrency: int = 1) -> int:
+        """ディレクトリ配下のファイルを読み込む処理が同時に保持しうる最大バイト数
+
+        同時に読み込む concurrency 個のファイルがすべて配下で最大のファイル
+        （max_file_size を超えるファイルは読み込まないため上限は max_file_size）の場合を見積もります。
+
+        Raises:
+            ValueError: 無効なパス
+            FileNotFoundError: ディレクトリが見つからない
+        """
+        node = await self.tree.directory(directory)
+        return min(concurrency, node.file_count) * min(node.largest_bytes, self.max_file_size)
+
+    @staticmethod
+    def format_tree(node: DirectoryNode, max_files: int = 50) -> str:
+        """ディレクトリの集計を文字列に整形（サブディレクトリ、直下のファイルの順）
+
+        直下のファイルは max_files 件まで表示し、残りは件数のみ表示します。
+        """
+        lines = [f"{node.path}/ ({_format_totals(node)})"]
+        for name in sorted(node.dirs):
+            child = node.dirs[name]
+            lines.append(f"  {name}/ ({_format_totals(child)})")
+        names = sorted(node.files)
+        for name in names[:max_files]:
+            file = node.files[name]
+            lines.append(
+                f"  {name} ({_format_size(file.size)}, updated {_format_mtime(file.mtime)})"
+            )
+        if len(names) > max_files:
+            lines.append(
+                f"  ... and {len(names) - max_files} more files (use list_documents with a cursor)"
+            )
+        return "\n".join(lines)
+
+    async def describe_documents(
+        self,
+        directory: str = ".",
+        pattern: str = "*",
+        encoding: str = "utf-8"
+    ) -> list[DocumentInfo]:
+        """ドキュメントのリストをメタデータ付きで取得
+
+        サイズ・行数・概算トークン数・タイトル・要約を返します。
+        メタデータはカタログに保存され、変更されたファイルのみ再計算します。
+
+        Args:
+            directory: 検索するディレクトリ（基準ディレクトリからの相対パス）
+            pattern: ファイル名パターン（例: "*.md", "*.txt"）
+            encoding: ファイルエンコーディング
+
+        Returns:
+            メタデータのリスト（パス順）
+
+        Raises:
+            ValueError: 無効なパスまたはエンコーディング
+            FileNotFoundError: ディレクトリが見つからない
+        """
+        self._validate_request(directory, encoding)
+        files = self.list_documents(directory, pattern)
+        return await self.catalog.describe(files, encoding, directory, pattern)
+
+    @staticmethod
+    def format_document_info(info: DocumentInfo) -> str:
+        """ドキュメントのメタデータを1件分の文字列に整形"""
+        size = _format_size(info.size)
+        if info.tokens is None:
+            return f"{info.path} ({size}, not readable as text)"
+
+        line = f"{info.path} ({size}, {info.lines} lines, ~{info.tokens} tokens)"
+        if info.title:
+            line += f" - {info.title}"
+        if info.summary and info.summary != info.title:
+            line += f"\n  {info.summary}"
+        return line
+
     async def search_in_document(
         self,
         path: str,
@@ -138,18 +397,419 @@ class DocumentTools:
         if not keyword or keyword.strip() == "":
             raise ValueError("Keyword cannot be empty")
 
-        # ドキュメント取得
-        content = await self.get_document(path, encoding)
+        self._validate_request(path, encoding)
+        stat = self.file_handler.stat(path)
 
-        # キーワード検索
-        results = []
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, start=1):
-            if keyword.lower() in line.lower():
-                results.append(f"Line {line_num}: {line.strip()}")
+        if (
+            stat.st_size >= self.file_handler.mmap_threshold
+            and encoding in BYTE_SEARCHABLE_ENCODINGS
+            and keyword.isascii()
+            and (path, encoding) not in self.cache
+        ):
+            # 大きなファイルはデコードせずにマップしたバイト列を検索し、一致した行のみデコード
+            with span("search.mapped_scan", bytes=stat.st_size):
+                matches = await self._run_mapped(
+                    path, encoding, stat,
+                    lambda mapped: find_matching_lines(mapped, keyword, encoding)
+                )
+            results = [f"Line {line_num}: {line.strip()}" for line_num, line in matches]
+        else:
+            # casefold 済みのドキュメントを取得して検索（1つの find ループ）
+            folded = await self._get_folded(path, encoding, stat)
+            with span("search.match", chars=len(folded.text)):
+                results = [
+                    f"Line {line_num}: {line.strip()}"
+                    for line_num, line in folded.find_lines(keyword)
+                ]
 
+        self.access_stats.record(path)
         if not results:
             return f"Keyword '{keyword}' not found in {path}"
 
         logger.info(f"Found {len(results)} matches for '{keyword}' in {path}")
         return "\n".join(results)
+
+    def directory_search(
+        self,
+        keyword: str,
+        directory: str = ".",
+        pattern: str = "**/*",
+        encoding: str = "utf-8",
+        max_matches_per_file: int = 20,
+        max_total_matches: int = 500,
+        timeout: float = 10.0
+    ) -> DirectorySearch:
+        """ディレクトリ内の複数ドキュメントを検索（結果を順次取得）
+
+        Args:
+            keyword: 検索キーワード
+            directory: 検索するディレクトリ（基準ディレクトリからの相対パス）
+            pattern: ファイル名パターン（例: "**/*.md"）
+            encoding: ファイルエンコーディング
+            max_matches_per_file: ファイルごとの最大件数
+            max_total_matches: 全体の最大件数
+            timeout: 検索全体の期限（秒）
+
+        Returns:
+            検索（async for で完了したファイルから順に結果を取得）
+
+        Raises:
+            ValueError: 無効な入力
+            FileNotFoundError: ディレクトリが見つからない
+        """
+        if not keyword or keyword.strip() == "":
+            raise ValueError("Keyword cannot be empty")
+        self._validate_request(directory, encoding)
+        if max_matches_per_file < 1 or max_total_matches < 1:
+            raise ValueError("Match limits must be at least 1")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+
+        return DirectorySearch(
+            self.file_handler,
+            self.list_documents(directory, pattern),
+            keyword,
+            encoding=encoding,
+            max_file_size=self.max_file_size,
+            max_matches_per_file=max_matches_per_file,
+            max_total_matches=max_total_matches,
+            timeout=timeout,
+            workers=self.search_workers
+        )
+
+    @staticmethod
+    def format_file_matches(result: FileMatches, prefix: str = "") -> str:
+        """ディレクトリ検索の結果を1ファイル分の文字列に整形"""
+        lines = [f"{prefix}{result.path}:"]
+        lines.extend(f"  Line {line_num}: {line.strip()}" for line_num, line in result.matches)
+        if result.truncated:
+            lines.append("  ... (more matches omitted)")
+        return "\n".join(lines)
+
+    async def search_directory(
+        self,
+        keyword: str,
+        directory: str = ".",
+        pattern: str = "**/*",
+        encoding: str = "utf-8",
+        max_matches_per_file: int = 20,
+        max_total_matches: int = 500,
+        timeout: float = 10.0
+    ) -> str:
+        """ディレクトリ内の複数ドキュメントでキーワードを検索
+
+        引数は directory_search() と同じです。
+
+        Returns:
+            ファイルごとのキーワードを含む行のリスト（行番号付き）。
+            期限切れ・上限到達で打ち切った場合は末尾にその旨を表示
+        """
+        logger.info(f"Searching for '{keyword}' in {directory} (pattern: {pattern})")
+
+        search = self.directory_search(
+            keyword, directory, pattern, encoding,
+            max_matches_per_file, max_total_matches, timeout
+        )
+        results = await search.collect()
+
+        output = [self.format_file_matches(result) for result in results]
+        if not output:
+            output.append(f"Keyword '{keyword}' not found in {directory}")
+        if search.truncated:
+            output.append(
+                f"[Results truncated: scanned {search.scanned} of {len(search.paths)} files]"
+            )
+        return "\n".join(output)
+
+    async def _get_folded(
+        self,
+        path: str,
+        encoding: str,
+        stat: os.stat_result
+    ) -> FoldedText:
+        """casefold 済みのドキュメントを取得（ファイルの状態が同じ間キャッシュを再利用）"""
+        state = (stat.st_mtime_ns, stat.st_size)
+        folded = self.cache.get(("folded", path, encoding), state)
+        if folded is None:
+            content = await self._fetch(path, encoding)
+            # casefold と行開始位置の計算はCPU処理のためイベントループを止めない
+            with span("search.casefold", chars=len(content)):
+                folded = await asyncio.to_thread(FoldedText, content)
+            self.cache.put(("folded", path, encoding), state, folded, size=folded.nbytes)
+        return folded
+
+    async def _run_mapped(
+        self,
+        path: str,
+        encoding: str,
+        stat: os.stat_result,
+        func: Callable[[MappedFile], T]
+    ) -> T:
+        """メモリマップで開いたファイルに対する処理をスレッドで実行
+
+        行開始位置の索引はファイルの状態が同じ間キャッシュして再利用します。
+        """
+        state = (stat.st_mtime_ns, stat.st_size)
+        line_starts = self.cache.get(("line_starts", path), state)
+
+        def run() -> tuple[T, array]:
+            with self.file_handler.open_mapped(path, self.max_file_size, line_starts) as mapped:
+                return func(mapped), mapped.line_starts
+
+        try:
+            result, starts = await asyncio.to_thread(run)
+        except UnicodeDecodeError as e:
+            raise RuntimeError(f"Failed to decode file with encoding '{encoding}': {e}")
+
+        if line_starts is None:
+            self.cache.put(("line_starts", path), state, starts, size=len(starts) * starts.itemsize)
+        return result
+
+    async def get_document_lines(
+        self,
+        path: str,
+        start_line: int,
+        end_line: Optional[int] = None,
+        encoding: str = "utf-8"
+    ) -> str:
+        """ドキュメントの指定範囲の行を取得
+
+        大きなファイルはメモリマップで開き、指定範囲のみデコードします。
+
+        Args:
+            path: ドキュメントの相対パス
+            start_line: 開始行（1始まり、この行を含む）
+            end_line: 終了行（この行を含む）。Noneの場合は最終行まで
+            encoding: ファイルエンコーディング
+
+        Returns:
+            該当行の内容（範囲外の行は含まない）
+
+        Raises:
+            ValueError: 無効な入力
+            FileNotFoundError: ファイルが見つからない
+            RuntimeError: 読み込みエラーまたはファイルサイズ超過
+        """
+        logger.info(f"Fetching lines {start_line}-{end_line or ''} of {path}")
+
+        if start_line < 1:
+            raise ValueError("start_line must be at least 1")
+        if end_line is not None and end_line < start_line:
+            raise ValueError("end_line must not be less than start_line")
+        self._validate_request(path, encoding)
+
+        stat = self.file_handler.stat(path)
+        end = end_line if end_line is not None else stat.st_size + 1
+
+        if (
+            stat.st_size >= self.file_handler.mmap_threshold
+            and (path, encoding) not in self.cache
+        ):
+            lines = await self._run_mapped(
+                path, encoding, stat,
+                lambda mapped: mapped.read_lines(start_line, end, encoding)
+            )
+        else:
+            content = await self._fetch(path, encoding)
+            lines = "\n".join(content.split("\n")[start_line - 1:end])
+
+        self.access_stats.record(path)
+        return lines
+
+    async def prefetch(
+        self,
+        top_n: int,
+        budget: Optional[int] = None,
+        encoding: str = "utf-8",
+        progress: Optional[WarmupProgress] = None
+    ) -> int:
+        """アクセス頻度の高いドキュメントを先読みしてキャッシュに載せる
+
+        内容の読み込み・デコードと検索用の casefold まで行います。
+        既にキャッシュされているドキュメントは読み込みません。
+
+        Args:
+            top_n: 先読みするドキュメント数の上限
+            budget: 先読みに使うメモリの上限（バイト）。Noneの場合はキャッシュ上限の半分
+            encoding: ファイルエンコーディング
+            progress: 進捗の報告先（先読みしたファイル数・バイト数）。
+                失敗時の finish() は呼び出し側で行う
+
+        Returns:
+            先読みした（キャッシュにある）ドキュメント数
+        """
+        budget = self.cache.budget // 2 if budget is None else budget
+
+        # 予算内に収まる対象を先に決める（進捗の総量を報告するため）
+        targets = []
+        used = 0
+        for path in self.access_stats.top(top_n):
+            try:
+                stat = self.file_handler.stat(path)
+            except (OSError, ValueError):
+                # 削除されたファイルは記録からも削除
+                self.access_stats.forget(path)
+                continue
+
+            # 内容と casefold 済みのテキストの両方を保持するため約2倍
+            cost = stat.st_size * 2
+            if stat.st_size > self.max_file_size or used + cost > budget:
+                continue
+            targets.append((path, stat))
+            used += cost
+
+        if progress is not None:
+            progress.begin(
+                files=len(targets),
+                bytes_total=sum(stat.st_size for _, stat in targets)
+            )
+        count = 0
+        for path, stat in targets:
+            try:
+                await self._get_folded(path, encoding, stat)
+                count += 1
+            except (OSError, ValueError, RuntimeError) as e:
+                logger.debug(f"Skipping prefetch of {path}: {e}")
+            if progress is not None:
+                progress.advance(files=1, bytes_done=stat.st_size)
+        if progress is not None:
+            progress.finish()
+        return count
+
+    def memory_usage(self) -> dict[str, int]:
+        """キャッシュ・索引のメモリ使用量と件数"""
+        index = self._semantic_index.index if self._semantic_index is not None else None
+        return {
+            "cache_bytes": self.cache.used,
+            "cache_budget_bytes": self.cache.budget,
+            "cache_entries": len(self.cache),
+            "index_bytes": index.nbytes if index is not None else 0,
+            "index_chunks": len(index) if index is not None else 0,
+            "catalog_entries": len(self.catalog),
+            "resolved_paths": self.file_handler.resolved_count,
+        }
+
+    def _get_semantic_index(self) -> "SemanticIndex":
+        """セマンティック索引を取得（初回呼び出し時に作成）"""
+        if self._semantic_index is None:
+            try:
+                from mcp_server.tools.semantic import SemanticIndex, load_embedder
+            except ImportError as e:
+                raise RuntimeError(
+                    "Semantic search requires numpy. "
+                    "Install with: pip install 'mcp-document-server[semantic]'"
+                ) from e
+            if isinstance(self.embedder, str):
+                self.embedder = load_embedder(self.embedder)
+            self._semantic_index = SemanticIndex(
+                self.file_handler,
+                embedder=self.embedder,
+                max_file_size=self.max_file_size
+            )
+        return self._semantic_index
+
+    async def refresh_index(
+        self,
+        encoding: str = "utf-8",
+        progress: Optional[WarmupProgress] = None
+    ) -> int:
+        """セマンティック索引に変更を反映
+
+        Args:
+            encoding: ファイルエンコーディング
+            progress: 進捗の報告先
+
+        Returns:
+            新たに埋め込んだチャンク数（索引が無効な場合は0）
+        """
+        if self.index_policy == "none":
+            return 0
+        count = await self._get_semantic_index().refresh(encoding, progress)
+        self._index_ready = True
+        self._index_checked = time.monotonic()
+        return count
+
+    async def semantic_hits(
+        self,
+        query: str,
+        top_k: int = 5,
+        directory: str = ".",
+        encoding: str = "utf-8"
+    ) -> list["SemanticHit"]:
+        """意味的に近いセクションを検索（整形前の結果）
+
+        Args:
+            query: 検索クエリ（自然文可）
+            top_k: 最大件数
+            directory: 検索対象を限定するディレクトリ（基準ディレクトリからの相対パス）
+            encoding: ファイルエンコーディング
+
+        Returns:
+            検索結果（スコア降順）
+
+        Raises:
+            ValueError: 無効な入力、または索引が無効な場合
+            RuntimeError: numpy がインストールされていない場合
+        """
+        if not query or query.strip() == "":
+            raise ValueError("Query cannot be empty")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        if self.index_policy == "none":
+            raise ValueError("Semantic search is disabled for this document root")
+
+        # 定期更新しない場合は検索時に変更されたチャンクのみ再計算
+        # （連続した検索のたびにファイル全体を走査しないよう一定間隔で確認）
+        if not self._index_ready or (
+            self.refresh_interval == 0
+            and time.monotonic() - self._index_checked >= INDEX_CHECK_INTERVAL
+        ):
+            await self.refresh_index(encoding)
+        return await self._get_semantic_index().search(query, top_k, directory)
+
+    @staticmethod
+    def format_semantic_hit(hit: "SemanticHit", prefix: str = "") -> str:
+        """セマンティック検索の結果を1件分の文字列に整形
+
+        Args:
+            hit: 検索結果
+            prefix: パスの前に付ける文字列（ルート名等）
+        """
+        chunk = hit.chunk
+        heading = f" > {chunk.heading}" if chunk.heading else ""
+        snippet = " ".join(chunk.text.split())[:200]
+        return (
+            f"{prefix}{chunk.path}{heading} (Line {chunk.start_line}, "
+            f"score: {hit.score:.3f})\n  {snippet}"
+        )
+
+    async def semantic_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        directory: str = ".",
+        encoding: str = "utf-8"
+    ) -> str:
+        """意味的に近いセクションを検索
+
+        Args:
+            query: 検索クエリ（自然文可）
+            top_k: 最大件数
+            directory: 検索対象を限定するディレクトリ（基準ディレクトリからの相対パス）
+            encoding: ファイルエンコーディング
+
+        Returns:
+            該当セクションのリスト（パス・見出し・行番号・スコア付き）
+
+        Raises:
+            ValueError: 無効な入力
+            RuntimeError: numpy がインストールされていない場合
+        """
+        logger.info(f"Semantic search for '{query}' in {directory} (top_k: {top_k})")
+
+        hits = await self.semantic_hits(query, top_k, directory, encoding)
+        if not hits:
+            return f"No sections found for '{query}'"
+
+        logger.info(f"Found {len(hits)} sections for '{query}'")
+        return "\n".join(self.format_semantic_hit(hit) for hit in hits)
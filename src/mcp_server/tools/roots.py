@@ -0,0 +1,296 @@
+"""複数のドキュメントルートの管理"""
+
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from mcp_server.config import RootConfig
+from mcp_server.tools.document import DocumentTools
+from mcp_server.utils.access_stats import AccessStats
+from mcp_server.utils.logging import setup_logging
+from mcp_server.utils.progress import WarmupProgress
+
+logger = setup_logging(__name__)
+
+# アクセス頻度の保存と先読みのやり直しの間隔（秒）
+PREFETCH_INTERVAL = 300.0
+
+
+class DocumentRoots:
+    """名前付きドキュメントルートの集合
+
+    ルートごとに SafeFileHandler・キャッシュ・索引を持つ DocumentTools を作成し、
+    1つのプロセスで複数のドキュメントディレクトリを提供します。
+
+    Args:
+        configs: ルート設定のリスト（優先度の高い順。先頭が既定のルート）
+        embedder: セマンティック検索用の埋め込みモデル（全ルートで共有）
+        create_dirs: ディレクトリが存在しない場合に作成するか
+
+    Example:
+        >>> roots = DocumentRoots(load_root_configs())
+        >>> content = await roots.get("runbooks").get_document("restart.md")
+        >>> results = await roots.semantic_search("how to restart")  # 全ルートを検索
+    """
+
+    def __init__(
+        self,
+        configs: list[RootConfig],
+        embedder: object = None,
+        create_dirs: bool = False
+    ):
+        if not configs:
+            raise ValueError("At least one document root is required")
+
+        self.configs = {config.name: config for config in configs}
+        self.default = configs[0].name
+        self._tools: dict[str, DocumentTools] = {}
+        # ルートごとのバックグラウンド処理の進捗（"index" / "prefetch"）
+        self._progress: dict[str, dict[str, WarmupProgress]] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._started = False
+
+        for config in configs:
+            if create_dirs:
+                Path(config.path).mkdir(parents=True, exist_ok=True)
+            self._tools[config.name] = DocumentTools(
+                config.path,
+                max_file_size=config.max_file_size,
+                embedder=embedder,
+                cache_budget=config.cache_budget,
+                index_policy=config.index_policy,
+                refresh_interval=config.refresh_interval,
+                access_stats=AccessStats(config.stats_file)
+            )
+            progress = {}
+            if config.needs_index_background:
+                progress["index"] = WarmupProgress()
+            if config.needs_prefetch:
+                progress["prefetch"] = WarmupProgress()
+            self._progress[config.name] = progress
+            logger.info(
+                f"Document root '{config.name}' initialized: {config.path} "
+                f"(priority: {config.priority}, index: {config.index_policy})"
+            )
+
+    @property
+    def names(self) -> list[str]:
+        """ルート名のリスト（優先度の高い順）"""
+        return list(self._tools)
+
+    def get(self, root: Optional[str] = None) -> DocumentTools:
+        """ルートの DocumentTools を取得
+
+        Args:
+            root: ルート名。None または空文字の場合は既定のルート
+
+        Raises:
+            ValueError: 存在しないルート名
+        """
+        name = root or self.default
+        tools = self._tools.get(name)
+        if tools is None:
+            raise ValueError(
+                f"Unknown document root: {name}. Available: {', '.join(self.names)}"
+            )
+        return tools
+
+    def items(self) -> list[tuple[str, DocumentTools]]:
+        """(ルート名, DocumentTools) のリスト（優先度の高い順）"""
+        return list(self._tools.items())
+
+    def describe(self) -> list[dict]:
+        """ルートの一覧と設定・キャッシュの状態"""
+        return [
+            {
+                "name": name,
+                "path": str(tools.file_handler.base_path),
+                "priority": self.configs[name].priority,
+                "index_policy": self.configs[name].index_policy,
+                "refresh_interval": self.configs[name].refresh_interval,
+                "cache": tools.cache.stats(),
+            }
+            for name, tools in self._tools.items()
+        ]
+
+    def is_ready(self, name: str) -> bool:
+        """ルートの起動時の処理（eager の索引作成・先読み）が終わったか
+
+        定期更新の実行中も、1回目が終わっていれば準備完了とします。
+        失敗した場合も検索時に再試行されるため準備完了とします。
+        """
+        config = self.configs[name]
+        progress = self._progress[name]
+        required = []
+        if config.index_policy == "eager":
+            required.append(progress["index"])
+        if config.needs_prefetch:
+            required.append(progress["prefetch"])
+        return all(item.runs > 0 for item in required)
+
+    def status(self) -> dict:
+        """準備状態・起動時の処理の進捗・メモリ使用量"""
+        roots = [
+            {
+                "name": name,
+                "ready": self.is_ready(name),
+                "warmup": {
+                    phase: progress.snapshot()
+                    for phase, progress in self._progress[name].items()
+                },
+                "memory": tools.memory_usage(),
+            }
+            for name, tools in self._tools.items()
+        ]
+        return {
+            "ready": all(root["ready"] for root in roots),
+            "roots": roots,
+            "memory_bytes": sum(
+                root["memory"]["cache_bytes"] + root["memory"]["index_bytes"]
+                for root in roots
+            ),
+        }
+
+    async def semantic_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        directory: str = ".",
+        encoding: str = "utf-8",
+        root: Optional[str] = None
+    ) -> str:
+        """セマンティック検索（ルート未指定の場合は全ルートを並行して検索）
+
+        各ルートの結果をスコア順に統合します。スコアが同じ場合は優先度の高いルートを先にします。
+        複数ルートの結果には "ルート名:" をパスの前に付けます。
+
+        Args:
+            query: 検索クエリ（自然文可）
+            top_k: 最大件数
+            directory: 検索対象を限定するディレクトリ
+            encoding: ファイルエンコーディング
+            root: 検索するルート名。None の場合は全ルート
+
+        Returns:
+            該当セクションのリスト
+        """
+        if root:
+            return await self.get(root).semantic_search(query, top_k, directory, encoding)
+
+        targets = [
+            (name, tools) for name, tools in self._tools.items()
+            if tools.index_policy != "none"
+        ]
+        if not targets:
+            raise ValueError("Semantic search is disabled for all document roots")
+        if len(self._tools) == 1:
+            return await targets[0][1].semantic_search(query, top_k, directory, encoding)
+
+        logger.info(f"Semantic search for '{query}' across roots: {[n for n, _ in targets]}")
+        results = await asyncio.gather(
+            *(tools.semantic_hits(query, top_k, directory, encoding) for _, tools in targets),
+            return_exceptions=True
+        )
+
+        merged = []
+        for rank, ((name, _), hits) in enumerate(zip(targets, results)):
+            if isinstance(hits, BaseException):
+                # 一部のルートの失敗で全体を失敗させない
+                logger.error(f"Semantic search failed in root '{name}': {hits}")
+                continue
+            merged.extend((hit.score, rank, name, hit) for hit in hits)
+
+        if not merged:
+            return f"No sections found for '{query}'"
+
+        merged.sort(key=lambda item: (-item[0], item[1]))
+        return "\n".join(
+            DocumentTools.format_semantic_hit(hit, prefix=f"{name}:")
+            for _, _, name, hit in merged[:top_k]
+        )
+
+    async def start(self) -> None:
+        """バックグラウンド処理を開始（起動時の索引作成・定期更新・先読み）
+
+        処理はタスクとして開始するだけで、完了を待ちません。
+        複数回呼び出しても開始するのは1度だけです（セッションごとの呼び出しに対応）。
+        """
+        if self._started:
+            return
+        self._started = True
+        for name, tools in self._tools.items():
+            config = self.configs[name]
+            if config.needs_index_background:
+                self._tasks.append(
+                    asyncio.create_task(self._maintain_index(name, tools, config))
+                )
+            if config.needs_prefetch:
+                self._tasks.append(
+                    asyncio.create_task(self._maintain_prefetch(name, tools, config))
+                )
+
+    async def stop(self) -> None:
+        """バックグラウンド処理を停止"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._started = False
+        for tools in self._tools.values():
+            tools.access_stats.save()
+
+    async def _maintain_index(
+        self,
+        name: str,
+        tools: DocumentTools,
+        config: RootConfig
+    ) -> None:
+        """索引の作成と定期更新"""
+        progress = self._progress[name]["index"]
+        if config.index_policy == "eager":
+            await self._refresh(name, tools, progress)
+        if config.refresh_interval <= 0:
+            return
+
+        while True:
+            await asyncio.sleep(config.refresh_interval)
+            await self._refresh(name, tools, progress)
+
+    async def _refresh(
+        self,
+        name: str,
+        tools: DocumentTools,
+        progress: WarmupProgress
+    ) -> None:
+        try:
+            count = await tools.refresh_index(progress=progress)
+            logger.info(f"Index refreshed for root '{name}' ({count} chunks embedded)")
+        except Exception as e:
+            progress.finish(e)
+            logger.error(f"Failed to refresh index for root '{name}': {e}")
+
+    async def _maintain_prefetch(
+        self,
+        name: str,
+        tools: DocumentTools,
+        config: RootConfig
+    ) -> None:
+        """保存されたアクセス頻度による先読みと、アクセス頻度の定期保存
+
+        起動直後に上位のドキュメントを先読みし、その後も一定間隔で
+        アクセス頻度を保存して、変化した上位のドキュメントを先読みし直します。
+        """
+        stats = tools.access_stats
+        loaded = stats.load()
+        logger.info(f"Loaded access stats for root '{name}' ({loaded} documents)")
+
+        progress = self._progress[name]["prefetch"]
+        while True:
+            try:
+                count = await tools.prefetch(config.prefetch_top_n, progress=progress)
+                logger.info(f"Prefetched {count} documents for root '{name}'")
+            except Exception as e:
+                progress.finish(e)
+                logger.error(f"Failed to prefetch documents for root '{name}': {e}")
+            await asyncio.sleep(PREFETCH_INTERVAL)
+            stats.save()
@@ -0,0 +1,292 @@
+"""キーワード検索 - 大文字小文字を区別しない一致検索とディレクトリの横断検索"""
+
+import asyncio
+import functools
+import re
+import sys
+from bisect import bisect_right
+from itertools import islice
+from typing import AsyncIterator, NamedTuple, Optional
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.resources.mapped import MappedFile, find_line_starts, normalize_newlines
+from mcp_server.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# ASCIIのキーワードをデコードせずにバイト列のまま検索できるエンコーディング
+# （shift_jis/cp932 はマルチバイト文字の2バイト目にASCIIの範囲が現れるため対象外）
+BYTE_SEARCHABLE_ENCODINGS = ("utf-8", "euc-jp")
+
+
+class FileMatches(NamedTuple):
+    """1ファイル分の検索結果"""
+
+    path: str
+    matches: list[tuple[int, str]]  # (行番号, 行の内容)
+    truncated: bool = False  # ファイルごとの上限で打ち切ったか
+
+
+class FoldedText:
+    """大文字小文字を区別しない検索のために casefold したテキスト
+
+    casefold はテキスト全体に対して1回だけ行い、一致位置は行開始位置の配列で
+    元の行に対応付けます。同じテキストを繰り返し検索する場合は
+    インスタンスをキャッシュして再利用します（検索は1つの find ループ）。
+
+    Args:
+        text: 元のテキスト（改行は "\n"）
+
+    Example:
+        >>> folded = FoldedText(content)
+        >>> folded.find_lines("Timeout")
+        [(12, "connection TIMEOUT is 30s")]
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.folded = text.casefold()
+        self.line_starts = find_line_starts(text, "\n")
+        # casefold で文字数が変わらなければ位置は元のテキストと同じ
+        # （1文字が複数文字になる場合のみ casefold 後の行開始位置を別に計算）
+        self.folded_line_starts = (
+            self.line_starts if len(self.folded) == len(text)
+            else find_line_starts(self.folded, "\n")
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """メモリ使用量の概算（バイト）"""
+        size = sys.getsizeof(self.text) + sys.getsizeof(self.folded)
+        size += len(self.line_starts) * self.line_starts.itemsize
+        if self.folded_line_starts is not self.line_starts:
+            size += len(self.folded_line_starts) * self.folded_line_starts.itemsize
+        return size
+
+    def line(self, line_num: int) -> str:
+        """元のテキストの行（1始まり、改行を含まない）"""
+        starts = self.line_starts
+        end = starts[line_num] - 1 if line_num < len(starts) else len(self.text)
+        return self.text[starts[line_num - 1]:end]
+
+    def find_lines(self, keyword: str, limit: Optional[int] = None) -> list[tuple[int, str]]:
+        """キーワードを含む行を検索（大文字小文字を区別しない、1行につき1回）
+
+        Args:
+            keyword: 検索キーワード
+            limit: 最大件数（Noneの場合は制限なし）
+
+        Returns:
+            (行番号, 行の内容) のリスト
+        """
+        needle = keyword.casefold()
+        folded = self.folded
+        starts = self.folded_line_starts
+        results: list[tuple[int, str]] = []
+
+        pos = folded.find(needle)
+        while pos != -1 and (limit is None or len(results) < limit):
+            line_num = bisect_right(starts, pos)
+            results.append((line_num, self.line(line_num)))
+            if line_num >= len(starts):
+                break
+            # 同じ行の2回目以降の一致は飛ばす
+            pos = folded.find(needle, starts[line_num])
+        return results
+
+
+@functools.cache
+def _folds_to_ascii() -> dict[str, str]:
+    """casefold すると ASCII 文字を含む非ASCII文字（"ß" → "ss"、"ﬁ" → "fi" など）
+
+    該当する文字はすべて基本多言語面にあるため、その範囲のみ調べます。
+    """
+    folds = {}
+    for code in range(0x80, 0x10000):
+        folded = chr(code).casefold()
+        if any(ch.isascii() for ch in folded):
+            folds[chr(code)] = folded
+    return folds
+
+
+def _byte_search_pattern(
+    mapped: MappedFile,
+    keyword: str,
+    encoding: str
+) -> Optional["re.Pattern[bytes]"]:
+    """バイト列の検索が FoldedText と同じ結果になる場合はその正規表現を返す
+
+    ASCII の大文字小文字を区別しない一致が casefold した一致と同じになるのは、
+    キーワードが改行を含まず、ファイルに単独の "\r"（FoldedText では改行）も
+    casefold でキーワードの文字になる非ASCII文字（"ß" → "ss" など）も含まない場合です。
+    """
+    if (
+        encoding not in BYTE_SEARCHABLE_ENCODINGS
+        or not keyword.isascii()
+        or "\n" in keyword
+        or "\r" in keyword
+    ):
+        return None
+
+    letters = set(keyword.lower())
+    unsafe = [rb"\r(?!\n)"]
+    for char, folded in _folds_to_ascii().items():
+        if letters.intersection(folded):
+            try:
+                unsafe.append(re.escape(char.encode(encoding)))
+            except UnicodeEncodeError:
+                continue
+    if mapped.contains(re.compile(b"|".join(unsafe))):
+        return None
+    return re.compile(re.escape(keyword.encode("ascii")), re.IGNORECASE)
+
+
+def find_matching_lines(
+    mapped: MappedFile,
+    keyword: str,
+    encoding: str,
+    limit: Optional[int] = None
+) -> list[tuple[int, str]]:
+    """キーワードを含む行を検索（大文字小文字を区別しない）
+
+    FoldedText と同じ結果になる場合はバイト列のまま検索して一致した行のみデコードし、
+    それ以外はファイル全体をデコードして FoldedText で検索します。
+
+    Args:
+        mapped: メモリマップされたファイル
+        keyword: 検索キーワード
+        encoding: ファイルエンコーディング
+        limit: 最大件数（Noneの場合は制限なし）
+
+    Returns:
+        (行番号, 行の内容) のリスト
+    """
+    pattern = _byte_search_pattern(mapped, keyword, encoding)
+    if pattern is not None:
+        return list(islice(mapped.iter_matching_lines(pattern, encoding), limit))
+
+    text = normalize_newlines(mapped.decode(0, mapped.size, encoding))
+    return FoldedText(text).find_lines(keyword, limit)
+
+
+class DirectorySearch:
+    """ディレクトリ内の複数ファイルを並行して検索
+
+    ファイルをワーカースレッドで並行して検索し、完了した順に結果を返します。
+    期限を過ぎた場合や全体の件数上限に達した場合は、
+    それまでの結果を返して `truncated` を True にします。
+
+    Args:
+        file_handler: ファイルハンドラ
+        paths: 検索するファイルの相対パス
+        keyword: 検索キーワード
+        encoding: ファイルエンコーディング
+        max_file_size: 最大ファイルサイズ（超えるファイルはスキップ）
+        max_matches_per_file: ファイルごとの最大件数
+        max_total_matches: 全体の最大件数
+        timeout: 検索全体の期限（秒）
+        workers: 同時に検索するファイル数
+
+    Example:
+        >>> search = doc_tools.directory_search("timeout", directory="guides")
+        >>> async for result in search:
+        ...     print(result.path, len(result.matches))
+        >>> search.truncated
+    """
+
+    def __init__(
+        self,
+        file_handler: SafeFileHandler,
+        paths: list[str],
+        keyword: str,
+        encoding: str = "utf-8",
+        max_file_size: Optional[int] = None,
+        max_matches_per_file: int = 20,
+        max_total_matches: int = 500,
+        timeout: float = 10.0,
+        workers: int = 4
+    ):
+        self.file_handler = file_handler
+        self.paths = paths
+        self.keyword = keyword
+        self.encoding = encoding
+        self.max_file_size = max_file_size
+        self.max_matches_per_file = max_matches_per_file
+        self.max_total_matches = max_total_matches
+        self.timeout = timeout
+        self.workers = workers
+
+        self.truncated = False
+        self.scanned = 0
+        self.match_count = 0
+        self.skipped: list[tuple[str, str]] = []  # (パス, 理由)
+
+    def __aiter__(self) -> AsyncIterator[FileMatches]:
+        return self._run()
+
+    async def collect(self) -> list[FileMatches]:
+        """すべての結果を取得（パス順）"""
+        return sorted([result async for result in self], key=lambda result: result.path)
+
+    def _scan(self, path: str) -> FileMatches:
+        """1ファイルを検索（ワーカースレッドで実行）"""
+        with self.file_handler.open_mapped(path, self.max_file_size) as mapped:
+            matches = find_matching_lines(
+                mapped, self.keyword, self.encoding, self.max_matches_per_file + 1
+            )
+        truncated = len(matches) > self.max_matches_per_file
+        return FileMatches(path, matches[:self.max_matches_per_file], truncated)
+
+    async def _run(self) -> AsyncIterator[FileMatches]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def scan(path: str) -> Optional[FileMatches]:
+            async with semaphore:
+                # 期限を過ぎたファイルは開始しない
+                if loop.time() >= deadline:
+                    return None
+                try:
+                    return await asyncio.to_thread(self._scan, path)
+                except (OSError, ValueError, RuntimeError) as e:
+                    # UnicodeDecodeError（ValueErrorの派生）・サイズ超過・削除済み等はスキップ
+                    self.skipped.append((path, str(e)))
+                    return FileMatches(path, [])
+
+        tasks = [asyncio.ensure_future(scan(path)) for path in self.paths]
+        try:
+            for next_result in asyncio.as_completed(tasks, timeout=self.timeout):
+                try:
+                    result = await next_result
+                except asyncio.TimeoutError:
+                    break
+                if result is None:
+                    continue
+
+                self.scanned += 1
+                if not result.matches:
+                    continue
+
+                room = self.max_total_matches - self.match_count
+                if len(result.matches) > room:
+                    result = result._replace(matches=result.matches[:room], truncated=True)
+                    self.truncated = True
+                self.match_count += len(result.matches)
+                if result.matches:
+                    yield result
+                if self.match_count >= self.max_total_matches:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            # 期限切れ・上限到達で検索しなかったファイルがあれば打ち切り
+            if self.scanned < len(self.paths):
+                self.truncated = True
+            logger.info(
+                f"Directory search for '{self.keyword}': {self.match_count} matches "
+                f"in {self.scanned}/{len(self.paths)} files"
+                f"{' (truncated)' if self.truncated else ''}"
+            )
@@ -0,0 +1,518 @@
+"""セマンティック検索 - セクション単位のチャンク分割とベクトル索引
+
+numpy のみに依存し、外部モデルのダウンロードなしでオフライン動作します。
+埋め込みモデルは `Embedder` プロトコルを満たすオブジェクトで差し替え可能です。
+"""
+
+import asyncio
+import functools
+import hashlib
+import importlib
+import math
+import re
+import unicodedata
+import zlib
+from typing import NamedTuple, Optional, Protocol, Sequence
+
+import numpy as np
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.utils.logging import setup_logging
+from mcp_server.utils.progress import WarmupProgress
+
+logger = setup_logging(__name__)
+
+# Markdown見出し（# 〜 ######）
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# 単語トークン（日本語などの連続文字列も1トークンとして取得）
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Chunk(NamedTuple):
+    """セクション単位のチャンク
+
+    Attributes:
+        path: ドキュメントの相対パス
+        heading: 所属する見出し（見出しがない場合は空文字）
+        start_line: チャンクの開始行（1始まり）
+        text: チャンク本文
+        occurrence: 同じファイル内で同じ内容のチャンクの出現順（0始まり）
+    """
+
+    path: str
+    heading: str
+    start_line: int
+    text: str
+    occurrence: int = 0
+
+    @property
+    def digest(self) -> str:
+        """チャンク内容のハッシュ（変更検出用）"""
+        data = f"{self.heading}\n{self.text}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+    @property
+    def key(self) -> str:
+        """索引のキー（パス + 内容ハッシュ + 出現順）"""
+        return f"{self.path}#{self.digest}:{self.occurrence}"
+
+
+class SemanticHit(NamedTuple):
+    """セマンティック検索の結果"""
+
+    chunk: Chunk
+    score: float
+
+
+class Embedder(Protocol):
+    """埋め込みモデルのインターフェース
+
+    `embed` はL2正規化済みの (len(texts), dimension) 行列を返す必要があります。
+    """
+
+    dimension: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+def chunk_document(path: str, text: str, max_chars: int = 1500) -> list[Chunk]:
+    """ドキュメントを見出し（セクション）単位のチャンクに分割
+
+    Args:
+        path: ドキュメントの相対パス
+        text: ドキュメント本文
+        max_chars: 1チャンクの最大文字数。超える場合は段落境界で分割
+
+    Returns:
+        チャンクのリスト（空のセクションは除外）
+    """
+    sections: list[tuple[str, int, list[str]]] = []
+    heading = ""
+    start_line = 1
+    buffer: list[str] = []
+
+    for line_num, line in enumerate(text.split("\n"), start=1):
+        match = _HEADING_RE.match(line)
+        if match:
+            sections.append((heading, start_line, buffer))
+            heading = match.group(2)
+            start_line = line_num
+            buffer = []
+        else:
+            buffer.append(line)
+    sections.append((heading, start_line, buffer))
+
+    chunks = []
+    for heading, start_line, lines in sections:
+        piece: list[str] = []
+        piece_start = start_line
+        piece_len = 0
+        for offset, line in enumerate(lines):
+            # 段落境界（空行）で max_chars を超えそうなら区切る
+            if piece_len >= max_chars and not line.strip():
+                _append_chunk(chunks, path, heading, piece_start, piece)
+                piece = []
+                piece_len = 0
+                piece_start = start_line + offset + 1
+                continue
+            piece.append(line)
+            piece_len += len(line) + 1
+        _append_chunk(chunks, path, heading, piece_start, piece)
+
+    # 同じ内容のチャンクは出現順で区別（索引のキーが重複しないようにする）
+    seen: dict[str, int] = {}
+    for i, chunk in enumerate(chunks):
+        digest = chunk.digest
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        if occurrence:
+            chunks[i] = chunk._replace(occurrence=occurrence)
+    return chunks
+
+
+def _append_chunk(
+    chunks: list[Chunk],
+    path: str,
+    heading: str,
+    start_line: int,
+    lines: list[str]
+) -> None:
+    body = "\n".join(lines).strip()
+    if body or heading:
+        chunks.append(Chunk(path, heading, start_line, body))
+
+
+class HashingEmbedder:
+    """特徴量ハッシングによる軽量なCPU埋め込みモデル
+
+    単語・単語バイグラム・文字n-gramをハッシュして固定次元のベクトルにします。
+    文字n-gramにより語形変化や分かち書きのない日本語にもある程度対応できます。
+    学習済みモデルやネットワークアクセスは不要です。
+
+    Args:
+        dimension: ベクトルの次元数
+        char_ngram: 文字n-gramの長さ
+    """
+
+    def __init__(self, dimension: int = 512, char_ngram: int = 3):
+        self.dimension = dimension
+        self.char_ngram = char_ngram
+
+    def _features(self, text: str) -> dict[int, float]:
+        normalized = unicodedata.normalize("NFKC", text).casefold()
+        tokens = _TOKEN_RE.findall(normalized)
+
+        counts: dict[int, float] = {}
+
+        def add(feature: str, weight: float) -> None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            # 上位ビットで符号を決め、衝突による偏りを打ち消す
+            sign = 1.0 if h & 0x80000000 else -1.0
+            index = h % self.dimension
+            counts[index] = counts.get(index, 0.0) + sign * weight
+
+        n = self.char_ngram
+        for i, token in enumerate(tokens):
+            add(f"w:{token}", 1.0)
+            if i > 0:
+                add(f"b:{tokens[i - 1]} {token}", 0.5)
+            padded = f" {token} "
+            for j in range(max(len(padded) - n + 1, 1)):
+                add(f"c:{padded[j:j + n]}", 0.3)
+
+        return counts
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, value in self._features(text).items():
+                # 出現回数の影響を対数でなだらかにする
+                vectors[row, index] = math.copysign(math.log1p(abs(value)), value)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+@functools.lru_cache(maxsize=None)
+def load_embedder(spec: str) -> Embedder:
+    """"module:attribute" 形式の指定から埋め込みモデルを読み込む
+
+    attribute がクラスや関数の場合は引数なしで呼び出した結果を使用します。
+    同じ指定は1度だけ読み込み、複数のドキュメントルートで共有します。
+
+    Args:
+        spec: 例 "my_package.embedders:MiniLMEmbedder"
+
+    Returns:
+        埋め込みモデル
+
+    Raises:
+        ValueError: 指定形式が不正な場合
+    """
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Invalid embedder spec (expected 'module:attr'): {spec}")
+
+    target = getattr(importlib.import_module(module_name), attr)
+    if isinstance(target, type) or not hasattr(target, "embed"):
+        target = target()
+    embedder = target
+    logger.info(f"Loaded embedder: {spec} (dimension: {embedder.dimension})")
+    return embedder
+
+
+class VectorIndex:
+    """NumPy行列を用いたベクトル索引
+
+    ベクトルはL2正規化済みを前提とし、内積（コサイン類似度）で検索します。
+    容量は倍々で拡張し、削除は末尾要素との入れ替えで行うため、
+    追加・削除ともに行列全体の再構築は発生しません。
+
+    Args:
+        dimension: ベクトルの次元数
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self._matrix = np.zeros((64, dimension), dtype=np.float32)
+        self._keys: list[str] = []
+        self._positions: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    @property
+    def nbytes(self) -> int:
+        """索引が確保しているメモリ量（バイト）"""
+        return self._matrix.nbytes
+
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    def upsert(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """ベクトルを追加（既存キーは上書き）"""
+        for key, vector in zip(keys, vectors):
+            position = self._positions.get(key)
+            if position is None:
+                position = len(self._keys)
+                if position >= len(self._matrix):
+                    grown = np.zeros(
+                        (len(self._matrix) * 2, self.dimension), dtype=np.float32
+                    )
+                    grown[:position] = self._matrix[:position]
+                    self._matrix = grown
+                self._keys.append(key)
+                self._positions[key] = position
+            self._matrix[position] = vector
+
+    def remove(self, keys: Sequence[str]) -> None:
+        """ベクトルを削除（存在しないキーは無視）"""
+        for key in keys:
+            position = self._positions.pop(key, None)
+            if position is None:
+                continue
+            last = len(self._keys) - 1
+            last_key = self._keys.pop()
+            if position != last:
+                self._matrix[position] = self._matrix[last]
+                self._keys[position] = last_key
+                self._positions[last_key] = position
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int = 5,
+        mask: Optional[np.ndarray] = None
+    ) -> list[list[tuple[str, float]]]:
+        """複数クエリをまとめて検索
+
+        Args:
+            queries: (n, dimension) のクエリ行列
+            top_k: クエリごとの最大件数
+            mask: 検索対象を絞り込む真偽値配列（長さは索引の件数）
+
+        Returns:
+            クエリごとの (キー, スコア) のリスト（スコア降順）
+        """
+        size = len(self._keys)
+        if size == 0:
+            return [[] for _ in range(len(queries))]
+
+        # 1回の行列積で全クエリのスコアを計算
+        scores = queries @ self._matrix[:size].T
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+
+        k = min(top_k, size)
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append([
+                (self._keys[i], float(row[i])) for i in top if np.isfinite(row[i])
+            ])
+        return results
+
+
+class SemanticIndex:
+    """ドキュメントディレクトリ全体のセマンティック索引
+
+    ファイルの更新時刻とサイズで変更を検出し、変更されたファイルのうち
+    内容が変わったチャンクだけを再度埋め込みます。
+
+    Args:
+        file_handler: ファイル読み込みに使用するハンドラー
+        embedder: 埋め込みモデル（Noneの場合は HashingEmbedder）
+        max_file_size: 索引対象とする最大ファイルサイズ（バイト）
+        pattern: 索引対象のグロブパターン
+        batch_size: 1回に埋め込むチャンク数
+    """
+
+    def __init__(
+        self,
+        file_handler: SafeFileHandler,
+        embedder: Optional[Embedder] = None,
+        max_file_size: int = 10 * 1024 * 1024,
+        pattern: str = "**/*",
+        batch_size: int = 64
+    ):
+        self.file_handler = file_handler
+        self.embedder = embedder or HashingEmbedder()
+        self.max_file_size = max_file_size
+        self.pattern = pattern
+        self.batch_size = batch_size
+        self.index = VectorIndex(self.embedder.dimension)
+
+        self._file_states: dict[str, tuple[int, int]] = {}
+        self._file_keys: dict[str, set[str]] = {}
+        self._chunks: dict[str, Chunk] = {}
+        self._lock = asyncio.Lock()
+
+    async def refresh(
+        self,
+        encoding: str = "utf-8",
+        progress: Optional[WarmupProgress] = None
+    ) -> int:
+        """変更されたファイルを索引に反映
+
+        Args:
+            encoding: ファイルエンコーディング
+            progress: 進捗の報告先（変更されたファイル数・バイト数）。
+                失敗時の finish() は呼び出し側で行う
+
+        Returns:
+            新たに埋め込んだチャンク数
+        """
+        async with self._lock:
+            current = await asyncio.to_thread(self._scan)
+
+            # 削除されたファイル
+            for path in set(self._file_states) - set(current):
+                self._drop_file(path)
+
+            changed = {
+                path: state for path, state in current.items()
+                if self._file_states.get(path) != state
+            }
+            if progress is not None:
+                progress.begin(
+                    files=len(changed),
+                    bytes_total=sum(size for _, size in changed.values())
+                )
+
+            pending: list[Chunk] = []
+            # 埋め込み待ちのチャンクを含むファイル（埋め込みの完了後に状態を記録）
+            pending_files: list[tuple[str, tuple[int, int]]] = []
+            embedded = 0
+            for path, state in changed.items():
+                if state[1] > self.max_file_size:
+                    self._drop_file(path)
+                    if progress is not None:
+                        progress.advance(files=1, bytes_done=state[1])
+                    continue
+                try:
+                    text = await self.file_handler.read(path, encoding=encoding)
+                except (OSError, ValueError, RuntimeError) as e:
+                    # バイナリや別エンコーディングのファイル、走査後に削除・置換されたファイルは索引対象外
+                    logger.debug(f"Skipping {path} for semantic index: {e}")
+                    self._drop_file(path)
+                    self._file_states[path] = state
+                    if progress is not None:
+                        progress.advance(files=1, bytes_done=state[1])
+                    continue
+
+                chunks = {chunk.key: chunk for chunk in chunk_document(path, text)}
+                old_keys = self._file_keys.get(path, set())
+                self.index.remove(list(old_keys - chunks.keys()))
+                for key in old_keys - chunks.keys():
+                    self._chunks.pop(key, None)
+                for key, chunk in chunks.items():
+                    if key in self.index:
+                        # 内容が同じでも前のセクションの追加・削除で行番号は変わる
+                        self._chunks[key] = chunk
+                    else:
+                        pending.append(chunk)
+                pending_files.append((path, state))
+                self._file_keys[path] = set(chunks)
+
+                if len(pending) >= self.batch_size:
+                    embedded += await self._embed(pending)
+                    self._commit_files(pending_files, progress)
+                    pending = []
+                    pending_files = []
+
+            embedded += await self._embed(pending)
+            self._commit_files(pending_files, progress)
+            if progress is not None:
+                progress.finish()
+
+            if embedded:
+                logger.info(
+                    f"Semantic index updated: {embedded} chunks embedded "
+                    f"({len(self.index)} total)"
+                )
+            return embedded
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """索引対象のファイルと (更新時刻, サイズ) を取得（ワーカースレッドで実行）
+
+        検証は read() と同じで、基準ディレクトリ外を指すシンボリックリンクや
+        走査中に削除されたファイルは除外します。
+        """
+        current = {}
+        for path in self.file_handler.list_files(".", self.pattern):
+            try:
+                stat = self.file_handler.stat(path)
+            except (OSError, ValueError, RuntimeError) as e:
+                logger.debug(f"Skipping {path} for semantic index: {e}")
+                continue
+            current[path] = (stat.st_mtime_ns, stat.st_size)
+        return current
+
+    def _commit_files(
+        self,
+        files: list[tuple[str, tuple[int, int]]],
+        progress: Optional[WarmupProgress]
+    ) -> None:
+        """埋め込みが完了したファイルの状態を記録（失敗した場合は次回に再試行）"""
+        for path, state in files:
+            self._file_states[path] = state
+        if progress is not None:
+            progress.advance(files=len(files), bytes_done=sum(state[1] for _, state in files))
+
+    async def _embed(self, chunks: list[Chunk]) -> int:
+        """チャンクを埋め込んで索引に追加"""
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            texts = [f"{chunk.heading}\n{chunk.text}" for chunk in batch]
+            vectors = await asyncio.to_thread(self.embedder.embed, texts)
+            self.index.upsert([chunk.key for chunk in batch], vectors)
+            for chunk in batch:
+                self._chunks[chunk.key] = chunk
+        return len(chunks)
+
+    def _drop_file(self, path: str) -> None:
+        keys = self._file_keys.pop(path, set())
+        self.index.remove(list(keys))
+        for key in keys:
+            self._chunks.pop(key, None)
+        self._file_states.pop(path, None)
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        directory: str = "."
+    ) -> list[SemanticHit]:
+        """クエリに意味的に近いチャンクを検索
+
+        Args:
+            query: 検索クエリ（自然文可）
+            top_k: 最大件数
+            directory: 検索対象を限定するディレクトリ（相対パス）
+
+        Returns:
+            検索結果（スコア降順）
+
+        Raises:
+            ValueError: パストラバーサル攻撃を検出した場合
+        """
+        prefix = self.file_handler.normalize(directory)
+        vector = await asyncio.to_thread(self.embedder.embed, [query])
+
+        mask = None
+        if prefix != ".":
+            keys = self.index.keys()
+            mask = np.fromiter(
+                (key.startswith(prefix + "/") for key in keys),
+                dtype=bool,
+                count=len(keys)
+            )
+
+        hits = self.index.search(vector, top_k, mask)[0]
+        return [SemanticHit(self._chunks[key], score) for key, score in hits]
@@ -0,0 +1,301 @@
+"""ドキュメントツリー - メモリ上のファイル一覧による階層表示とページ分割
+
+ファイル一覧をメモリ上のツリーとして保持し、ディレクトリごとの集計
+（ファイル数・合計サイズ・最終更新時刻）とパス順のページ分割を glob せずに返します。
+ツリーは一定時間（ttl）ごとにワーカースレッドで作り直します。
+"""
+
+import asyncio
+import base64
+import binascii
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple, Optional
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+
+class FileEntry(NamedTuple):
+    """ツリー内のファイル"""
+
+    path: str
+    size: int
+    mtime: float
+
+
+class ListingPage(NamedTuple):
+    """ファイル一覧の1ページ"""
+
+    paths: list[str]
+    next_cursor: Optional[str] = None  # 次のページのカーソル（最後のページの場合はNone）
+
+
+class DirectoryNode:
+    """ディレクトリとその配下の集計
+
+    Attributes:
+        path: 基準ディレクトリからの相対パス（基準ディレクトリは "."）
+        dirs: サブディレクトリ（名前 → ノード）
+        files: 直下のファイル（名前 → ファイル）
+        file_count: 配下（サブディレクトリを含む）のファイル数
+        total_bytes: 配下のファイルの合計サイズ
+        latest_mtime: 配下のファイルの最終更新時刻（ファイルがない場合はNone）
+        largest_bytes: 配下の最大のファイルのサイズ（読み込みのメモリ使用量の見積もり用）
+    """
+
+    __slots__ = (
+        "path", "dirs", "files", "file_count", "total_bytes", "latest_mtime", "largest_bytes",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dirs: dict[str, "DirectoryNode"] = {}
+        self.files: dict[str, FileEntry] = {}
+        self.file_count = 0
+        self.total_bytes = 0
+        self.latest_mtime: Optional[float] = None
+        self.largest_bytes = 0
+
+    def add_totals(
+        self,
+        file_count: int,
+        total_bytes: int,
+        latest_mtime: Optional[float],
+        largest_bytes: int
+    ) -> None:
+        self.file_count += file_count
+        self.total_bytes += total_bytes
+        self.largest_bytes = max(self.largest_bytes, largest_bytes)
+        if latest_mtime is not None and (
+            self.latest_mtime is None or latest_mtime > self.latest_mtime
+        ):
+            self.latest_mtime = latest_mtime
+
+    def to_dict(self, depth: int = 1) -> dict:
+        """集計を辞書に変換（depth 階層下までのサブディレクトリと直下のファイルを含む）"""
+        data = {
+            "path": self.path,
+            "file_count": self.file_count,
+            "total_bytes": self.total_bytes,
+            "latest_mtime": self.latest_mtime,
+        }
+        if depth > 0:
+            data["dirs"] = [
+                self.dirs[name].to_dict(depth - 1) for name in sorted(self.dirs)
+            ]
+            data["files"] = [self.files[name]._asdict() for name in sorted(self.files)]
+        return data
+
+
+def glob_to_regex(pattern: str) -> re.Pattern:
+    """glob パターンを正規表現に変換（Path.glob と同じく "*" は "/" をまたがない）
+
+    "**/" は0個以上のディレクトリ、末尾の "**" は任意の深さに一致します。
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z", re.DOTALL)
+
+
+def encode_cursor(path: str) -> str:
+    """ページの最後のパスをカーソルに変換"""
+    return base64.urlsafe_b64encode(path.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    """カーソルをパスに戻す
+
+    Raises:
+        ValueError: 不正なカーソル
+    """
+    try:
+        return base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class DocumentTree:
+    """基準ディレクトリ全体のファイルツリー
+
+    作成から ttl 秒が経過した後の最初の呼び出しで作り直します（同時に呼び出された
+    場合は1回の走査を共有）。含めるファイルは SafeFileHandler.list_files と同じで、
+    基準ディレクトリ内を指すファイルへのシンボリックリンクは含め、
+    ディレクトリへのシンボリックリンクはたどりません。
+
+    Args:
+        file_handler: ファイルハンドラ
+        ttl: ツリーを再利用する秒数
+
+    Example:
+        >>> tree = DocumentTree(SafeFileHandler("/docs"))
+        >>> node = await tree.directory("guides")
+        >>> node.file_count, node.total_bytes
+        >>> page = await tree.page(".", "**/*.md", limit=100)
+        >>> await tree.page(".", "**/*.md", cursor=page.next_cursor, limit=100)
+    """
+
+    def __init__(self, file_handler: SafeFileHandler, ttl: float = 5.0):
+        self.file_handler = file_handler
+        self.ttl = ttl
+        self._root: Optional[DirectoryNode] = None
+        self._paths: list[str] = []  # すべてのファイルの相対パス（ソート済み）
+        self._built = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """次の呼び出しでツリーを作り直す"""
+        self._root = None
+
+    def _expired(self) -> bool:
+        return self._root is None or time.monotonic() - self._built >= self.ttl
+
+    async def _snapshot(self) -> DirectoryNode:
+        if self._expired():
+            async with self._lock:
+                # 待っている間に他の呼び出しが作り直した場合はそれを使う
+                if self._expired():
+                    self._root, self._paths = await asyncio.to_thread(self._scan)
+                    self._built = time.monotonic()
+        return self._root
+
+    def _scan(self) -> tuple[DirectoryNode, list[str]]:
+        """基準ディレクトリを走査してツリーを作成（ファイルごとに1回の stat）"""
+        start = time.perf_counter()
+        base = str(self.file_handler.base_path)
+        paths: list[str] = []
+
+        def walk(full_dir: str, node: DirectoryNode, prefix: str) -> None:
+            try:
+                entries = list(os.scandir(full_dir))
+            except OSError as e:
+                logger.warning(f"Skipping unreadable directory {full_dir}: {e}")
+                return
+            for entry in entries:
+                try:
+                    if entry.is_symlink():
+                        # ディレクトリへのリンクはたどらず、ファイルへのリンクは
+                        # 基準ディレクトリ内を指す場合のみ含める（list_files と同じ）
+                        if entry.is_dir() or not self.file_handler.contains(entry.path):
+                            continue
+                    if entry.is_dir():
+                        child = DirectoryNode(prefix + entry.name)
+                        walk(entry.path, child, prefix + entry.name + "/")
+                        node.dirs[entry.name] = child
+                        node.add_totals(
+                            child.file_count, child.total_bytes,
+                            child.latest_mtime, child.largest_bytes
+                        )
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        file = FileEntry(prefix + entry.name, stat.st_size, stat.st_mtime)
+                        node.files[entry.name] = file
+                        node.add_totals(1, file.size, file.mtime, file.size)
+                        paths.append(file.path)
+                except OSError:
+                    # 走査中に削除されたファイル等
+                    continue
+
+        root = DirectoryNode(".")
+        walk(base, root, "")
+        paths.sort()
+        logger.info(
+            f"Built document tree: {root.file_count} files "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        return root, paths
+
+    async def directory(self, directory: str = ".") -> DirectoryNode:
+        """ディレクトリのノードを取得
+
+        Raises:
+            ValueError: パストラバーサル攻撃を検出した場合・ファイルを指定した場合
+            FileNotFoundError: ディレクトリが存在しない場合
+        """
+        relative = self.file_handler.normalize(directory)
+        node = await self._snapshot()
+        if relative == ".":
+            return node
+
+        *parents, name = relative.split("/")
+        for part in parents:
+            node = node.dirs.get(part)
+            if node is None:
+                raise FileNotFoundError(f"Directory not found: {directory}")
+        if name in node.files:
+            raise ValueError(f"Path is not a directory: {directory}")
+        if name not in node.dirs:
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        return node.dirs[name]
+
+    async def page(
+        self,
+        directory: str = ".",
+        pattern: str = "*",
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> ListingPage:
+        """ファイル一覧をパス順に1ページ分取得
+
+        カーソルは前のページの最後のパスを表すため、ページの間にファイルが
+        追加・削除されても重複や抜けなく続きを取得できます。
+
+        Args:
+            directory: 一覧を取得するディレクトリ
+            pattern: ファイル名パターン（directory からの相対パスに対する glob）
+            cursor: 前のページの next_cursor（Noneの場合は最初から）
+            limit: 1ページの最大件数
+
+        Raises:
+            ValueError: 不正なパス・カーソル・件数
+            FileNotFoundError: ディレクトリが存在しない場合
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        node = await self.directory(directory)
+        prefix = "" if node.path == "." else node.path + "/"
+        regex = glob_to_regex(pattern)
+        paths = self._paths
+
+        # 同じディレクトリ配下のパスはソート済みの一覧で連続している
+        start = bisect_left(paths, prefix)
+        if cursor:
+            start = max(start, bisect_right(paths, decode_cursor(cursor)))
+
+        results: list[str] = []
+        for i in range(start, len(paths)):
+            path = paths[i]
+            if not path.startswith(prefix):
+                break
+            if regex.match(path, len(prefix)):
+                if len(results) == limit:
+                    return ListingPage(results, encode_cursor(results[-1]))
+                results.append(path)
+        return ListingPage(results)
@@ -0,0 +1,126 @@
+"""ドキュメントごとのアクセス頻度の記録と永続化"""
+
+import json
+import math
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from mcp_server.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+
+class AccessStats:
+    """ドキュメントごとのアクセス頻度
+
+    アクセス回数は半減期で減衰させ、最近よく使われるドキュメントほど上位になります。
+    アクセスの傾向が変わった場合も古い記録に引きずられずに追従します。
+
+    Args:
+        path: 保存先のJSONファイル（Noneの場合は保存しない）
+        half_life: アクセス回数の半減期（秒）
+
+    Example:
+        >>> stats = AccessStats("/var/lib/mcp/default.access.json")
+        >>> stats.load()
+        >>> stats.record("guides/setup.md")
+        >>> stats.top(10)
+        ['guides/setup.md']
+        >>> stats.save()
+    """
+
+    def __init__(self, path: Optional[str] = None, half_life: float = 24 * 3600.0):
+        self.path = Path(path) if path else None
+        self.half_life = half_life
+        # パス → (減衰前のスコア, 最終アクセス時刻)
+        self._scores: dict[str, tuple[float, float]] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, last: float, now: float) -> float:
+        return score * math.pow(0.5, max(now - last, 0.0) / self.half_life)
+
+    def record(self, path: str, now: Optional[float] = None) -> None:
+        """アクセスを記録"""
+        now = time.time() if now is None else now
+        score, last = self._scores.get(path, (0.0, now))
+        self._scores[path] = (self._decayed(score, last, now) + 1.0, now)
+        self._dirty = True
+
+    def score(self, path: str, now: Optional[float] = None) -> float:
+        """現在のスコア（減衰後のアクセス回数）"""
+        now = time.time() if now is None else now
+        score, last = self._scores.get(path, (0.0, now))
+        return self._decayed(score, last, now)
+
+    def top(self, n: int, now: Optional[float] = None) -> list[str]:
+        """スコアの高い順にパスを取得"""
+        now = time.time() if now is None else now
+        ranked = sorted(
+            self._scores,
+            key=lambda path: -self._decayed(*self._scores[path], now)
+        )
+        return ranked[:n]
+
+    def forget(self, path: str) -> None:
+        """記録を削除（削除されたファイル等）"""
+        if self._scores.pop(path, None) is not None:
+            self._dirty = True
+
+    def load(self) -> int:
+        """保存されたアクセス頻度を読み込む
+
+        ファイルがない・壊れている場合は空の状態で開始します。
+        読み込み前に記録したアクセスは保持します。
+
+        Returns:
+            読み込んだドキュメント数
+        """
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            loaded = {
+                path: (float(score), float(last))
+                for path, (score, last) in data.get("documents", {}).items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable access stats {self.path}: {e}")
+            return 0
+
+        # 読み込み前に記録したアクセスを優先
+        loaded.update(self._scores)
+        self._scores = loaded
+        return len(loaded)
+
+    def save(self) -> bool:
+        """アクセス頻度を保存（変更がない場合は何もしない）
+
+        一時ファイルに書き込んでから置き換えるため、書き込み途中のファイルは残りません。
+
+        Returns:
+            保存した場合True
+        """
+        if self.path is None or not self._dirty:
+            return False
+        data = {
+            "version": 1,
+            "half_life": self.half_life,
+            "documents": {path: list(entry) for path, entry in self._scores.items()},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save access stats {self.path}: {e}")
+            return False
+        self._dirty = False
+        return True
@@ -0,0 +1,183 @@
+"""アドミッション制御 - 同時実行数とメモリ使用量の上限管理"""
+
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple
+
+
+class AdmissionRejected(Exception):
+    """リクエストが上限により受け付けられなかった
+
+    Attributes:
+        status_code: 返すべきHTTPステータス（429: クライアント単位の上限、503: 全体の上限）
+        retry_after: 再試行までの推奨秒数
+    """
+
+    def __init__(self, status_code: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Waiter(NamedTuple):
+    cost: int
+    future: asyncio.Future
+
+
+class AdmissionController:
+    """同時実行数と処理中バイト数の上限を管理するアドミッション制御
+
+    上限に達したリクエストはクライアントごとのキューで待機し、
+    枠が空くとクライアント間でラウンドロビンに割り当てられます。
+    キューが満杯の場合は待たずに即座に拒否します。
+
+    Args:
+        max_inflight: 同時に処理するリクエスト数の上限
+        max_inflight_bytes: 処理中リクエストが確保するメモリ量（見積もり）の上限
+        max_queue: 全体の待機リクエスト数の上限（超過時は503）
+        max_queue_per_client: クライアントごとの待機リクエスト数の上限（超過時は429）
+        queue_timeout: 待機の最大秒数（超過時は503）
+        retry_after: 拒否時に返す Retry-After 秒数
+
+    Example:
+        >>> admission = AdmissionController(max_inflight=8)
+        >>> async with admission.admit("client-a", cost=1024):
+        ...     ...  # 処理
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 16,
+        max_inflight_bytes: int = 128 * 1024 * 1024,  # 128MB
+        max_queue: int = 64,
+        max_queue_per_client: int = 8,
+        queue_timeout: float = 2.0,
+        retry_after: int = 1
+    ):
+        self.max_inflight = max_inflight
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self.inflight = 0
+        self.inflight_bytes = 0
+        self.queued = 0
+        self.rejected = 0
+        self._queues: "OrderedDict[str, deque[_Waiter]]" = OrderedDict()
+
+    def stats(self) -> dict[str, int]:
+        """現在の状態"""
+        return {
+            "inflight": self.inflight,
+            "inflight_bytes": self.inflight_bytes,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+    @asynccontextmanager
+    async def admit(self, client: str, cost: int = 0) -> AsyncIterator[None]:
+        """処理枠を確保し、終了時に解放する
+
+        Args:
+            client: クライアント識別子（公平な割り当ての単位）
+            cost: リクエストが確保するメモリ量の見積もり（バイト）
+
+        Raises:
+            AdmissionRejected: 上限により受け付けられない場合
+        """
+        # 単独でも予算を超えるリクエストは、他に処理中がなければ実行できるよう切り詰める
+        cost = min(max(cost, 0), self.max_inflight_bytes)
+        await self._acquire(client, cost)
+        try:
+            yield
+        finally:
+            self._release(cost)
+
+    def _fits(self, cost: int) -> bool:
+        return (
+            self.inflight < self.max_inflight
+            and self.inflight_bytes + cost <= self.max_inflight_bytes
+        )
+
+    def _grant(self, cost: int) -> None:
+        self.inflight += 1
+        self.inflight_bytes += cost
+
+    def _reject(self, status_code: int, message: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(status_code, message, self.retry_after)
+
+    async def _acquire(self, client: str, cost: int) -> None:
+        # 待機中のリクエストがなければ即座に許可（待機中がいる場合は順番を守る）
+        if not self.queued and self._fits(cost):
+            self._grant(cost)
+            return
+
+        queue = self._queues.get(client)
+        if queue is not None and len(queue) >= self.max_queue_per_client:
+            raise self._reject(429, "Too many queued requests for this client")
+        if self.queued >= self.max_queue:
+            raise self._reject(503, "Server is overloaded")
+
+        waiter = _Waiter(cost, asyncio.get_running_loop().create_future())
+        if queue is None:
+            queue = self._queues[client] = deque()
+        queue.append(waiter)
+        self.queued += 1
+
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 許可とタイムアウトが同時に起きた場合は枠を返却
+                self._release(cost)
+            else:
+                self._remove(client, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(503, "Timed out waiting for capacity")
+            raise
+
+    def _remove(self, client: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(client)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self.queued -= 1
+        if not queue:
+            del self._queues[client]
+        # 先頭の待機者が抜けたことで後続が実行可能になる場合がある
+        self._dispatch()
+
+    def _release(self, cost: int) -> None:
+        self.inflight -= 1
+        self.inflight_bytes -= cost
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """空いた枠を待機中のクライアントへラウンドロビンで割り当て"""
+        progressed = True
+        while progressed and self._queues:
+            progressed = False
+            for client, queue in self._queues.items():
+                waiter = queue[0]
+                # タイムアウト処理中の待機者は割り当てずに取り除く
+                cancelled = waiter.future.done()
+                if not cancelled and not self._fits(waiter.cost):
+                    continue
+
+                queue.popleft()
+                self.queued -= 1
+                if queue:
+                    # 割り当てたクライアントは末尾へ回す
+                    self._queues.move_to_end(client)
+                else:
+                    del self._queues[client]
+
+                if not cancelled:
+                    self._grant(waiter.cost)
+                    waiter.future.set_result(None)
+                progressed = True
+                break
@@ -0,0 +1,115 @@
+"""メモリ使用量で上限を管理するLRUキャッシュ"""
+
+import sys
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ContentCache:
+    """バイト数の上限付きLRUキャッシュ
+
+    各エントリはファイルの状態（更新時刻・サイズ）と一緒に保存され、
+    状態が一致しない場合はキャッシュミスとして扱われます。
+
+    Args:
+        budget: キャッシュ全体の上限（バイト）。0の場合はキャッシュしない
+
+    Example:
+        >>> cache = ContentCache(budget=32 * 1024 * 1024)
+        >>> cache.put(("README.md", "utf-8"), (mtime_ns, size), content)
+        >>> cache.get(("README.md", "utf-8"), (mtime_ns, size))
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple[Hashable, Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> dict[str, int]:
+        """キャッシュの状態"""
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used,
+            "budget_bytes": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def get(self, key: Hashable, state: Hashable) -> Optional[Any]:
+        """キャッシュから取得
+
+        Args:
+            key: キャッシュキー
+            state: 現在のファイル状態。保存時と異なる場合はエントリを破棄
+
+        Returns:
+            キャッシュされた値。なければNone
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        cached_state, value, size = entry
+        if cached_state != state:
+            self._evict(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(
+        self,
+        key: Hashable,
+        state: Hashable,
+        value: Any,
+        size: Optional[int] = None
+    ) -> bool:
+        """キャッシュに保存
+
+        Args:
+            key: キャッシュキー
+            state: ファイル状態（更新時刻・サイズ等）
+            value: 保存する値
+            size: 値のメモリ使用量（バイト）。Noneの場合は sys.getsizeof で計算
+
+        Returns:
+            保存した場合True（上限を超える値は保存しない）
+        """
+        if size is None:
+            size = sys.getsizeof(value)
+        if size > self.budget:
+            return False
+
+        if key in self._entries:
+            self._evict(key)
+        while self.used + size > self.budget:
+            self._evict(next(iter(self._entries)))
+
+        self._entries[key] = (state, value, size)
+        self.used += size
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """エントリを破棄"""
+        if key in self._entries:
+            self._evict(key)
+
+    def clear(self) -> None:
+        """すべてのエントリを破棄"""
+        self._entries.clear()
+        self.used = 0
+
+    def _evict(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self.used -= size
@@ -5,6 +5,17 @@ import sys
 from pathlib import Path
 
 
+class _LazyFileHandler(logging.FileHandler):
+    """最初の書き込み時にログディレクトリとファイルを作成するハンドラ
+
+    インポート時のディレクトリ作成とファイルオープンを避け、起動を速くします。
+    """
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 def setup_logging(name: str, level: int = logging.INFO) -> logging.Logger:
     """STDIO通信に安全なロギングを設定
 
@@ -37,12 +48,10 @@ def setup_logging(name: str, level: int = logging.INFO) -> logging.Logger:
     stderr_handler.setFormatter(formatter)
     logger.addHandler(stderr_handler)
 
-    # File handler（永続化用）
-    log_dir = Path.home() / '.mcp' / 'logs'
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / f'{name}.log'
+    # File handler（永続化用、最初のログ出力時にオープン）
+    log_file = Path.home() / '.mcp' / 'logs' / f'{name}.log'
 
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler = _LazyFileHandler(log_file, encoding='utf-8', delay=True)
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
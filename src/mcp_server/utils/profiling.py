@@ -0,0 +1,79 @@
+"""稼働中のプロセスのCPUプロファイル取得"""
+
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+
+from mcp_server.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+
+class ProfileInProgress(RuntimeError):
+    """別のプロファイル取得が実行中"""
+
+
+class CPUProfiler:
+    """指定秒数だけCPUプロファイルを取得
+
+    cProfile はプロファイルを開始したスレッド（イベントループ）のみを計測します。
+    ワーカースレッドで実行される処理（大きなファイルの検索等）は、
+    スレッドへの受け渡しを待つ時間として計測されます。
+
+    Example:
+        >>> profiler = CPUProfiler()
+        >>> report = await profiler.capture_text(10.0, sort="tottime", limit=30)
+    """
+
+    def __init__(self, max_seconds: float = 60.0):
+        self.max_seconds = max_seconds
+        self._lock = asyncio.Lock()
+
+    async def capture(self, seconds: float) -> pstats.Stats:
+        """指定秒数の間プロファイルを取得
+
+        Raises:
+            ValueError: 秒数が範囲外の場合
+            ProfileInProgress: 別のプロファイル取得が実行中の場合
+        """
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be between 0 and {self.max_seconds}")
+        # プロファイラは同時に1つしか有効にできない
+        if self._lock.locked():
+            raise ProfileInProgress("Another profile is already being captured")
+
+        async with self._lock:
+            logger.info(f"Capturing CPU profile for {seconds} seconds")
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+        return pstats.Stats(profile)
+
+    async def capture_text(
+        self,
+        seconds: float,
+        sort: str = "cumulative",
+        limit: int = 50
+    ) -> str:
+        """プロファイルを取得して上位の関数を表形式で返す"""
+        if sort not in PROFILE_SORT_KEYS:
+            raise ValueError(
+                f"Unsupported sort key: {sort}. Supported: {', '.join(PROFILE_SORT_KEYS)}"
+            )
+        stats = await self.capture(seconds)
+        output = io.StringIO()
+        stats.stream = output
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    async def capture_raw(self, seconds: float) -> bytes:
+        """プロファイルを取得して pstats 形式（snakeviz 等で開けるファイル）で返す"""
+        stats = await self.capture(seconds)
+        return marshal.dumps(stats.stats)
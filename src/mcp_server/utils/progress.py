@@ -0,0 +1,90 @@
+"""起動時の処理（索引作成・先読み）の進捗"""
+
+import time
+from typing import Optional
+
+
+class WarmupProgress:
+    """ウォームアップ処理の進捗（処理したファイル数・バイト数と残り時間の見積もり）
+
+    状態は pending（開始前）/ running（実行中）/ done（完了）/ failed（失敗）です。
+
+    Example:
+        >>> progress = WarmupProgress()
+        >>> progress.begin(files=120, bytes_total=48_000_000)
+        >>> progress.advance(files=1, bytes_done=400_000)
+        >>> progress.snapshot()["eta_seconds"]
+    """
+
+    def __init__(self):
+        self.state = "pending"
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.error: Optional[str] = None
+        self.runs = 0  # 終了した回数（定期更新で再実行されても1回目の完了を判定できる）
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """完了または失敗したか"""
+        return self.state in ("done", "failed")
+
+    def begin(self, files: int = 0, bytes_total: int = 0) -> None:
+        """処理を開始（対象の総量を設定）"""
+        self.state = "running"
+        self.files_total = files
+        self.bytes_total = bytes_total
+        self.files_done = 0
+        self.bytes_done = 0
+        self.error = None
+        self._started = time.monotonic()
+        self._finished = None
+
+    def advance(self, files: int = 0, bytes_done: int = 0) -> None:
+        """処理済みの量を加算"""
+        self.files_done += files
+        self.bytes_done += bytes_done
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """処理を終了（例外を渡した場合は失敗）"""
+        self.state = "failed" if error is not None else "done"
+        self.error = str(error) if error is not None else None
+        self.runs += 1
+        self._finished = time.monotonic()
+
+    def eta(self) -> Optional[float]:
+        """残り時間の見積もり（秒）。見積もれない場合はNone
+
+        処理済みのバイト数（なければファイル数）の割合から計算します。
+        """
+        if self.state != "running" or self._started is None:
+            return 0.0 if self.finished else None
+        done, total = (
+            (self.bytes_done, self.bytes_total) if self.bytes_total
+            else (self.files_done, self.files_total)
+        )
+        if done <= 0:
+            return None
+        elapsed = time.monotonic() - self._started
+        return max(elapsed * (total - done) / done, 0.0)
+
+    def snapshot(self) -> dict:
+        """進捗の状態"""
+        elapsed = None
+        if self._started is not None:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        eta = self.eta()
+        return {
+            "state": self.state,
+            "runs": self.runs,
+            "files_scanned": self.files_done,
+            "files_total": self.files_total,
+            "bytes_indexed": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+            "eta_seconds": round(eta, 3) if eta is not None else None,
+            "error": self.error,
+        }
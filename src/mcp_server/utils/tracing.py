@@ -0,0 +1,302 @@
+"""リクエストごとの処理時間の計測（サンプリングしたトレースのファイル出力）
+
+`MCP_TRACE_FILE` を指定した場合のみ有効になり、リクエスト（ツール呼び出し・HTTPリクエスト）の
+一部をサンプリングして、パス解決・ファイル読み込み・デコード・検索などの区間（スパン）の
+処理時間を1行1件のJSONで出力します。ファイルへの書き込みは専用のスレッドで行い、
+イベントループを止めません。
+
+環境変数:
+    MCP_TRACE_FILE: 出力先のファイル（未指定の場合は無効）
+    MCP_TRACE_SAMPLE_RATE: 計測するリクエストの割合（0〜1、デフォルト: 0.1）
+    MCP_TRACE_FORMAT: json（1行1スパン）/ otlp（1行1トレースの OpenTelemetry OTLP/JSON 形式）
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from mcp_server.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+TRACE_FORMATS = ("json", "otlp")
+SERVICE_NAME = "mcp-document-server"
+
+
+class Span:
+    """処理区間"""
+
+    __slots__ = (
+        "trace", "span_id", "parent_id", "name", "attributes",
+        "start_ns", "end_ns", "error",
+    )
+
+    def __init__(self, trace: "_Trace", name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class _Trace:
+    """1リクエスト分のスパンの集まり"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[Span] = []
+
+
+# サンプリングしないリクエストの目印（子のスパンも作らない）
+_NOT_SAMPLED = object()
+
+_current: ContextVar[Any] = ContextVar("mcp_trace_span", default=None)
+
+
+class Tracer:
+    """サンプリングしたトレースをファイルに出力
+
+    終了したトレースはキューに入れ、書き込みスレッド（最初の出力時に起動）が
+    溜まった分をまとめてファイルに書き込みます。
+
+    Args:
+        path: 出力先のファイル
+        sample_rate: 計測するリクエストの割合（0〜1）
+        format: 出力形式（json / otlp）
+    """
+
+    def __init__(self, path: str, sample_rate: float = 0.1, format: str = "json"):
+        if format not in TRACE_FORMATS:
+            raise ValueError(
+                f"Unsupported trace format: {format}. Supported: {', '.join(TRACE_FORMATS)}"
+            )
+        self.path = path
+        self.sample_rate = sample_rate
+        self.format = format
+        self._queue: "queue.Queue[Optional[_Trace]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        parent = _current.get()
+        if parent is _NOT_SAMPLED:
+            yield None
+            return
+
+        if parent is None:
+            # リクエストの最初のスパンでサンプリングを判定
+            if random.random() >= self.sample_rate:
+                token = _current.set(_NOT_SAMPLED)
+                try:
+                    yield None
+                finally:
+                    _current.reset(token)
+                return
+            trace = _Trace()
+            parent_id = None
+        else:
+            trace = parent.trace
+            parent_id = parent.span_id
+
+        span = Span(trace, name, parent_id, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current.reset(token)
+            trace.spans.append(span)
+            if parent_id is None:
+                self._export(trace)
+
+    def _export(self, trace: _Trace) -> None:
+        """トレースを書き込みスレッドに渡す"""
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name="mcp-trace-writer", daemon=True
+                    )
+                    self._writer.start()
+        self._queue.put(trace)
+
+    def _write_loop(self) -> None:
+        while True:
+            traces = [self._queue.get()]
+            # 溜まっているトレースはまとめて1回で書き込む
+            while True:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write([trace for trace in traces if trace is not None])
+            finally:
+                for _ in traces:
+                    self._queue.task_done()
+            if None in traces:
+                return
+
+    def flush(self) -> None:
+        """書き込み待ちのトレースがすべてファイルに書き込まれるまで待つ"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """書き込み待ちのトレースを書き込んで書き込みスレッドを終了"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def _format(self, trace: _Trace) -> list[str]:
+        if self.format == "otlp":
+            return [json.dumps({
+                "resourceSpans": [{
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{
+                        "scope": {"name": "mcp_server"},
+                        "spans": [span.to_otlp() for span in trace.spans],
+                    }],
+                }]
+            })]
+        return [json.dumps(span.to_dict(), ensure_ascii=False) for span in trace.spans]
+
+    def _write(self, traces: list[_Trace]) -> None:
+        if not traces:
+            return
+        lines = [line for trace in traces for line in self._format(trace)]
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write trace to {self.path}: {e}")
+
+
+_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(
+    path: Optional[str] = None,
+    sample_rate: float = 0.1,
+    format: str = "json"
+) -> Optional[Tracer]:
+    """トレースの出力を設定（path が None の場合は無効）
+
+    設定済みのトレースは書き込み待ちの分を書き込んでから置き換えます。
+    """
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = Tracer(path, sample_rate, format) if path else None
+    if _tracer is not None:
+        logger.info(f"Tracing enabled: {path} (sample rate: {sample_rate}, format: {format})")
+    return _tracer
+
+
+def configure_tracing_from_env(environ: Optional[dict[str, str]] = None) -> Optional[Tracer]:
+    """環境変数からトレースの出力を設定"""
+    environ = os.environ if environ is None else environ
+    return configure_tracing(
+        environ.get("MCP_TRACE_FILE") or None,
+        sample_rate=float(environ.get("MCP_TRACE_SAMPLE_RATE", "0.1")),
+        format=environ.get("MCP_TRACE_FORMAT", "json")
+    )
+
+
+_DISABLED = nullcontext()
+
+
+def span(name: str, **attributes: Any):
+    """処理区間を計測
+
+    トレースが無効な場合・サンプリングされなかったリクエストでは何もしません。
+
+    Example:
+        >>> with span("file_handler.read", path=relative_path):
+        ...     content = await f.read()
+    """
+    if _tracer is None:
+        return _DISABLED
+    return _tracer.span(name, **attributes)
+
+
+def tracing_enabled() -> bool:
+    """トレースの出力が有効か"""
+    return _tracer is not None
+
+
+def flush_traces() -> None:
+    """書き込み待ちのトレースがすべてファイルに書き込まれるまで待つ"""
+    if _tracer is not None:
+        _tracer.flush()
+
+
+@atexit.register
+def _close_tracer() -> None:
+    if _tracer is not None:
+        _tracer.close()
+
+
+configure_tracing_from_env()
@@ -0,0 +1,60 @@
+"""Tests for AccessStats"""
+
+import json
+
+from mcp_server.utils.access_stats import AccessStats
+
+
+class TestAccessStats:
+    """AccessStatsのテスト"""
+
+    def test_top_by_frequency(self):
+        """アクセス回数の多い順"""
+        stats = AccessStats()
+        for path in ["a.md", "b.md", "b.md", "c.md", "c.md", "c.md"]:
+            stats.record(path, now=0)
+
+        assert stats.top(2, now=0) == ["c.md", "b.md"]
+
+    def test_decay_follows_recent_access(self):
+        """古いアクセスは半減期で減衰し、最近のアクセスが上位になる"""
+        stats = AccessStats(half_life=10)
+        for _ in range(4):
+            stats.record("old.md", now=0)
+        for _ in range(2):
+            stats.record("new.md", now=30)
+
+        assert stats.score("old.md", now=30) == 0.5
+        assert stats.top(1, now=30) == ["new.md"]
+
+    def test_save_and_load(self, tmp_path):
+        """保存したアクセス頻度を読み込み、読み込み前の記録も保持"""
+        path = tmp_path / "state" / "default.access.json"
+        stats = AccessStats(str(path))
+        stats.record("a.md")
+        assert stats.save()
+        assert not stats.save()  # 変更がなければ保存しない
+
+        restored = AccessStats(str(path))
+        restored.record("b.md")
+        assert restored.load() == 2
+        assert set(restored.top(10)) == {"a.md", "b.md"}
+
+    def test_load_ignores_broken_file(self, tmp_path):
+        """壊れたファイルは無視して空の状態で開始"""
+        path = tmp_path / "broken.json"
+        path.write_text("{not json", encoding="utf-8")
+        stats = AccessStats(str(path))
+
+        assert stats.load() == 0
+        assert len(stats) == 0
+
+    def test_saved_format(self, tmp_path):
+        """JSON形式で保存"""
+        path = tmp_path / "stats.json"
+        stats = AccessStats(str(path))
+        stats.record("a.md", now=100)
+        stats.save()
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert data["documents"] == {"a.md": [1.0, 100]}
@@ -0,0 +1,127 @@
+"""Tests for AdmissionController"""
+
+import asyncio
+
+import pytest
+
+from mcp_server.utils.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController:
+    """AdmissionControllerのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_admit_within_limits(self):
+        """上限内なら即座に許可され、終了時に解放"""
+        admission = AdmissionController(max_inflight=2)
+
+        async with admission.admit("a", cost=100):
+            assert admission.inflight == 1
+            assert admission.inflight_bytes == 100
+
+        assert admission.inflight == 0
+        assert admission.inflight_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_for_capacity(self):
+        """上限到達時は枠が空くまで待機"""
+        admission = AdmissionController(max_inflight=1, queue_timeout=1.0)
+        order = []
+
+        async def worker(name):
+            async with admission.admit(name):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(worker("a"), worker("b"))
+        assert order == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_byte_budget(self):
+        """処理中バイト数の上限"""
+        admission = AdmissionController(max_inflight_bytes=100, queue_timeout=0.05)
+
+        async with admission.admit("a", cost=80):
+            with pytest.raises(AdmissionRejected) as exc_info:
+                async with admission.admit("b", cost=50):
+                    pass
+            assert exc_info.value.status_code == 503
+
+            # 予算内のリクエストは許可
+            async with admission.admit("c", cost=20):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_runs_alone(self):
+        """予算を超えるリクエストも単独なら実行可能"""
+        admission = AdmissionController(max_inflight_bytes=100)
+
+        async with admission.admit("a", cost=1000):
+            assert admission.inflight_bytes == 100
+
+    @pytest.mark.asyncio
+    async def test_per_client_queue_limit(self):
+        """クライアントごとの待機上限を超えると429"""
+        admission = AdmissionController(
+            max_inflight=1, max_queue_per_client=1, queue_timeout=1.0
+        )
+
+        async with admission.admit("a"):
+            waiting = asyncio.ensure_future(admission.admit("a").__aenter__())
+            await asyncio.sleep(0)
+
+            with pytest.raises(AdmissionRejected) as exc_info:
+                async with admission.admit("a"):
+                    pass
+            assert exc_info.value.status_code == 429
+            assert exc_info.value.retry_after == 1
+
+        await waiting
+        assert admission.inflight == 1
+
+    @pytest.mark.asyncio
+    async def test_global_queue_limit(self):
+        """全体の待機上限を超えると即座に503"""
+        admission = AdmissionController(max_inflight=1, max_queue=0)
+
+        async with admission.admit("a"):
+            with pytest.raises(AdmissionRejected) as exc_info:
+                async with admission.admit("b"):
+                    pass
+            assert exc_info.value.status_code == 503
+        assert admission.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_fair_across_clients(self):
+        """待機中のクライアント間でラウンドロビンに割り当て"""
+        admission = AdmissionController(max_inflight=1, queue_timeout=1.0)
+        order = []
+
+        async def worker(name):
+            async with admission.admit(name[0]):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async with admission.admit("x"):
+            tasks = [
+                asyncio.ensure_future(worker(name))
+                for name in ["a1", "a2", "a3", "b1"]
+            ]
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*tasks)
+        # クライアントbはaの待機をすべて待たずに実行される
+        assert order.index("b1") == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_removes_waiter(self):
+        """タイムアウトした待機者はキューから取り除かれる"""
+        admission = AdmissionController(max_inflight=1, queue_timeout=0.01)
+
+        async with admission.admit("a"):
+            with pytest.raises(AdmissionRejected):
+                async with admission.admit("b"):
+                    pass
+            assert admission.queued == 0
+
+        assert admission.inflight == 0
@@ -0,0 +1,130 @@
+"""Tests for DocumentCatalog"""
+
+import os
+
+import pytest
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.tools.catalog import (
+    DocumentCatalog,
+    estimate_tokens,
+    extract_summary,
+    extract_title,
+)
+from mcp_server.tools.document import DocumentTools
+
+
+class TestMetadata:
+    """メタデータ計算のテスト"""
+
+    def test_extract_title_heading(self):
+        """最初の見出しをタイトルにする"""
+        assert extract_title("\n## 設定方法 ##\n本文") == "設定方法"
+
+    def test_extract_title_first_line(self):
+        """見出しがない場合は最初の行"""
+        assert extract_title("\n  plain text\nmore") == "plain text"
+
+    def test_extract_summary(self):
+        """見出し・コードブロックを除いた最初の段落の先頭2文"""
+        text = "# Title\n\n```\ncode.\n```\nFirst. Version 1.2 ok!\nThird.\n\nNext paragraph."
+        assert extract_summary(text) == "First. Version 1.2 ok!"
+        assert extract_summary("# 見出し\nこれは説明です。次の文です。三つ目。") == "これは説明です。次の文です。"
+
+    def test_estimate_tokens(self):
+        """ASCIIは約4文字、それ以外は1文字で1トークン"""
+        assert estimate_tokens("abcdefgh") == 2
+        assert estimate_tokens("日本語") == 3
+        assert estimate_tokens("") == 0
+
+
+class TestDocumentCatalog:
+    """DocumentCatalogのテスト"""
+
+    @pytest.fixture
+    def catalog(self, temp_docs_dir):
+        return DocumentCatalog(SafeFileHandler(str(temp_docs_dir)), max_file_size=1024)
+
+    @pytest.mark.asyncio
+    async def test_refresh_incremental(self, catalog, temp_docs_dir):
+        """変更されたファイルのみ再計算"""
+        assert await catalog.refresh() == 3
+        assert await catalog.refresh() == 0
+
+        path = temp_docs_dir / "sample.md"
+        path.write_text("# New Title\n\nChanged.", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert await catalog.refresh() == 1
+        assert catalog.get("sample.md").title == "New Title"
+
+    @pytest.mark.asyncio
+    async def test_refresh_removes_deleted(self, catalog, temp_docs_dir):
+        """削除されたファイルはカタログから取り除く"""
+        await catalog.refresh()
+        (temp_docs_dir / "test.txt").unlink()
+
+        await catalog.refresh()
+        assert catalog.get("test.txt") is None
+        assert len(catalog) == 2
+
+    @pytest.mark.asyncio
+    async def test_unreadable_files(self, catalog, temp_docs_dir):
+        """バイナリ・サイズ超過のファイルはサイズのみ"""
+        (temp_docs_dir / "binary.bin").write_bytes(b"\xff\xfe\x00")
+        (temp_docs_dir / "large.txt").write_text("x" * 2048, encoding="utf-8")
+
+        infos = await catalog.describe(["binary.bin", "large.txt"])
+
+        assert [(info.size, info.tokens) for info in infos] == [(3, None), (2048, None)]
+
+
+class TestDescribeDocuments:
+    """DocumentTools.describe_documentsのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_describe_documents(self, temp_docs_dir):
+        """メタデータ付きのドキュメント一覧"""
+        doc_tools = DocumentTools(str(temp_docs_dir))
+
+        infos = await doc_tools.describe_documents(pattern="*.md")
+
+        assert len(infos) == 1
+        info = infos[0]
+        assert (info.path, info.lines, info.title, info.summary) == (
+            "sample.md", 3, "Sample Document", "Hello World!"
+        )
+        assert doc_tools.format_document_info(info) == (
+            "sample.md (31 B, 3 lines, ~8 tokens) - Sample Document\n  Hello World!"
+        )
+
+    @pytest.mark.asyncio
+    async def test_prunes_deleted_and_renamed(self, temp_docs_dir):
+        """一覧の範囲で削除・名前変更されたファイルはカタログから取り除く"""
+        doc_tools = DocumentTools(str(temp_docs_dir))
+        await doc_tools.describe_documents(pattern="**/*")
+        nested = doc_tools.catalog.get("subdir/nested.txt")
+        assert nested is not None
+
+        (temp_docs_dir / "sample.md").rename(temp_docs_dir / "renamed.md")
+        (temp_docs_dir / "subdir" / "nested.txt").unlink()
+        await doc_tools.describe_documents(pattern="*.md")
+
+        assert doc_tools.catalog.get("sample.md") is None
+        assert doc_tools.catalog.get("renamed.md") is not None
+        # 一覧の範囲外のエントリは次にその範囲を一覧するまで残す
+        assert doc_tools.catalog.get("subdir/nested.txt") == nested
+
+        await doc_tools.describe_documents(directory="subdir")
+        assert doc_tools.catalog.get("subdir/nested.txt") is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_input(self, temp_docs_dir):
+        """空のディレクトリ・未対応のエンコーディングはエラー"""
+        doc_tools = DocumentTools(str(temp_docs_dir))
+
+        with pytest.raises(ValueError, match="Path cannot be empty"):
+            await doc_tools.describe_documents(directory="")
+        with pytest.raises(ValueError, match="Unsupported encoding"):
+            await doc_tools.describe_documents(encoding="latin-1")
@@ -102,3 +102,90 @@ class TestDocumentTools:
         # 通常のファイル読み込みでサイズ超過エラー
         with pytest.raises(RuntimeError, match="too large"):
             await small_doc_tools.get_document("test.txt")
+
+    @pytest.mark.asyncio
+    async def test_stream_document(self, doc_tools, large_document_content, temp_docs_dir):
+        """ドキュメントの分割取得"""
+        (temp_docs_dir / "large.txt").write_text(large_document_content, encoding="utf-8")
+
+        chunks = [
+            chunk async for chunk in doc_tools.stream_document("large.txt", chunk_size=4096)
+        ]
+        assert len(chunks) > 1
+        assert "".join(chunks) == large_document_content
+
+    @pytest.mark.asyncio
+    async def test_stream_document_invalid_encoding(self, doc_tools):
+        """分割取得でもエンコーディングを検証"""
+        with pytest.raises(ValueError, match="Unsupported encoding"):
+            async for _ in doc_tools.stream_document("test.txt", encoding="invalid-encoding"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_get_document_cached(self, doc_tools):
+        """2回目以降はキャッシュから取得"""
+        await doc_tools.get_document("test.txt")
+        await doc_tools.get_document("test.txt")
+        assert doc_tools.cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_get_document_cache_invalidated_on_change(self, doc_tools, temp_docs_dir):
+        """ファイルが変更されたらキャッシュを使わない"""
+        await doc_tools.get_document("test.txt")
+        (temp_docs_dir / "test.txt").write_text("Updated content!", encoding="utf-8")
+
+        content = await doc_tools.get_document("test.txt")
+        assert content == "Updated content!"
+
+    @pytest.mark.asyncio
+    async def test_get_document_cache_disabled(self, temp_docs_dir):
+        """cache_budget=0 ではキャッシュしない"""
+        doc_tools = DocumentTools(str(temp_docs_dir), cache_budget=0)
+        await doc_tools.get_document("test.txt")
+        assert len(doc_tools.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_search_mapped_matches_in_memory(self, temp_docs_dir):
+        """メモリマップでの検索結果はメモリ上の検索と同じ"""
+        lines = [f"line {i} {'Target' if i % 7 == 0 else 'other'} 日本語" for i in range(200)]
+        (temp_docs_dir / "big.txt").write_text("\r\n".join(lines), encoding="utf-8")
+
+        mapped_tools = DocumentTools(str(temp_docs_dir), mmap_threshold=0)
+        memory_tools = DocumentTools(str(temp_docs_dir), mmap_threshold=1 << 30)
+
+        mapped = await mapped_tools.search_in_document("big.txt", "target")
+        assert mapped == await memory_tools.search_in_document("big.txt", "target")
+        assert mapped.startswith("Line 1: line 0 Target")
+        # 行開始位置の索引をキャッシュ
+        assert ("line_starts", "big.txt") in mapped_tools.cache
+
+    @pytest.mark.asyncio
+    async def test_get_document_lines(self, temp_docs_dir):
+        """指定範囲の行を取得（メモリマップ・メモリ上のどちらでも同じ結果）"""
+        (temp_docs_dir / "lines.txt").write_text("\n".join(f"L{i}" for i in range(1, 11)), encoding="utf-8")
+
+        for threshold in (0, 1 << 30):
+            doc_tools = DocumentTools(str(temp_docs_dir), mmap_threshold=threshold)
+            assert await doc_tools.get_document_lines("lines.txt", 3, 5) == "L3\nL4\nL5"
+            assert await doc_tools.get_document_lines("lines.txt", 9) == "L9\nL10"
+
+        with pytest.raises(ValueError):
+            await doc_tools.get_document_lines("lines.txt", 0)
+
+    @pytest.mark.asyncio
+    async def test_prefetch_hot_documents(self, temp_docs_dir):
+        """アクセス頻度の高いドキュメントを予算内で先読み"""
+        doc_tools = DocumentTools(str(temp_docs_dir))
+        await doc_tools.get_document("test.txt")
+        await doc_tools.search_in_document("sample.md", "hello")
+        doc_tools.access_stats.record("deleted.md")
+        doc_tools.cache.clear()
+
+        assert await doc_tools.prefetch(top_n=10) == 2
+        assert ("test.txt", "utf-8") in doc_tools.cache
+        assert ("folded", "sample.md", "utf-8") in doc_tools.cache
+        assert "deleted.md" not in doc_tools.access_stats.top(10)
+
+        # 予算を超えるドキュメントは先読みしない
+        doc_tools.cache.clear()
+        assert await doc_tools.prefetch(top_n=10, budget=60) == 1
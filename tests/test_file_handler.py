@@ -1,5 +1,7 @@
 """Tests for SafeFileHandler"""
 
+import os
+
 import pytest
 from pathlib import Path
 from mcp_server.resources.file_handler import SafeFileHandler
@@ -120,3 +122,124 @@ class TestSafeFileHandler:
 
         with pytest.raises(FileNotFoundError):
             handler.list_files("nonexistent_dir")
+
+    @pytest.mark.asyncio
+    async def test_iter_chunks(self, temp_docs_dir):
+        """分割読み込み"""
+        handler = SafeFileHandler(str(temp_docs_dir))
+        chunks = [chunk async for chunk in handler.iter_chunks("test.txt", chunk_size=5)]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == "This is a test document."
+
+    @pytest.mark.asyncio
+    async def test_iter_chunks_path_traversal(self, temp_docs_dir):
+        """分割読み込みでのパストラバーサル検出"""
+        handler = SafeFileHandler(str(temp_docs_dir))
+
+        with pytest.raises(ValueError, match="Path traversal detected"):
+            async for _ in handler.iter_chunks("../outside.txt"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_read_mapped(self, temp_docs_dir):
+        """しきい値以上のファイルはメモリマップで読み込み、改行を統一"""
+        (temp_docs_dir / "crlf.txt").write_bytes("一行目\r\n二行目\r\n".encode("utf-8"))
+        handler = SafeFileHandler(str(temp_docs_dir), mmap_threshold=0)
+
+        assert await handler.read("crlf.txt") == "一行目\n二行目\n"
+        assert await handler.read("test.txt") == "This is a test document."
+
+    def test_open_mapped_lines(self, temp_docs_dir):
+        """メモリマップでの行範囲の取得"""
+        (temp_docs_dir / "lines.txt").write_text("a\nb\nc\nd", encoding="utf-8")
+        handler = SafeFileHandler(str(temp_docs_dir))
+
+        with handler.open_mapped("lines.txt") as mapped:
+            assert mapped.line_count == 4
+            assert mapped.read_lines(2, 3, "utf-8") == "b\nc"
+            assert mapped.read_lines(4, 10, "utf-8") == "d"
+            assert mapped.read_lines(5, 6, "utf-8") == ""
+
+        with pytest.raises(ValueError, match="Path traversal detected"):
+            handler.open_mapped("../outside.txt")
+
+    @pytest.mark.asyncio
+    async def test_resolve_cache(self, temp_docs_dir):
+        """パス解決の結果をキャッシュし、削除されたファイルは破棄"""
+        handler = SafeFileHandler(str(temp_docs_dir), resolve_cache_size=2)
+
+        await handler.read("test.txt")
+        await handler.read("test.txt")
+        handler.stat("sample.md")
+        handler.stat("subdir/nested.txt")
+        assert list(handler._resolved) == ["sample.md", "subdir/nested.txt"]
+
+        (temp_docs_dir / "sample.md").unlink()
+        with pytest.raises(FileNotFoundError):
+            handler.stat("sample.md")
+        assert "sample.md" not in handler._resolved
+
+    def test_resolve_cache_hit_uses_single_lstat(self, temp_docs_dir, monkeypatch):
+        """キャッシュを使う場合はパスを解決し直さず、1回の lstat のみで確認"""
+        from mcp_server.resources import file_handler
+
+        handler = SafeFileHandler(str(temp_docs_dir))
+        handler.stat("subdir/nested.txt")
+
+        calls = []
+        lstat = os.lstat
+        monkeypatch.setattr(file_handler.os, "lstat", lambda p: calls.append(p) or lstat(p))
+        monkeypatch.setattr(file_handler.os.path, "realpath", None)
+        monkeypatch.setattr(file_handler.Path, "resolve", None)
+
+        assert handler.stat("subdir/nested.txt").st_size > 0
+        assert len(calls) == 1
+
+    def test_resolve_cache_keeps_traversal_check(self, temp_docs_dir, tmp_path):
+        """キャッシュ後にリンクで外部を指すよう変更されても拒否"""
+        outside = tmp_path / "outside.txt"
+        outside.write_text("secret", encoding="utf-8")
+        handler = SafeFileHandler(str(temp_docs_dir))
+
+        # 繰り返し呼び出しても拒否（拒否した結果はキャッシュしない）
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Path traversal detected"):
+                handler.stat("../outside.txt")
+
+        target = temp_docs_dir / "link.txt"
+        target.write_text("inside", encoding="utf-8")
+        handler.stat("link.txt")
+        target.unlink()
+        target.symlink_to(outside)
+
+        with pytest.raises(ValueError, match="Path traversal detected"):
+            handler.stat("link.txt")
+
+    @pytest.mark.asyncio
+    async def test_resolve_cache_detects_parent_symlink(self, temp_docs_dir, tmp_path):
+        """キャッシュ後に親ディレクトリがリンクに置き換えられても拒否"""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "nested.txt").write_text("secret", encoding="utf-8")
+        handler = SafeFileHandler(str(temp_docs_dir))
+
+        assert await handler.read("subdir/nested.txt") == "Nested document"
+        (temp_docs_dir / "subdir" / "nested.txt").unlink()
+        (temp_docs_dir / "subdir").rmdir()
+        (temp_docs_dir / "subdir").symlink_to(outside, target_is_directory=True)
+
+        with pytest.raises(ValueError, match="Path traversal detected"):
+            await handler.read("subdir/nested.txt")
+
+    def test_traversal_check_is_per_component(self, tmp_path):
+        """基準ディレクトリと同じ接頭辞を持つ兄弟ディレクトリは拒否"""
+        base = tmp_path / "docs"
+        base.mkdir()
+        evil = tmp_path / "docs-evil"
+        evil.mkdir()
+        (evil / "secret.txt").write_text("secret", encoding="utf-8")
+        handler = SafeFileHandler(str(base))
+
+        with pytest.raises(ValueError, match="Path traversal detected"):
+            handler.stat("../docs-evil/secret.txt")
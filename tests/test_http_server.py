@@ -0,0 +1,134 @@
+"""Tests for the HTTP API"""
+
+import importlib
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+
+@pytest.fixture
+def http_server(temp_docs_dir, monkeypatch):
+    """テスト用のドキュメントディレクトリで HTTP API を読み込む"""
+    monkeypatch.setenv("MCP_DOCS_DIR", str(temp_docs_dir))
+    monkeypatch.delenv("MCP_DOCS_ROOTS", raising=False)
+    from mcp_server import http_server
+    return importlib.reload(http_server)
+
+
+async def call_disconnected(app, path: str, payload: dict) -> None:
+    """レスポンスの送信開始時にクライアントが切断したリクエストを処理"""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("connection reset")
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        pass
+
+
+class TestStreamingAdmission:
+    """ストリーミングレスポンスのアドミッション制御の枠の解放"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path,payload", [
+        ("/api/document/stream", {"path": "sample.md"}),
+        ("/api/search_directory/stream", {"keyword": "document"}),
+    ])
+    async def test_releases_slot_when_client_disconnects(self, http_server, path, payload):
+        """本文を送信する前に切断されても枠を解放"""
+        await call_disconnected(http_server.app, path, payload)
+
+        stats = http_server.admission.stats()
+        assert (stats["inflight"], stats["inflight_bytes"]) == (0, 0)
+
+
+class TestAdmissionCost:
+    """ファイル全体を読み込みうるリクエストのメモリ使用量の見積もり"""
+
+    @pytest.fixture
+    def large_doc(self, temp_docs_dir):
+        (temp_docs_dir / "large.txt").write_text("設定\n" * 50_000, encoding="utf-8")
+        return (temp_docs_dir / "large.txt").stat().st_size
+
+    @pytest.mark.asyncio
+    async def test_directory_search_reserves_largest_files(self, http_server, large_doc):
+        """同時に検索するファイルがすべて最大のファイルの場合を見積もる"""
+        request = http_server.DirectorySearchRequest(keyword="設定")
+        workers = http_server.roots.get().search_workers
+
+        assert await http_server.directory_search_cost(request) == (
+            workers * large_doc * http_server.MEMORY_COST_FACTOR
+        )
+
+    @pytest.mark.asyncio
+    async def test_catalog_and_index_builds_are_not_free(self, http_server, large_doc):
+        """メタデータ付きの一覧・セマンティック検索は最大のファイル分を確保"""
+        expected = large_doc * http_server.MEMORY_COST_FACTOR
+
+        assert await http_server.read_cost(None, ".") == expected
+        assert await http_server.semantic_search_cost(
+            http_server.SemanticSearchRequest(query="設定")
+        ) == expected
+        assert await http_server.read_cost(None, "missing") == 0
+
+
+class TestListPaging:
+    """/api/list のページ分割（MCP の list_documents と同じ意味）"""
+
+    @pytest.fixture
+    def many_docs(self, temp_docs_dir):
+        for i in range(250):
+            (temp_docs_dir / f"doc{i:03d}.md").write_text("doc", encoding="utf-8")
+
+    async def post(self, app, payload: dict) -> dict:
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            response = await client.post("/api/list", json=payload)
+        assert response.status_code == 200
+        return response.json()
+
+    @pytest.mark.asyncio
+    async def test_zero_limit_returns_all(self, http_server, many_docs):
+        """limit が0以下の場合はページ分割せずすべて返す"""
+        for limit in (0, -1):
+            result = await self.post(http_server.app, {"pattern": "*.md", "limit": limit})
+            assert result["count"] == 251
+            assert "next_cursor" not in result
+
+    @pytest.mark.asyncio
+    async def test_cursor_only_uses_shared_page_size(self, http_server, many_docs):
+        """cursor のみ指定した場合は MCP と同じ既定の件数"""
+        from mcp_server.tools.document import LISTING_PAGE_SIZE
+
+        first = await self.post(http_server.app, {"pattern": "*.md", "limit": 10})
+        rest = await self.post(
+            http_server.app, {"pattern": "*.md", "cursor": first["next_cursor"]}
+        )
+        assert rest["count"] == LISTING_PAGE_SIZE
+        assert rest["files"][0] == "doc010.md"
+        assert rest["next_cursor"]
@@ -0,0 +1,43 @@
+"""Tests for WarmupProgress"""
+
+from mcp_server.utils.progress import WarmupProgress
+
+
+class TestWarmupProgress:
+    """WarmupProgressのテスト"""
+
+    def test_lifecycle(self):
+        """開始前 → 実行中 → 完了"""
+        progress = WarmupProgress()
+        assert progress.snapshot()["state"] == "pending"
+        assert progress.eta() is None
+
+        progress.begin(files=4, bytes_total=400)
+        progress.advance(files=1, bytes_done=100)
+        snapshot = progress.snapshot()
+        assert (snapshot["state"], snapshot["files_scanned"], snapshot["bytes_indexed"]) == (
+            "running", 1, 100
+        )
+        assert snapshot["eta_seconds"] is not None
+
+        progress.finish()
+        assert progress.finished
+        assert progress.runs == 1
+        assert progress.eta() == 0.0
+
+    def test_failed(self):
+        """例外を渡すと失敗として記録"""
+        progress = WarmupProgress()
+        progress.begin()
+        progress.finish(RuntimeError("numpy is not installed"))
+
+        assert progress.snapshot()["state"] == "failed"
+        assert progress.snapshot()["error"] == "numpy is not installed"
+
+    def test_eta_by_files_when_bytes_unknown(self):
+        """バイト数が不明な場合はファイル数から見積もる"""
+        progress = WarmupProgress()
+        progress.begin(files=2)
+        assert progress.eta() is None
+        progress.advance(files=1)
+        assert progress.eta() is not None
@@ -0,0 +1,195 @@
+"""Tests for multi-root document namespaces"""
+
+import asyncio
+import json
+
+import pytest
+
+from mcp_server.config import RootConfig, load_root_configs
+from mcp_server.tools.roots import DocumentRoots
+
+
+@pytest.fixture
+def two_roots(tmp_path):
+    """2つのドキュメントルート"""
+    product = tmp_path / "product"
+    runbooks = tmp_path / "runbooks"
+    product.mkdir()
+    runbooks.mkdir()
+    (product / "install.md").write_text(
+        "# Installation\nInstall the product with pip.", encoding="utf-8"
+    )
+    (runbooks / "restart.md").write_text(
+        "# Restart\nRestart the server when the disk is full.", encoding="utf-8"
+    )
+    return [
+        RootConfig(name="runbooks", path=str(runbooks), priority=10),
+        RootConfig(name="product", path=str(product)),
+    ]
+
+
+class TestLoadRootConfigs:
+    """load_root_configsのテスト"""
+
+    def test_default_root_from_docs_dir(self, tmp_path):
+        """MCP_DOCS_ROOTS未指定ならMCP_DOCS_DIRを既定ルートに"""
+        configs = load_root_configs({"MCP_DOCS_DIR": str(tmp_path)})
+        assert len(configs) == 1
+        assert configs[0].name == "default"
+        assert configs[0].path == str(tmp_path)
+
+    def test_object_format_sorted_by_priority(self):
+        """オブジェクト形式、優先度順に並ぶ"""
+        raw = json.dumps({
+            "product": "/docs/product",
+            "runbooks": {"path": "/docs/runbooks", "priority": 10, "cache_budget": 0},
+        })
+        configs = load_root_configs({"MCP_DOCS_ROOTS": raw})
+        assert [c.name for c in configs] == ["runbooks", "product"]
+        assert configs[0].cache_budget == 0
+
+    def test_list_format(self):
+        """配列形式"""
+        raw = json.dumps([{"name": "api", "path": "/docs/api", "index_policy": "none"}])
+        configs = load_root_configs({"MCP_DOCS_ROOTS": raw})
+        assert configs[0].name == "api"
+        assert configs[0].index_policy == "none"
+
+    @pytest.mark.parametrize("raw", [
+        "not json",
+        "[]",
+        '{"a": {"path": "/x", "unknown": 1}}',
+        '{"a": {"path": "/x", "index_policy": "sometimes"}}',
+        '[{"name": "a", "path": "/x"}, {"name": "a", "path": "/y"}]',
+    ])
+    def test_invalid_config(self, raw):
+        """不正な設定でエラー"""
+        with pytest.raises(ValueError):
+            load_root_configs({"MCP_DOCS_ROOTS": raw})
+
+
+    def test_state_dir_sets_stats_files(self, tmp_path):
+        """MCP_STATE_DIR を指定するとルートごとにアクセス頻度の保存先を設定"""
+        configs = load_root_configs({
+            "MCP_DOCS_ROOTS": json.dumps({
+                "a": "/a",
+                "b": {"path": "/b", "stats_file": "/custom.json"},
+            }),
+            "MCP_STATE_DIR": str(tmp_path),
+        })
+
+        assert configs[0].stats_file == str(tmp_path / "a.access.json")
+        assert configs[1].stats_file == "/custom.json"
+        assert all(config.needs_background for config in configs)
+
+
+class TestDocumentRoots:
+    """DocumentRootsのテスト"""
+
+    def test_default_is_highest_priority(self, two_roots):
+        """既定のルートは優先度が最も高いルート"""
+        roots = DocumentRoots(two_roots)
+        assert roots.default == "runbooks"
+        assert roots.get() is roots.get("runbooks")
+
+    def test_unknown_root(self, two_roots):
+        """存在しないルート名でエラー"""
+        roots = DocumentRoots(two_roots)
+        with pytest.raises(ValueError, match="Unknown document root"):
+            roots.get("missing")
+
+    @pytest.mark.asyncio
+    async def test_roots_are_isolated(self, two_roots):
+        """ルートごとに別のディレクトリを参照"""
+        roots = DocumentRoots(two_roots)
+        content = await roots.get("product").get_document("install.md")
+        assert "pip" in content
+        with pytest.raises(FileNotFoundError):
+            await roots.get("runbooks").get_document("install.md")
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_fans_out(self, two_roots):
+        """ルート未指定のセマンティック検索は全ルートの結果を統合"""
+        pytest.importorskip("numpy")
+        roots = DocumentRoots(two_roots)
+
+        result = await roots.semantic_search("install restart", top_k=5)
+        assert "product:install.md" in result
+        assert "runbooks:restart.md" in result
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_skips_disabled_root(self, two_roots, tmp_path):
+        """索引が無効なルートは検索対象外"""
+        pytest.importorskip("numpy")
+        configs = [two_roots[0], RootConfig(
+            name="product", path=two_roots[1].path, index_policy="none"
+        )]
+        roots = DocumentRoots(configs)
+
+        result = await roots.semantic_search("install", top_k=5)
+        assert "product:" not in result
+        with pytest.raises(ValueError, match="disabled"):
+            await roots.semantic_search("install", root="product")
+
+    @pytest.mark.asyncio
+    async def test_eager_index_built_in_background(self, two_roots):
+        """eagerポリシーのルートは起動時にバックグラウンドで索引を作成"""
+        pytest.importorskip("numpy")
+        configs = [RootConfig(
+            name="runbooks", path=two_roots[0].path, index_policy="eager"
+        )]
+        roots = DocumentRoots(configs)
+
+        await roots.start()
+        await roots._tasks[0]
+        assert len(roots.get()._get_semantic_index().index) > 0
+        await roots.stop()
+
+    @pytest.mark.asyncio
+    async def test_prefetch_from_saved_stats(self, two_roots, tmp_path):
+        """保存されたアクセス頻度から起動時にバックグラウンドで先読みし、停止時に保存"""
+        stats_file = tmp_path / "runbooks.access.json"
+        configs = [RootConfig(
+            name="runbooks", path=two_roots[0].path, stats_file=str(stats_file)
+        )]
+
+        roots = DocumentRoots(configs)
+        await roots.get().get_document("restart.md")
+        await roots.stop()
+        assert stats_file.exists()
+
+        restarted = DocumentRoots(configs)
+        await restarted.start()
+        # start() は先読みの完了を待たない
+        assert ("restart.md", "utf-8") not in restarted.get().cache
+        for _ in range(100):
+            if ("restart.md", "utf-8") in restarted.get().cache:
+                break
+            await asyncio.sleep(0.01)
+        assert ("restart.md", "utf-8") in restarted.get().cache
+        await restarted.stop()
+
+    @pytest.mark.asyncio
+    async def test_ready_after_eager_index(self, two_roots):
+        """eager の索引作成が終わるまでは準備中、終わったら進捗とメモリ使用量を報告"""
+        pytest.importorskip("numpy")
+        configs = [RootConfig(
+            name="runbooks", path=two_roots[0].path, index_policy="eager"
+        )]
+        roots = DocumentRoots(configs)
+        assert not roots.status()["ready"]
+
+        await roots.start()
+        await roots._tasks[0]
+        status = roots.status()
+        assert status["ready"]
+        root = status["roots"][0]
+        assert root["warmup"]["index"]["state"] == "done"
+        assert root["warmup"]["index"]["files_scanned"] == 1
+        assert root["memory"]["index_bytes"] > 0
+        await roots.stop()
+
+    def test_lazy_roots_ready_immediately(self, two_roots):
+        """起動時の処理がないルートは最初から準備完了"""
+        roots = DocumentRoots(two_roots)
+        assert roots.status()["ready"]
@@ -0,0 +1,168 @@
+"""Tests for directory search"""
+
+import pytest
+
+from mcp_server.resources.mapped import MappedFile, normalize_newlines
+from mcp_server.tools.document import DocumentTools
+from mcp_server.tools.search import FoldedText, find_matching_lines
+
+
+class TestFoldedText:
+    """casefold による一致検索のテスト"""
+
+    def test_find_lines(self):
+        """1行につき1回、元の行の内容を返す"""
+        folded = FoldedText("Alpha beta\nBETA beta\n\nlast Beta")
+
+        assert folded.find_lines("beta") == [
+            (1, "Alpha beta"), (2, "BETA beta"), (4, "last Beta")
+        ]
+        assert folded.find_lines("beta", limit=2) == [(1, "Alpha beta"), (2, "BETA beta")]
+        assert folded.find_lines("gamma") == []
+
+    def test_length_changing_casefold(self):
+        """casefold で文字数が変わる文字を含んでも行番号がずれない"""
+        folded = FoldedText("Straße\nİstanbul\nSTRASSE end\nend")
+
+        assert folded.find_lines("strasse") == [(1, "Straße"), (3, "STRASSE end")]
+        assert folded.find_lines("END") == [(3, "STRASSE end"), (4, "end")]
+
+
+class TestMappedSearch:
+    """バイト列のまま検索する場合と casefold して検索する場合の結果の一致"""
+
+    @pytest.mark.parametrize("content,keyword,encoding", [
+        ("Straße\nSTRASSE end\nstrasse", "strasse", "utf-8"),
+        ("ﬁle name\nFILE\n", "file", "utf-8"),
+        ("設定Timeout\nタイムアウトtimeout設定\n", "timeout", "utf-8"),
+        ("設定Timeout\nタイムアウトtimeout設定\n", "timeout", "euc-jp"),
+        ("old\rTimeout\r\nnew timeout\rend", "timeout", "utf-8"),
+        ("first\r\nTimeout here\r\n", "TIMEOUT", "utf-8"),
+        ("Kelvin 10K\nk", "k", "utf-8"),
+        ("Straße\nnothing", "timeout", "utf-8"),
+    ])
+    def test_same_as_folded_text(self, tmp_path, content, keyword, encoding):
+        """同じ内容・キーワードで FoldedText と同じ行を返す"""
+        path = tmp_path / "doc.txt"
+        path.write_bytes(content.encode(encoding))
+
+        with MappedFile(path) as mapped:
+            matches = find_matching_lines(mapped, keyword, encoding)
+
+        text = normalize_newlines(content)
+        assert matches == FoldedText(text).find_lines(keyword)
+
+    @pytest.mark.asyncio
+    async def test_search_in_document_same_with_mmap(self, temp_docs_dir):
+        """メモリマップで検索する場合も結果が同じ"""
+        (temp_docs_dir / "mixed.txt").write_bytes(
+            "Straße\rSTRASSE\r\nstrasse ok\n".encode("utf-8")
+        )
+        default = DocumentTools(str(temp_docs_dir))
+        mapped = DocumentTools(str(temp_docs_dir), mmap_threshold=0)
+
+        for keyword in ("strasse", "ok", "STRASSE"):
+            assert await mapped.search_in_document("mixed.txt", keyword) == (
+                await default.search_in_document("mixed.txt", keyword)
+            )
+
+
+class TestDirectorySearch:
+    """ディレクトリ横断検索のテスト"""
+
+    @pytest.fixture
+    def doc_tools(self, temp_docs_dir):
+        """DocumentToolsインスタンスを作成"""
+        return DocumentTools(str(temp_docs_dir))
+
+    @pytest.mark.asyncio
+    async def test_search_directory_recursive(self, doc_tools):
+        """サブディレクトリを含めて検索"""
+        results = await doc_tools.directory_search("document").collect()
+
+        assert [result.path for result in results] == [
+            "sample.md", "subdir/nested.txt", "test.txt"
+        ]
+        assert results[2].matches == [(1, "This is a test document.")]
+
+    @pytest.mark.asyncio
+    async def test_search_directory_pattern(self, doc_tools):
+        """ファイル名パターンで対象を限定"""
+        output = await doc_tools.search_directory("hello", pattern="*.md")
+
+        assert output == "sample.md:\n  Line 3: Hello World!"
+
+    @pytest.mark.asyncio
+    async def test_per_file_limit(self, doc_tools, temp_docs_dir):
+        """ファイルごとの件数上限"""
+        (temp_docs_dir / "many.txt").write_text("hit\n" * 10, encoding="utf-8")
+
+        search = doc_tools.directory_search("hit", max_matches_per_file=3)
+        results = await search.collect()
+
+        assert len(results[0].matches) == 3
+        assert results[0].truncated
+        assert not search.truncated
+
+    @pytest.mark.asyncio
+    async def test_total_limit_truncates(self, doc_tools, temp_docs_dir):
+        """全体の件数上限に達したら打ち切り"""
+        for i in range(5):
+            (temp_docs_dir / f"hit{i}.txt").write_text("hit\nhit", encoding="utf-8")
+
+        search = doc_tools.directory_search("hit", max_total_matches=3)
+        results = await search.collect()
+
+        assert sum(len(result.matches) for result in results) == 3
+        assert search.truncated
+
+    @pytest.mark.asyncio
+    async def test_skips_undecodable_files(self, doc_tools, temp_docs_dir):
+        """デコードできないファイルはスキップ"""
+        (temp_docs_dir / "binary.bin").write_bytes(b"\xff\xfe document")
+
+        search = doc_tools.directory_search("document")
+        results = await search.collect()
+
+        assert "binary.bin" not in [result.path for result in results]
+        assert [path for path, _ in search.skipped] == ["binary.bin"]
+
+    @pytest.mark.asyncio
+    async def test_crlf_lines(self, doc_tools, temp_docs_dir):
+        """CRLFのファイルでも行の内容に改行を含まない"""
+        (temp_docs_dir / "crlf.txt").write_bytes(b"first\r\nTimeout here\r\n")
+
+        results = await doc_tools.directory_search("timeout").collect()
+
+        assert results[0].matches == [(2, "Timeout here")]
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_keyword(self, doc_tools, temp_docs_dir):
+        """ASCII以外のキーワード・バイト列検索できないエンコーディング"""
+        (temp_docs_dir / "sjis.txt").write_bytes("設定\nタイムアウト設定".encode("shift_jis"))
+
+        output = await doc_tools.search_directory("タイムアウト", encoding="shift_jis")
+
+        assert "sjis.txt:\n  Line 2: タイムアウト設定" in output
+
+    @pytest.mark.asyncio
+    async def test_search_in_document_reuses_folded(self, doc_tools):
+        """同じドキュメントの2回目以降の検索は casefold 済みのテキストを再利用"""
+        await doc_tools.search_in_document("test.txt", "test")
+        hits = doc_tools.cache.hits
+
+        assert await doc_tools.search_in_document("test.txt", "DOCUMENT") == (
+            "Line 1: This is a test document."
+        )
+        assert doc_tools.cache.hits == hits + 1
+
+    def test_invalid_input(self, doc_tools):
+        """無効な入力"""
+        with pytest.raises(ValueError, match="Keyword cannot be empty"):
+            doc_tools.directory_search("")
+        with pytest.raises(ValueError, match="Path traversal detected"):
+            doc_tools.directory_search("x", directory="..")
+        with pytest.raises(ValueError, match="Path cannot be empty"):
+            doc_tools.directory_search("x", directory="")
+        with pytest.raises(ValueError, match="Unsupported encoding"):
+            doc_tools.directory_search("x", encoding="latin-1")
@@ -0,0 +1,224 @@
+"""Tests for semantic search"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.tools.document import DocumentTools
+from mcp_server.tools.semantic import (
+    HashingEmbedder,
+    SemanticIndex,
+    VectorIndex,
+    chunk_document,
+)
+
+
+class TestChunkDocument:
+    """chunk_documentのテスト"""
+
+    def test_split_by_heading(self, sample_document_content):
+        """見出し単位で分割"""
+        chunks = chunk_document("doc.md", sample_document_content)
+        headings = [chunk.heading for chunk in chunks]
+        assert headings == ["テストドキュメント", "セクション1", "セクション2"]
+        assert chunks[1].start_line == 5
+        assert "重要なキーワード" in chunks[1].text
+
+    def test_long_section_split_at_paragraph(self):
+        """長いセクションは段落境界で分割"""
+        text = "# Title\n" + "\n\n".join(["word " * 50] * 10)
+        chunks = chunk_document("doc.md", text, max_chars=300)
+        assert len(chunks) > 1
+        assert all(chunk.heading == "Title" for chunk in chunks)
+
+    def test_digest_changes_with_content(self):
+        """内容が変わるとダイジェストも変わる"""
+        a = chunk_document("doc.md", "# A\nfoo")[0]
+        b = chunk_document("doc.md", "# A\nbar")[0]
+        assert a.key != b.key
+
+
+class TestVectorIndex:
+    """VectorIndexのテスト"""
+
+    def test_search_and_remove(self):
+        """追加・検索・削除"""
+        index = VectorIndex(2)
+        index.upsert(["a", "b", "c"], np.array([[1, 0], [0, 1], [0.6, 0.8]], dtype=np.float32))
+
+        hits = index.search(np.array([[1, 0]], dtype=np.float32), top_k=2)[0]
+        assert [key for key, _ in hits] == ["a", "c"]
+
+        index.remove(["a"])
+        assert len(index) == 2
+        hits = index.search(np.array([[1, 0]], dtype=np.float32), top_k=1)[0]
+        assert hits[0][0] == "c"
+
+    def test_grows_beyond_initial_capacity(self):
+        """初期容量を超えて追加"""
+        index = VectorIndex(4)
+        keys = [f"k{i}" for i in range(200)]
+        index.upsert(keys, np.eye(4, dtype=np.float32)[np.arange(200) % 4])
+        assert len(index) == 200
+
+    def test_search_with_mask(self):
+        """マスクで検索対象を限定"""
+        index = VectorIndex(2)
+        index.upsert(["a", "b"], np.array([[1, 0], [0, 1]], dtype=np.float32))
+        hits = index.search(
+            np.array([[1, 0]], dtype=np.float32), top_k=2, mask=np.array([False, True])
+        )[0]
+        assert [key for key, _ in hits] == ["b"]
+
+
+class TestSemanticIndex:
+    """SemanticIndexのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh(self, temp_docs_dir):
+        """変更されたチャンクのみ再計算"""
+        doc = temp_docs_dir / "guide.md"
+        doc.write_text("# Install\npip install server\n\n# Usage\nrun the server", encoding="utf-8")
+
+        index = SemanticIndex(SafeFileHandler(str(temp_docs_dir)), embedder=HashingEmbedder(64))
+        first = await index.refresh()
+        assert first >= 2
+
+        # 変更なし
+        assert await index.refresh() == 0
+
+        # 1セクションのみ変更
+        doc.write_text("# Install\npip install server\n\n# Usage\nstart the daemon", encoding="utf-8")
+        assert await index.refresh() == 1
+
+    @pytest.mark.asyncio
+    async def test_line_numbers_follow_edits(self, temp_docs_dir):
+        """内容が変わらないセクションも行番号は最新の位置を返す"""
+        doc = temp_docs_dir / "guide.md"
+        doc.write_text("# Intro\nhello\n\n# Deploy\nrollout the release", encoding="utf-8")
+        index = SemanticIndex(SafeFileHandler(str(temp_docs_dir)), embedder=HashingEmbedder(64))
+        await index.refresh()
+
+        doc.write_text("\n" * 50 + doc.read_text(encoding="utf-8"), encoding="utf-8")
+        assert await index.refresh() == 0
+
+        hits = await index.search("rollout the release", top_k=1)
+        assert (hits[0].chunk.heading, hits[0].chunk.start_line) == ("Deploy", 54)
+
+    @pytest.mark.asyncio
+    async def test_identical_sections_indexed_separately(self, temp_docs_dir):
+        """同じ内容のセクションはそれぞれ索引に含める"""
+        section = "# Notes\nsee the changelog\n\n"
+        (temp_docs_dir / "notes.md").write_text(section * 2, encoding="utf-8")
+        index = SemanticIndex(SafeFileHandler(str(temp_docs_dir)), embedder=HashingEmbedder(64))
+        await index.refresh()
+
+        hits = await index.search("see the changelog", top_k=10)
+        lines = sorted(hit.chunk.start_line for hit in hits if hit.chunk.path == "notes.md")
+        assert lines == [1, 4]
+
+    @pytest.mark.asyncio
+    async def test_deleted_file_removed(self, temp_docs_dir):
+        """削除されたファイルは索引から除外"""
+        index = SemanticIndex(SafeFileHandler(str(temp_docs_dir)))
+        await index.refresh()
+        before = len(index.index)
+
+        (temp_docs_dir / "sample.md").unlink()
+        await index.refresh()
+        assert len(index.index) < before
+
+    @pytest.mark.asyncio
+    async def test_skips_link_outside_base(self, temp_docs_dir, tmp_path_factory):
+        """基準ディレクトリ外を指すシンボリックリンクは索引対象外"""
+        outside = tmp_path_factory.mktemp("outside") / "secret.md"
+        outside.write_text("# Secret\ntop secret", encoding="utf-8")
+        (temp_docs_dir / "link.md").symlink_to(outside)
+
+        index = SemanticIndex(SafeFileHandler(str(temp_docs_dir)))
+        await index.refresh()
+
+        hits = await index.search("top secret", top_k=10)
+        assert hits
+        assert all(hit.chunk.path != "link.md" for hit in hits)
+
+    @pytest.mark.asyncio
+    async def test_retries_after_embedding_failure(self, temp_docs_dir):
+        """埋め込みに失敗したファイルは次回の更新で再試行"""
+
+        class FlakyEmbedder(HashingEmbedder):
+            fail = True
+
+            def embed(self, texts):
+                if self.fail:
+                    raise RuntimeError("model unavailable")
+                return super().embed(texts)
+
+        embedder = FlakyEmbedder(64)
+        index = SemanticIndex(SafeFileHandler(str(temp_docs_dir)), embedder=embedder)
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            await index.refresh()
+
+        embedder.fail = False
+        assert await index.refresh() > 0
+        assert len(index.index) > 0
+
+
+class TestDocumentToolsSemanticSearch:
+    """DocumentTools.semantic_searchのテスト"""
+
+    @pytest.fixture
+    def doc_tools(self, temp_docs_dir):
+        """DocumentToolsインスタンス"""
+        return DocumentTools(str(temp_docs_dir))
+
+    @pytest.mark.asyncio
+    async def test_finds_related_section(self, doc_tools, temp_docs_dir):
+        """関連セクションを検索"""
+        (temp_docs_dir / "guide.md").write_text(
+            "# Installation\nInstalling the server requires Python.\n\n"
+            "# Troubleshooting\nRestart the container when logs stop.",
+            encoding="utf-8"
+        )
+
+        result = await doc_tools.semantic_search("how to install", top_k=1)
+        assert "guide.md > Installation" in result
+
+    @pytest.mark.asyncio
+    async def test_directory_filter(self, doc_tools):
+        """ディレクトリで検索対象を限定"""
+        result = await doc_tools.semantic_search("document", directory="subdir")
+        paths = [line.split(" ")[0] for line in result.split("\n") if not line.startswith(" ")]
+        assert paths == ["subdir/nested.txt"]
+
+    @pytest.mark.asyncio
+    async def test_directory_filter_normalized(self, doc_tools):
+        """ディレクトリ指定は正規化して比較"""
+        result = await doc_tools.semantic_search("document", directory="./subdir/")
+        paths = [line.split(" ")[0] for line in result.split("\n") if not line.startswith(" ")]
+        assert paths == ["subdir/nested.txt"]
+
+        with pytest.raises(ValueError, match="Path traversal"):
+            await doc_tools.semantic_search("document", directory="../")
+
+    @pytest.mark.asyncio
+    async def test_consecutive_searches_skip_rescan(self, doc_tools, monkeypatch):
+        """連続した検索ではファイルの走査を省略"""
+        await doc_tools.semantic_search("document")
+        index = doc_tools._get_semantic_index()
+        calls = []
+        monkeypatch.setattr(index, "_scan", lambda: calls.append(1) or {})
+
+        await doc_tools.semantic_search("document")
+        assert calls == []
+
+        doc_tools._index_checked = 0.0
+        await doc_tools.semantic_search("document")
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_empty_query(self, doc_tools):
+        """空のクエリでエラー"""
+        with pytest.raises(ValueError, match="cannot be empty"):
+            await doc_tools.semantic_search("")
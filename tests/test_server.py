@@ -55,7 +55,8 @@ class TestServerIntegration:
             else:
                 os.environ.pop('MCP_DOCS_DIR', None)
 
-    def test_list_documents_tool_callable(self, temp_docs_dir):
+    @pytest.mark.asyncio
+    async def test_list_documents_tool_callable(self, temp_docs_dir):
         """list_documentsツールが呼び出し可能"""
         original_docs_dir = os.environ.get('MCP_DOCS_DIR')
         os.environ['MCP_DOCS_DIR'] = str(temp_docs_dir)
@@ -65,7 +66,7 @@ class TestServerIntegration:
             from mcp_server import server
             importlib.reload(server)
 
-            result = server.list_documents()
+            result = await server.list_documents()
             assert isinstance(result, str)
             assert "test.txt" in result or "sample.md" in result
 
@@ -94,3 +95,80 @@ class TestServerIntegration:
                 os.environ['MCP_DOCS_DIR'] = original_docs_dir
             else:
                 os.environ.pop('MCP_DOCS_DIR', None)
+
+    @pytest.mark.asyncio
+    async def test_docs_dir_created_lazily(self, tmp_path):
+        """ドキュメントディレクトリはインポート時ではなく初回のツール呼び出し時に作成"""
+        docs_dir = tmp_path / "lazy_docs"
+        original_docs_dir = os.environ.get('MCP_DOCS_DIR')
+        os.environ['MCP_DOCS_DIR'] = str(docs_dir)
+
+        try:
+            import importlib
+            from mcp_server import server
+            importlib.reload(server)
+            assert not docs_dir.exists()
+
+            await server.list_documents()
+            assert docs_dir.is_dir()
+
+        finally:
+            if original_docs_dir:
+                os.environ['MCP_DOCS_DIR'] = original_docs_dir
+            else:
+                os.environ.pop('MCP_DOCS_DIR', None)
+
+    @pytest.mark.asyncio
+    async def test_list_documents_pages_only_on_request(self, temp_docs_dir, monkeypatch):
+        """既定ではすべて返し、limit を指定した場合のみページ分割"""
+        for i in range(250):
+            (temp_docs_dir / f"doc{i:03d}.md").write_text("doc", encoding="utf-8")
+        monkeypatch.setenv('MCP_DOCS_DIR', str(temp_docs_dir))
+        monkeypatch.delenv('MCP_DOCS_ROOTS', raising=False)
+
+        import importlib
+        from mcp_server import server
+        importlib.reload(server)
+
+        result = await server.list_documents(pattern="*.md")
+        assert len(result.split("\n")) == 251
+        assert "cursor" not in result
+
+        page = (await server.list_documents(pattern="*.md", limit=100)).split("\n")
+        assert len(page) == 101
+        assert page[-1].startswith("[More results: call again with cursor=")
+
+        # cursor のみ指定した場合は既定の件数（HTTP API と同じ）
+        cursor = page[-1].split('cursor="')[1].rstrip('"]')
+        rest = (await server.list_documents(pattern="*.md", cursor=cursor)).split("\n")
+        assert len(rest) == 151
+        assert rest[0] == "doc100.md"
+
+    @pytest.mark.asyncio
+    async def test_sessions_share_background_tasks(self, temp_docs_dir, tmp_path, monkeypatch):
+        """セッションごとにバックグラウンド処理を再開せず、プロセスの終了時に停止して保存"""
+        monkeypatch.setenv('MCP_DOCS_DIR', str(temp_docs_dir))
+        monkeypatch.setenv('MCP_STATE_DIR', str(tmp_path))
+        monkeypatch.delenv('MCP_DOCS_ROOTS', raising=False)
+
+        import importlib
+        from mcp_server import server
+        importlib.reload(server)
+
+        async with server.run_background():
+            roots = server.get_roots()
+            tasks = list(roots._tasks)
+            assert tasks
+
+            # 順に実行される2つのセッション（ステートレスモードのリクエストを含む）
+            async with server.lifespan(server.mcp):
+                await server.get_document("test.txt")
+            async with server.lifespan(server.mcp):
+                await server.get_document("sample.md")
+
+            assert roots._tasks == tasks
+            assert not any(task.done() for task in tasks)
+            assert not (tmp_path / "default.access.json").exists()
+
+        assert all(task.done() for task in tasks)
+        assert (tmp_path / "default.access.json").exists()
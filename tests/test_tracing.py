@@ -0,0 +1,181 @@
+"""Tests for tracing and profiling"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from mcp_server.tools.document import DocumentTools
+from mcp_server.utils import tracing
+from mcp_server.utils.profiling import CPUProfiler, ProfileInProgress
+from mcp_server.utils.tracing import configure_tracing, flush_traces, span
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    """トレースを有効にしてテスト後に無効へ戻す"""
+    path = tmp_path / "trace.jsonl"
+    yield path
+    configure_tracing(None)
+
+
+def read_spans(path):
+    flush_traces()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestTracing:
+    """トレースのテスト"""
+
+    def test_disabled_by_default(self):
+        """無効な場合はスパンを作らない"""
+        configure_tracing(None)
+        with span("noop") as current:
+            assert current is None
+        assert not tracing.tracing_enabled()
+
+    @pytest.mark.asyncio
+    async def test_nested_spans(self, trace_file):
+        """子のスパンは親と同じトレースに記録し、ルートの終了時に出力"""
+        configure_tracing(str(trace_file), sample_rate=1.0)
+
+        def work():
+            with span("in_thread"):
+                pass
+
+        with span("root", route="/api/search"):
+            with span("child"):
+                # スレッドで実行した処理もリクエストのトレースに含める
+                await asyncio.to_thread(work)
+            assert not trace_file.exists()
+
+        spans = {s["name"]: s for s in read_spans(trace_file)}
+        root = spans["root"]
+        assert root["parent_span_id"] is None
+        assert root["attributes"] == {"route": "/api/search"}
+        assert spans["child"]["parent_span_id"] == root["span_id"]
+        assert spans["child"]["trace_id"] == root["trace_id"]
+        assert spans["in_thread"]["parent_span_id"] == spans["child"]["span_id"]
+
+    def test_not_sampled(self, trace_file):
+        """サンプリングされなかったリクエストは子のスパンも記録しない"""
+        configure_tracing(str(trace_file), sample_rate=0.0)
+
+        with span("root") as root:
+            with span("child") as child:
+                assert (root, child) == (None, None)
+
+        assert not trace_file.exists()
+
+    def test_error_status(self, trace_file):
+        """例外はスパンのエラーとして記録"""
+        configure_tracing(str(trace_file), sample_rate=1.0)
+
+        with pytest.raises(FileNotFoundError):
+            with span("root"):
+                raise FileNotFoundError("missing.md")
+
+        (root,) = read_spans(trace_file)
+        assert root["status"] == "error"
+        assert root["error"] == "FileNotFoundError: missing.md"
+
+    def test_otlp_format(self, trace_file):
+        """otlp 形式は1行1トレースの OTLP/JSON"""
+        configure_tracing(str(trace_file), sample_rate=1.0, format="otlp")
+
+        with span("root", bytes=10):
+            with span("child"):
+                pass
+
+        (line,) = read_spans(trace_file)
+        spans = line["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == ["child", "root"]
+        assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+        assert spans[1]["attributes"] == [{"key": "bytes", "value": {"intValue": "10"}}]
+
+    def test_writes_in_background_thread(self, trace_file, monkeypatch):
+        """ファイルへの書き込みはリクエストのスレッドではなく書き込みスレッドで行う"""
+        tracer = configure_tracing(str(trace_file), sample_rate=1.0)
+        writers = []
+        write = tracer._write
+        monkeypatch.setattr(
+            tracer, "_write",
+            lambda traces: writers.append(threading.current_thread().name) or write(traces)
+        )
+
+        for i in range(3):
+            with span("root", i=i):
+                pass
+
+        assert len(read_spans(trace_file)) == 3
+        assert writers and set(writers) == {"mcp-trace-writer"}
+
+    def test_close_writes_pending_traces(self, trace_file):
+        """設定を変更する前に書き込み待ちのトレースを書き込む"""
+        configure_tracing(str(trace_file), sample_rate=1.0)
+        with span("root"):
+            pass
+
+        configure_tracing(None)
+
+        assert [s["name"] for s in read_spans(trace_file)] == ["root"]
+
+    def test_unsupported_format(self):
+        """未対応の出力形式はエラー"""
+        with pytest.raises(ValueError, match="Unsupported trace format"):
+            tracing.Tracer("trace.jsonl", format="xml")
+
+    @pytest.mark.asyncio
+    async def test_search_spans(self, trace_file, temp_docs_dir):
+        """検索の内訳（パス解決・読み込み・デコード・一致検索）を記録"""
+        configure_tracing(str(trace_file), sample_rate=1.0)
+        doc_tools = DocumentTools(str(temp_docs_dir))
+
+        with span("mcp.tool", tool="search_in_document"):
+            await doc_tools.search_in_document("sample.md", "hello")
+
+        names = {s["name"] for s in read_spans(trace_file)}
+        assert {
+            "mcp.tool", "file_handler.resolve", "document.read", "file_handler.io",
+            "file_handler.decode", "search.casefold", "search.match",
+        } <= names
+
+
+class TestCPUProfiler:
+    """CPUプロファイルのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_capture_text(self):
+        """指定秒数の間のプロファイルを表形式で返す"""
+        profiler = CPUProfiler()
+
+        async def busy():
+            sum(i * i for i in range(100_000))
+
+        task = asyncio.ensure_future(busy())
+        report = await profiler.capture_text(0.1, sort="tottime", limit=10)
+        await task
+
+        assert "function calls" in report
+
+    @pytest.mark.asyncio
+    async def test_rejects_concurrent_capture(self):
+        """同時に取得できるプロファイルは1つ"""
+        profiler = CPUProfiler()
+        first = asyncio.ensure_future(profiler.capture(0.2))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ProfileInProgress):
+            await profiler.capture(0.1)
+        await first
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self):
+        """範囲外の秒数・未対応の並び順はエラー"""
+        profiler = CPUProfiler(max_seconds=1.0)
+
+        with pytest.raises(ValueError):
+            await profiler.capture(5.0)
+        with pytest.raises(ValueError, match="Unsupported sort key"):
+            await profiler.capture_text(0.1, sort="name")
@@ -0,0 +1,208 @@
+"""Tests for DocumentTree"""
+
+import asyncio
+
+import pytest
+
+from mcp_server.resources.file_handler import SafeFileHandler
+from mcp_server.tools.document import DocumentTools
+from mcp_server.tools.tree import DocumentTree, glob_to_regex
+
+
+@pytest.fixture
+def tree_docs_dir(temp_docs_dir):
+    """複数階層のディレクトリを追加"""
+    deep = temp_docs_dir / "guides" / "setup"
+    deep.mkdir(parents=True)
+    (temp_docs_dir / "guides" / "intro.md").write_text("intro", encoding="utf-8")
+    (deep / "install.md").write_text("install steps", encoding="utf-8")
+    (deep / "notes.txt").write_text("notes", encoding="utf-8")
+    (temp_docs_dir / "guides-old").mkdir()
+    (temp_docs_dir / "guides-old" / "legacy.md").write_text("legacy", encoding="utf-8")
+    return temp_docs_dir
+
+
+@pytest.fixture
+def tree(tree_docs_dir):
+    return DocumentTree(SafeFileHandler(str(tree_docs_dir)), ttl=60.0)
+
+
+async def collect_pages(tree, directory, pattern, limit):
+    paths, cursor = [], None
+    while True:
+        page = await tree.page(directory, pattern, cursor, limit)
+        paths.extend(page.paths)
+        if page.next_cursor is None:
+            return paths
+        assert len(page.paths) == limit
+        cursor = page.next_cursor
+
+
+async def collect_pages_from(tree, cursor):
+    paths = []
+    while cursor:
+        page = await tree.page(".", "**/*", cursor, 3)
+        paths.extend(page.paths)
+        cursor = page.next_cursor
+    return paths
+
+
+class TestGlobToRegex:
+    """glob パターン変換のテスト"""
+
+    def test_star_does_not_cross_directories(self):
+        """"*" は "/" をまたがない"""
+        assert glob_to_regex("*.md").match("a.md")
+        assert not glob_to_regex("*.md").match("sub/a.md")
+
+    def test_recursive(self):
+        """"**/" は0個以上のディレクトリに一致"""
+        regex = glob_to_regex("**/*.md")
+        assert regex.match("a.md")
+        assert regex.match("x/y/a.md")
+        assert not regex.match("x/a.txt")
+
+    def test_character_class(self):
+        """文字クラスと否定"""
+        assert glob_to_regex("[ab].txt").match("a.txt")
+        assert not glob_to_regex("[!ab].txt").match("a.txt")
+
+
+class TestDocumentTree:
+    """DocumentTreeのテスト"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("directory,pattern", [
+        (".", "*"),
+        (".", "**/*"),
+        (".", "**/*.md"),
+        ("guides", "**/*"),
+        ("guides/setup", "*.txt"),
+        ("subdir", "*"),
+    ])
+    async def test_pages_match_glob_listing(self, tree, directory, pattern):
+        """全ページを連結すると glob による一覧と一致"""
+        expected = tree.file_handler.list_files(directory, pattern)
+
+        assert await collect_pages(tree, directory, pattern, limit=2) == expected
+
+    @pytest.mark.asyncio
+    async def test_cursor_survives_additions(self, tree, tree_docs_dir):
+        """ページの間に追加されたファイルがあっても重複なく続きを取得"""
+        first = await tree.page(".", "**/*", limit=3)
+        (tree_docs_dir / "aaa.md").write_text("new", encoding="utf-8")
+        tree.invalidate()
+
+        rest = await collect_pages_from(tree, first.next_cursor)
+
+        assert not set(first.paths) & set(rest)
+        assert "aaa.md" not in rest  # カーソルより前に追加されたファイル
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self, tree):
+        """不正なカーソル・件数はエラー"""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await tree.page(cursor="%%%")
+        with pytest.raises(ValueError, match="limit"):
+            await tree.page(limit=0)
+
+    @pytest.mark.asyncio
+    async def test_aggregates(self, tree):
+        """ディレクトリごとにサブディレクトリを含めて集計"""
+        guides = await tree.directory("guides")
+
+        assert (guides.file_count, guides.total_bytes) == (3, len("intro") + 13 + 5)
+        assert sorted(guides.dirs) == ["setup"]
+        assert sorted(guides.files) == ["intro.md"]
+        assert (await tree.directory()).file_count == 7
+        mtimes = [guides.files["intro.md"].mtime] + [
+            entry.mtime for entry in guides.dirs["setup"].files.values()
+        ]
+        assert guides.latest_mtime == max(mtimes)
+
+    @pytest.mark.asyncio
+    async def test_directory_errors(self, tree):
+        """存在しないディレクトリ・ファイル・基準ディレクトリ外はエラー"""
+        with pytest.raises(FileNotFoundError):
+            await tree.directory("missing")
+        with pytest.raises(ValueError, match="not a directory"):
+            await tree.directory("guides/intro.md")
+        with pytest.raises(ValueError, match="Path traversal"):
+            await tree.directory("../")
+
+    @pytest.mark.asyncio
+    async def test_reuses_tree_within_ttl(self, tree, tree_docs_dir):
+        """ttl の間は走査し直さない"""
+        await tree.directory()
+        (tree_docs_dir / "late.md").write_text("late", encoding="utf-8")
+
+        assert "late.md" not in (await tree.directory()).files
+        tree.invalidate()
+        assert "late.md" in (await tree.directory()).files
+
+
+    @pytest.mark.asyncio
+    async def test_symlinks_match_glob_listing(self, tree, tree_docs_dir, tmp_path_factory):
+        """基準ディレクトリ内を指すファイルへのリンクのみ含み、ディレクトリへのリンクはたどらない"""
+        outside = tmp_path_factory.mktemp("outside") / "secret.md"
+        outside.write_text("secret", encoding="utf-8")
+        (tree_docs_dir / "intro-link.md").symlink_to(tree_docs_dir / "guides" / "intro.md")
+        (tree_docs_dir / "secret.md").symlink_to(outside)
+        (tree_docs_dir / "guides" / "loop").symlink_to(tree_docs_dir / "guides")
+
+        paths = await collect_pages(tree, ".", "**/*", limit=100)
+
+        assert "intro-link.md" in paths
+        assert "secret.md" not in paths
+        assert not any(path.startswith("guides/loop/") for path in paths)
+        assert paths == tree.file_handler.list_files(".", "**/*")
+        assert (await tree.directory()).files["intro-link.md"].size == len("intro")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_rebuild(self, tree, monkeypatch):
+        """同時に呼び出された場合は1回の走査を共有"""
+        scans = []
+        scan = tree._scan
+        monkeypatch.setattr(tree, "_scan", lambda: scans.append(1) or scan())
+
+        nodes = await asyncio.gather(*(tree.directory("guides") for _ in range(5)))
+
+        assert scans == [1]
+        assert all(node is nodes[0] for node in nodes)
+
+
+class TestDocumentToolsListing:
+    """DocumentToolsの階層表示・ページ分割のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_format_tree(self, tree_docs_dir):
+        """サブディレクトリの集計と直下のファイル"""
+        doc_tools = DocumentTools(str(tree_docs_dir))
+
+        output = doc_tools.format_tree(await doc_tools.list_tree("guides"))
+
+        lines = output.split("\n")
+        assert lines[0].startswith("guides/ (3 files, 23 B, updated ")
+        assert lines[1].startswith("  setup/ (2 files, 18 B, ")
+        assert lines[2].startswith("  intro.md (5 B, updated ")
+
+    @pytest.mark.asyncio
+    async def test_list_documents_page(self, tree_docs_dir):
+        """1ページ目と次のページのカーソル"""
+        doc_tools = DocumentTools(str(tree_docs_dir))
+
+        page = await doc_tools.list_documents_page(pattern="**/*.md", limit=2)
+
+        assert page.paths == ["guides-old/legacy.md", "guides/intro.md"]
+        assert page.next_cursor is not None
+
+    @pytest.mark.asyncio
+    async def test_format_tree_truncates_files(self, tree_docs_dir):
+        """直下のファイルが多い場合は件数のみ表示"""
+        doc_tools = DocumentTools(str(tree_docs_dir))
+
+        output = doc_tools.format_tree(await doc_tools.list_tree(), max_files=1)
+
+        assert output.split("\n")[-1] == (
+            "  ... and 1 more files (use list_documents with a cursor)"
+        )